@@ -1,22 +1,26 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 import sys
 import os
 from dotenv import load_dotenv
 import json
-from langchain_core.messages import HumanMessage
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from typing import Literal, Optional
 
 # API URLs
-LUNARCRUSH_API_URL = "https://lunarcrush.com/api4/public"
 HYPERLIQUID_API_URL = os.getenv("HYPERLIQUID_API_URL")
 BINANCE_API_URL = os.getenv("BINANCE_API_URL")
 API_COPIN_OI = os.getenv("API_COPIN_OI")
 
+# Threads available to blocking work (sync graph nodes, LunarCrush lookups) so it
+# never runs on the event loop
+WORKER_THREADS = int(os.getenv("BACKEND_WORKER_THREADS", 16))
+
 # Get the absolute path to the src directory
 AI_SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
 
@@ -27,21 +31,37 @@ if AI_SRC not in sys.path:
 
 try:
     # Import your existing analysis code
-    from agents.market_data import market_data_agent, check_data_valid
-    from agents.portfolio_manager import portfolio_management_agent
-    from agents.technicals import technical_analyst_agent
-    from agents.risk_manager import risk_management_agent
-    from agents.sentiment import sentiment_agent
-    from agents.social_monitor import social_monitor_agent
-    from agents.state import AgentState
-    from langgraph.graph import END, StateGraph
+    from agents.market_data import acheck_data_valid
+    from agents.portfolio_manager import DECISION_ENGINES
+    from agents.social_monitor import aget_coins_index, aget_coins_list
+    from scanner import scan
+    from tools import http_client, llm_client
+    from workflow import (
+        DEFAULT_BATCH_CONCURRENCY,
+        arun_batch,
+        create_initial_state,
+        create_workflow,
+    )
     print("Successfully imported required modules")
 except ImportError as e:
     print(f"Import error: {e}")
     print(f"Current Python path: {sys.path}")
     raise
 
-app = FastAPI(title="AI Hedge Fund API v2")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync graph nodes and asyncio.to_thread run on the loop's default executor;
+    # bound it so a burst of requests queues instead of spawning unbounded threads
+    executor = ThreadPoolExecutor(
+        max_workers=WORKER_THREADS, thread_name_prefix="analysis-worker"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+    yield
+    await http_client.aclose_async_client()
+    await llm_client.aclose_async_llm()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+app = FastAPI(title="AI Hedge Fund API v2", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -60,166 +80,187 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
-# Define the workflow
-workflow = StateGraph(AgentState)
-
-# Add nodes
-workflow.add_node("market_data_agent", market_data_agent)
-workflow.add_node("technical_analyst_agent", technical_analyst_agent)
-workflow.add_node("sentiment_agent", sentiment_agent)
-workflow.add_node("social_monitor_agent", social_monitor_agent)
-workflow.add_node("risk_management_agent", risk_management_agent)
-workflow.add_node("portfolio_management_agent", portfolio_management_agent)
-
-# Define the workflow
-workflow.set_entry_point("market_data_agent")
-workflow.add_edge("market_data_agent", "technical_analyst_agent")
-workflow.add_edge("market_data_agent", "sentiment_agent")
-workflow.add_edge("market_data_agent", "social_monitor_agent")
-workflow.add_edge("technical_analyst_agent", "risk_management_agent")
-workflow.add_edge("sentiment_agent", "risk_management_agent")
-workflow.add_edge("social_monitor_agent", "risk_management_agent")
-workflow.add_edge("risk_management_agent", "portfolio_management_agent")
-workflow.add_edge("portfolio_management_agent", END)
-
 # Compile the workflow
-compiled_workflow = workflow.compile()
+compiled_workflow = create_workflow()
+
+# Accepted decisionEngine values, so a typo is rejected (422) before any work is done
+DecisionEngine = Literal[DECISION_ENGINES]
+
+# Largest watchlist accepted by /api/analyze/batch
+MAX_BATCH_SYMBOLS = 100
+# Largest maxConcurrency accepted by /api/analyze/batch
+MAX_BATCH_CONCURRENCY = 16
 
 class AnalysisRequest(BaseModel):
     crypto: str
-    startDate: str | None = None
-    endDate: str | None = None
-    balance: float | None = None
-    leverage: float | None = None
-    risk: float | None = None
+    startDate: Optional[str] = None
+    endDate: Optional[str] = None
+    balance: Optional[float] = None
+    leverage: Optional[float] = None
+    risk: Optional[float] = None
+    decisionEngine: Optional[DecisionEngine] = None
 
-@app.post("/api/analyze")
-async def analyze(request: AnalysisRequest):
+class BatchAnalysisRequest(BaseModel):
+    cryptos: list[str]
+    startDate: Optional[str] = None
+    endDate: Optional[str] = None
+    balance: Optional[float] = None
+    leverage: Optional[float] = None
+    risk: Optional[float] = None
+    maxConcurrency: int = Field(default=DEFAULT_BATCH_CONCURRENCY, ge=1, le=MAX_BATCH_CONCURRENCY)
+    decisionEngine: Optional[DecisionEngine] = None
+
+def build_portfolio(request):
+    """Portfolio settings of a request, with defaults for the missing ones."""
+    return {
+        "cash": request.balance or 500000,  # $500k starting capital
+        "leverage": request.leverage or 20,  # 20x leverage
+        "risk": request.risk or 0.01,   # 1% risk per trade
+    }
+
+# Order in which the agents are displayed
+AGENT_ORDER = [
+    "market_data_agent",
+    "technical_analyst_agent",
+    "sentiment_agent",
+    "social_monitor_agent",
+    "risk_management_agent",
+    "portfolio_management_agent"
+]
+
+def format_agent_message(message, final_decision=None):
+    """Build the {"agent", "reasoning"} entry shown for one agent message.
+
+    Args:
+        message: Agent message (HumanMessage with a JSON content)
+        final_decision: Final decision dict; the social monitor's metrics are copied into it
+
+    Returns:
+        dict | None: Entry for agent_reasoning, or None if the message cannot be parsed
+    """
     try:
-        print(f"Analyzing crypto: {request.crypto}")
-        print(f"Date range: {request.startDate} to {request.endDate}")
-        print(f"Portfolio settings: balance={request.balance}, leverage={request.leverage}, risk={request.risk}")
-        
-        # Default portfolio settings
-        portfolio = {
-            "cash": request.balance or 500000,  # $500k starting capital
-            "leverage": request.leverage or 20,  # 20x leverage
-            "risk": request.risk or 0.01,   # 1% risk per trade
-        }
+        content = json.loads(message.content)
+        print(f"\n{message.name} output:", json.dumps(content, indent=2))
         
-        # Initialize state
-        initial_state = {
-            "messages": [
-                HumanMessage(
-                    content="Make a trading decision based on the provided data.",
-                )
-            ],
-            "data": {
-                "crypto": request.crypto,
-                "portfolio": portfolio,
-                "start_date": request.startDate,  # Will use default (1 month ago) if None
-                "end_date": request.endDate,    # Will use default (current date) if None
-                "analyst_signals": {},
-            },
-            "metadata": {
-                "show_reasoning": True
+        if not isinstance(content, dict):
+            return None
+
+        # Format technical analysis output specially
+        if message.name == "technical_analyst_agent":
+            strategy_summary = {
+                "signal": content.get("signal", "neutral"),
+                "confidence": content.get("confidence", "0%"),
+                "strategies": {
+                    k: {
+                        "signal": v.get("signal", "neutral"),
+                        "confidence": v.get("confidence", "0%")
+                    } for k, v in content.get("strategy_signals", {}).items()
+                }
             }
+            print(f"\nProcessed Technical Analysis:", json.dumps(strategy_summary, indent=2))
+            return {
+                "agent": message.name,
+                "reasoning": strategy_summary
+            }
+        if message.name == "social_monitor_agent":
+            # Extract social metrics if available
+            social_metrics = content.get("social_metrics", {})
+            if social_metrics and final_decision is not None:
+                final_decision["social_metrics"] = {
+                    "alt_rank": social_metrics.get("alt_rank", 0),
+                    "alt_rank_previous": social_metrics.get("alt_rank_previous", 0),
+                    "social_dominance": social_metrics.get("social_dominance", 0)
+                }
+        return {
+            "agent": message.name,
+            "reasoning": content.get("reasoning", content)
         }
+    except json.JSONDecodeError as e:
+        print(f"\nError parsing {message.name} output:", str(e))
+        print("Raw content:", message.content)
+        return None
+    except Exception as e:
+        print(f"\nUnexpected error processing {message.name}:", str(e))
+        return None
 
-        # Check if data is available
-        valid = check_data_valid(request.crypto, request.startDate, request.endDate)
-        if not valid:
-            raise HTTPException(
-                status_code=400,
-                detail="Unable to fetch required market data for analysis"
-            )
+def format_analysis(final_state):
+    """Build the API response (final decision plus per-agent reasoning) from a final graph state."""
+    # Extract the final decision
+    final_decision = json.loads(final_state["messages"][-1].content)
+    print("\nFinal Portfolio Decision:", json.dumps(final_decision, indent=2))
+    
+    # Create a dictionary to store the latest message from each agent
+    agent_messages = {}
+    
+    # Process messages in reverse order to get the latest message from each agent
+    for message in reversed(final_state["messages"]):
+        if message.name and message.name not in agent_messages:
+            entry = format_agent_message(message, final_decision)
+            if entry:
+                agent_messages[message.name] = entry
+    
+    # Create the final agent_reasoning list in the desired order
+    agent_reasoning = [
+        agent_messages[agent_name]
+        for agent_name in AGENT_ORDER
+        if agent_name in agent_messages
+    ]
 
-        # Run the complete workflow
-        final_state = compiled_workflow.invoke(initial_state)
-        
-        # Extract the final decision
-        final_decision = json.loads(final_state["messages"][-1].content)
-        print("\nFinal Portfolio Decision:", json.dumps(final_decision, indent=2))
-        
-        # Define the order we want to display the agents
-        agent_order = [
-            "market_data_agent",
-            "technical_analyst_agent",
-            "sentiment_agent",
-            "social_monitor_agent",
-            "risk_management_agent",
-            "portfolio_management_agent"
-        ]
-        
-        # Create a dictionary to store the latest message from each agent
-        agent_messages = {}
-        
-        # Process messages in reverse order to get the latest message from each agent
-        for message in reversed(final_state["messages"]):
-            if message.name and message.name not in agent_messages:
-                try:
-                    content = json.loads(message.content)
-                    print(f"\n{message.name} output:", json.dumps(content, indent=2))
-                    
-                    if isinstance(content, dict):
-                        # Format technical analysis output specially
-                        if message.name == "technical_analyst_agent":
-                            strategy_summary = {
-                                "signal": content.get("signal", "neutral"),
-                                "confidence": content.get("confidence", "0%"),
-                                "strategies": {
-                                    k: {
-                                        "signal": v.get("signal", "neutral"),
-                                        "confidence": v.get("confidence", "0%")
-                                    } for k, v in content.get("strategy_signals", {}).items()
-                                }
-                            }
-                            agent_messages[message.name] = {
-                                "agent": message.name,
-                                "reasoning": strategy_summary
-                            }
-                            print(f"\nProcessed Technical Analysis:", json.dumps(strategy_summary, indent=2))
-                        elif message.name == "social_monitor_agent":
-                            # Extract social metrics if available
-                            social_metrics = content.get("social_metrics", {})
-                            if social_metrics:
-                                final_decision["social_metrics"] = {
-                                    "alt_rank": social_metrics.get("alt_rank", 0),
-                                    "alt_rank_previous": social_metrics.get("alt_rank_previous", 0),
-                                    "social_dominance": social_metrics.get("social_dominance", 0)
-                                }
-                            agent_messages[message.name] = {
-                                "agent": message.name,
-                                "reasoning": content.get("reasoning", content)
-                            }
-                        else:
-                            agent_messages[message.name] = {
-                                "agent": message.name,
-                                "reasoning": content.get("reasoning", content)
-                            }
-                except json.JSONDecodeError as e:
-                    print(f"\nError parsing {message.name} output:", str(e))
-                    print("Raw content:", message.content)
-                    continue
-                except Exception as e:
-                    print(f"\nUnexpected error processing {message.name}:", str(e))
-                    continue
-        
-        # Create the final agent_reasoning list in the desired order
-        agent_reasoning = [
-            agent_messages[agent_name]
-            for agent_name in agent_order
-            if agent_name in agent_messages
-        ]
+    return {
+        "analysis": final_decision,
+        "agent_reasoning": agent_reasoning
+    }
 
-        # Log the final response
-        response = {
-            "analysis": final_decision,
-            "agent_reasoning": agent_reasoning
-        }
+def sse_event(event, data):
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def prepare_analysis(request):
+    """Fetch the market data for a request and build the graph's initial state.
+
+    Raises:
+        HTTPException: 400 if the market data is unavailable
+    """
+    print(f"Analyzing crypto: {request.crypto}")
+    print(f"Date range: {request.startDate} to {request.endDate}")
+    print(f"Portfolio settings: balance={request.balance}, leverage={request.leverage}, risk={request.risk}")
+    
+    # Default portfolio settings
+    portfolio = build_portfolio(request)
+    
+    # Check if data is available and hand it to the market data agent
+    market_data = await acheck_data_valid(
+        request.crypto, request.startDate, request.endDate, return_data=True
+    )
+    if not market_data:
+        raise HTTPException(
+            status_code=400,
+            detail="Unable to fetch required market data for analysis"
+        )
+    return create_initial_state(
+        request.crypto,
+        request.startDate,  # Will use default (1 month ago) if None
+        request.endDate,    # Will use default (current date) if None
+        portfolio,
+        show_reasoning=True,
+        data=market_data,
+        decision_engine=request.decisionEngine,
+    )
+
+@app.post("/api/analyze")
+async def analyze(request: AnalysisRequest):
+    try:
+        initial_state = await prepare_analysis(request)
+
+        # Run the complete workflow without blocking the event loop
+        final_state = await compiled_workflow.ainvoke(initial_state)
+        
+        response = format_analysis(final_state)
         print("\nFinal API Response:", json.dumps(response, indent=2))
         
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
         print(f"Analysis error: {error_msg}")
@@ -228,37 +269,101 @@ async def analyze(request: AnalysisRequest):
             detail=f"Analysis failed: {error_msg}"
         )
 
+@app.post("/api/analyze/stream")
+async def analyze_stream(request: AnalysisRequest):
+    """Run the analysis and stream it as server-sent events.
+
+    Events, in order:
+        agent: {"agent", "reasoning"} as soon as each agent's node completes
+        result: the same body /api/analyze returns, once the graph has finished
+        error: {"detail"} if the analysis fails part way; the stream then ends
+    """
+    try:
+        # Validate up front so a bad request still gets a plain 400/500 response
+        initial_state = await prepare_analysis(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Analysis error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+    async def events():
+        final_state = initial_state
+        try:
+            async for mode, chunk in compiled_workflow.astream(
+                initial_state, stream_mode=["updates", "values"]
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                for node_update in chunk.values():
+                    messages = (node_update or {}).get("messages") or []
+                    # Each node returns the history plus its own message last
+                    if messages and messages[-1].name:
+                        entry = format_agent_message(messages[-1])
+                        if entry:
+                            yield sse_event("agent", entry)
+            yield sse_event("result", format_analysis(final_state))
+        except Exception as e:
+            print(f"Analysis error: {str(e)}")
+            yield sse_event("error", {"detail": f"Analysis failed: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    """Analyse a watchlist, streaming one JSON line per symbol as each finishes.
+
+    Every line is {"crypto", "analysis", "agent_reasoning"} on success or
+    {"crypto", "error"} when that symbol failed; the other symbols carry on.
+    """
+    cryptos = [crypto.strip().upper() for crypto in request.cryptos if crypto.strip()]
+    if not cryptos:
+        raise HTTPException(status_code=400, detail="No cryptos given")
+    if len(cryptos) > MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_SYMBOLS} cryptos can be analysed per batch"
+        )
+    print(f"Analyzing batch of {len(cryptos)} cryptos: {', '.join(cryptos)}")
+
+    async def results():
+        async for result in arun_batch(
+            compiled_workflow,
+            cryptos,
+            request.startDate,
+            request.endDate,
+            build_portfolio(request),
+            show_reasoning=False,
+            max_concurrency=request.maxConcurrency,
+            decision_engine=request.decisionEngine,
+        ):
+            if result["error"]:
+                line = {"crypto": result["crypto"], "error": result["error"]}
+            else:
+                try:
+                    line = {"crypto": result["crypto"], **format_analysis(result["final_state"])}
+                except Exception as e:
+                    line = {"crypto": result["crypto"], "error": f"Analysis failed: {str(e)}"}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @app.get("/api/coins")
 async def get_available_coins():
     """Get list of available cryptocurrencies from LunarCrush."""
     try:
-        # Create session with retries
-        session = requests.Session()
-        retries = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=[408, 429, 500, 502, 503, 504]
-        )
-        session.mount('http://', HTTPAdapter(max_retries=retries))
-        session.mount('https://', HTTPAdapter(max_retries=retries))
-
-        # Fetch from LunarCrush API
-        endpoint = "https://lunarcrush.com/api4/public/coins/list/v1"
-        headers = {
-            'Authorization': f'Bearer {os.getenv("LUNARCRUSH_API_KEY")}',
-            'Accept': 'application/json'
-        }
-        
-        response = session.get(
-            endpoint,
-            headers=headers,
-            timeout=10
-        )
-        
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data or "data" not in data:
+        # Shared with the agents and cached for LUNARCRUSH_CONFIG["cache_duration"]
+        coins_list = await aget_coins_list()
+
+        if coins_list is None:
             raise HTTPException(
                 status_code=500,
                 detail="Invalid response from LunarCrush API"
@@ -272,7 +377,7 @@ async def get_available_coins():
                 "market_cap": coin.get("market_cap", 0),
                 "volume_24h": coin.get("volume_24h", 0)
             }
-            for coin in data["data"]
+            for coin in coins_list
             if coin.get("symbol") and coin.get("name")  # Ensure required fields exist
         ]
         
@@ -290,6 +395,30 @@ async def get_available_coins():
             detail=f"Failed to fetch cryptocurrencies: {str(e)}"
         )
 
+@app.get("/api/scanner")
+async def scan_coins(symbols: Optional[str] = None, limit: int = 100, refresh: bool = False):
+    """Rank coins by the technical strategies, scored together from the candle store.
+
+    Args:
+        symbols: Comma-separated symbols (default: every symbol in the candle store)
+        limit: Number of top-ranked coins returned
+        refresh: Fetch the candles missing from the store before scanning
+    """
+    try:
+        universe = [symbol.strip() for symbol in symbols.split(",") if symbol.strip()] if symbols else None
+        results = await asyncio.to_thread(scan, universe, refresh=refresh)
+        # to_json writes NaN (indicators still warming up) as null
+        coins = json.loads(results.head(limit).reset_index().to_json(orient="records"))
+        return {
+            "coins": coins,
+            "total": len(results)
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to scan cryptocurrencies: {str(e)}"
+        )
+
 @app.get("/api/check-availability/{symbol}")
 async def check_availability(symbol: str):
     """Check if a cryptocurrency is available across all required data sources."""
@@ -306,26 +435,11 @@ async def check_availability(symbol: str):
             "message": ""
         }
         
-        # Check LunarCrush availability
+        # Check LunarCrush availability (symbol lookup in the cached coins list)
         try:
-            session = requests.Session()
-            retries = Retry(total=3, backoff_factor=0.5)
-            session.mount('http://', HTTPAdapter(max_retries=retries))
-            session.mount('https://', HTTPAdapter(max_retries=retries))
-            
-            response = session.get(
-                f"{LUNARCRUSH_API_URL}/coins/list/v1",
-                headers={'Authorization': f'Bearer {os.getenv("LUNARCRUSH_API_KEY")}'},
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and "data" in data:
-                for coin in data["data"]:
-                    if coin.get("symbol") == symbol.upper():
-                        availability["sources"]["lunarcrush"] = True
-                        break
+            coins_index = await aget_coins_index()
+            if coins_index is not None and symbol.upper() in coins_index:
+                availability["sources"]["lunarcrush"] = True
         except Exception as e:
             print(f"LunarCrush check error: {str(e)}")
 
@@ -340,15 +454,15 @@ async def check_availability(symbol: str):
                     "endTime": int(datetime.now().timestamp() * 1000),
                 },
             }
-            response = requests.post(HYPERLIQUID_API_URL, json=data)
-            if response.ok and len(response.json()) > 0:
+            response = await http_client.apost(HYPERLIQUID_API_URL, json=data)
+            if response.is_success and len(response.json()) > 0:
                 availability["sources"]["hyperliquid"] = True
         except Exception as e:
             print(f"HyperLiquid check error: {str(e)}")
 
         # Check Binance availability
         try:
-            response = requests.get(
+            response = await http_client.aget(
                 f"{BINANCE_API_URL}/fapi/v1/continuousKlines",
                 params={
                     "pair": f"{symbol.upper()}",
@@ -357,7 +471,7 @@ async def check_availability(symbol: str):
                     "limit": 1
                 }
             )
-            if response.ok and len(response.json()) > 0:
+            if response.is_success and len(response.json()) > 0:
                 availability["sources"]["binance"] = True
         except Exception as e:
             print(f"Binance check error: {str(e)}")
@@ -372,12 +486,12 @@ async def check_availability(symbol: str):
                     {"fieldName": "isLong", "value": "true"},
                 ]
             }
-            response = requests.post(
+            response = await http_client.apost(
                 API_COPIN_OI,
                 headers={"Content-Type": "application/json"},
                 json=query
             )
-            if response.ok and response.json().get("data"):
+            if response.is_success and response.json().get("data"):
                 availability["sources"]["copin"] = True
         except Exception as e:
             print(f"Copin check error: {str(e)}")
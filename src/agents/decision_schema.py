@@ -0,0 +1,74 @@
+from typing import Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
+
+
+class PortfolioSummary(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    cash: str
+    leverage: str
+    risk: str
+
+
+class Decision(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    action: Literal["long", "short", "hold"]
+    quantity: float = Field(ge=0)
+    volatility: Optional[str] = None
+    stop_loss: Optional[str] = None
+    take_profit: Optional[str] = None
+    confidence: Optional[str] = None
+
+    @field_validator("action", mode="before")
+    @classmethod
+    def _normalize_action(cls, action):
+        return action.strip().lower() if isinstance(action, str) else action
+
+    @field_validator("quantity")
+    @classmethod
+    def _within_position_limit(cls, quantity: float, info: ValidationInfo) -> float:
+        max_position_margin = (info.context or {}).get("max_position_margin")
+        # Allow for the LLM rounding the limit to whole units
+        if max_position_margin is not None and quantity > float(max_position_margin) + 0.01:
+            raise ValueError(
+                f"quantity {quantity} exceeds max_position_margin {max_position_margin}"
+            )
+        return quantity
+
+
+class AgentSignal(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    agent: str
+    signal: str
+    confidence: str
+
+
+class TradingDecision(BaseModel):
+    """Portfolio manager decision, as returned by the LLM and the rule-based engine."""
+
+    portfolio: PortfolioSummary
+    decision: Decision
+    agent_signals: list[AgentSignal] = Field(default_factory=list)
+    reasoning: str = ""
+
+
+def validate_decision(content: Union[str, dict], max_position_margin: Optional[float] = None) -> TradingDecision:
+    """Parse and validate a portfolio decision.
+
+    Args:
+        content: Decision as a JSON string or dict
+        max_position_margin: Risk manager's position limit; the quantity may not exceed it
+
+    Returns:
+        TradingDecision: Validated decision
+
+    Raises:
+        pydantic.ValidationError: If the decision does not match the schema or the limit
+    """
+    context = {"max_position_margin": max_position_margin}
+    if isinstance(content, str):
+        return TradingDecision.model_validate_json(content, context=context)
+    return TradingDecision.model_validate(content, context=context)
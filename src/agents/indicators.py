@@ -0,0 +1,350 @@
+import functools
+import math
+import warnings
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+def _cached(method):
+    """Memoize an IndicatorEngine method on its name and arguments."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        key = (method.__name__,) + args
+        if key not in self._cache:
+            self._cache[key] = method(self, *args)
+        return self._cache[key]
+
+    return wrapper
+
+
+def _frame(values: np.ndarray):
+    # Time runs along the last axis; pandas windows run down the rows
+    return pd.Series(values) if values.ndim == 1 else pd.DataFrame(values.T)
+
+
+def _values(frame) -> np.ndarray:
+    return frame.to_numpy() if frame.ndim == 1 else frame.to_numpy().T
+
+
+def ewm_mean(values: np.ndarray, span: int, adjust: bool = False) -> np.ndarray:
+    """Exponentially weighted mean along the last axis, matching pandas' ewm(span).mean()."""
+    if values.ndim == 1:
+        return pd.Series(values).ewm(span=span, adjust=adjust).mean().to_numpy()
+    if values.ndim != 2:
+        return _values(_frame(values).ewm(span=span, adjust=adjust).mean())
+    return _ewm_rows(values, span, adjust)
+
+
+def _ewm_rows(values: np.ndarray, span: int, adjust: bool) -> np.ndarray:
+    """pandas' ewm(span).mean() recursion run over the time axis for every row at once.
+
+    pandas runs ewm on a DataFrame one column at a time, which dominates the cost
+    for hundreds of short rows. Here each step updates all rows together, with the
+    same arithmetic as pandas (ignore_na=False), so results match it per row.
+    """
+    com = (span - 1) / 2.0
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+
+    result = np.empty_like(values, dtype=np.float64)
+    weighted = values[:, 0].astype(np.float64)
+    old_wt = np.ones(len(values))
+    result[:, 0] = weighted
+    with np.errstate(invalid="ignore"):
+        for t in range(1, values.shape[1]):
+            current = values[:, t]
+            observed = ~np.isnan(current)
+            started = ~np.isnan(weighted)
+            # Every step decays the weight of the mean so far, observed or not
+            old_wt = np.where(started, old_wt * old_wt_factor, old_wt)
+            blend = started & observed
+            weighted = np.where(
+                blend & (weighted != current),
+                (old_wt * weighted + new_wt * current) / (old_wt + new_wt),
+                weighted,
+            )
+            old_wt = np.where(blend, old_wt + new_wt if adjust else 1.0, old_wt)
+            # A row's mean starts at its first observation
+            weighted = np.where(~started & observed, current, weighted)
+            result[:, t] = weighted
+    return result
+
+
+# How each rolling statistic scales with the data: stat(c * x) = c ** power * stat(x)
+_ROLLING_SCALE_POWER = {"mean": 1, "sum": 1, "std": 1, "var": 2, "skew": 0, "kurt": 0}
+
+
+def rolling_stat(values: np.ndarray, window: int, how: str) -> np.ndarray:
+    """Rolling statistic along the last axis, matching pandas' rolling(window).<how>()."""
+    if values.ndim == 1:
+        return getattr(pd.Series(values).rolling(window), how)().to_numpy()
+    if values.ndim != 2 or how not in _ROLLING_SCALE_POWER or np.isinf(values).any():
+        return _values(getattr(_frame(values).rolling(window), how)())
+    return _rolling_rows(values, window, how)
+
+
+def _rolling_rows(values: np.ndarray, window: int, how: str) -> np.ndarray:
+    """Rolling statistic of every row of a 2-D array in a single pandas pass.
+
+    pandas rolls a DataFrame one column at a time, which dominates the cost for
+    hundreds of short rows. Instead the rows are laid end to end in one Series
+    with `window` NaNs before each, so no window spans two rows and pandas'
+    running sums restart from an empty window. Each row is first divided by its
+    largest magnitude, so those sums cannot carry the rounding error of a
+    large-valued row into a small-valued one.
+    """
+    rows, n = values.shape
+    with warnings.catch_warnings():
+        # All-NaN rows just stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        scale = np.nanmax(np.abs(values), axis=1, keepdims=True)
+    scale[~(scale > 0)] = 1.0
+
+    padded = np.full((rows, window + n), np.nan)
+    padded[:, window:] = values / scale
+    stat = getattr(pd.Series(padded.ravel()).rolling(window), how)().to_numpy()
+    stat = stat.reshape(rows, window + n)[:, window:]
+    return stat * scale ** _ROLLING_SCALE_POWER[how]
+
+
+def _lagged(values: np.ndarray, lag: int = 1) -> np.ndarray:
+    """Values shifted forward by `lag` bars along the last axis, NaN-padded."""
+    lagged = np.full_like(values, np.nan)
+    lagged[..., lag:] = values[..., :-lag]
+    return lagged
+
+
+def hurst_slope(lags: np.ndarray, lag_std: np.ndarray) -> np.ndarray:
+    """Least-squares slope of log(sqrt(std)) against log(lag) along the last axis.
+
+    Args:
+        lags: Lags, shape (n_lags,)
+        lag_std: Standard deviation of the lagged differences, shape (..., n_lags)
+
+    Returns:
+        np.ndarray: Hurst exponent for each leading index (NaN where any std is NaN)
+    """
+    log_lags = np.log(lags)
+    x = log_lags - log_lags.mean()
+    # Small epsilon avoids log(0) on flat stretches
+    log_tau = np.log(np.fmax(np.sqrt(lag_std), 1e-8))
+    with np.errstate(invalid="ignore"):
+        return (log_tau - log_tau.mean(axis=-1, keepdims=True)) @ x / (x @ x)
+
+
+class IndicatorEngine:
+    """Single-pass indicator engine shared by the technical strategies.
+
+    Each OHLCV column is copied once, on first use, into a contiguous float64 array. Every
+    indicator is a memoized method that pulls its inputs from other indicators,
+    so the calls form a dependency graph in which each shared intermediate
+    (returns, EMAs, rolling windows, true range, ...) is computed exactly once,
+    however many strategies ask for it. Results are NumPy arrays aligned with
+    the price frame; use series() to wrap one back into a pandas Series.
+
+    The engine also accepts a panel: a dict of 2-D (symbol, time) arrays, one per
+    OHLCV column. Every indicator except hurst() then runs along the time axis
+    for all symbols at once, and row i of each result is what an engine over
+    symbol i alone would return.
+    """
+
+    def __init__(self, prices_df: Union[pd.DataFrame, dict]):
+        """Initialize the engine.
+
+        Args:
+            prices_df: DataFrame with open, close, high, low and volume columns,
+                or a dict of (symbol, time) arrays with those keys
+        """
+        self.index = getattr(prices_df, "index", None)
+        self._prices = prices_df
+        self._cache = {}
+
+    @_cached
+    def column(self, name: str) -> np.ndarray:
+        """Return a price column as a contiguous float64 array."""
+        return np.ascontiguousarray(self._prices[name], dtype=np.float64)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column("close")
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column("high")
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column("low")
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column("volume")
+
+    def series(self, values: np.ndarray, name: Optional[str] = None) -> pd.Series:
+        """Wrap an indicator array into a Series indexed like the price frame."""
+        return pd.Series(values, index=self.index, name=name)
+
+    def compute(self, *requests: tuple) -> list:
+        """Compute several indicators in one pass.
+
+        Args:
+            *requests: (indicator name, *params) tuples, e.g. ("rsi", 14)
+
+        Returns:
+            list: One result per request, in order
+        """
+        return [getattr(self, name)(*params) for name, *params in requests]
+
+    def _base(self, name: str) -> np.ndarray:
+        if name in ("open", "close", "high", "low", "volume"):
+            return self.column(name)
+        return getattr(self, name)()
+
+    # Shared intermediates
+
+    @_cached
+    def delta(self) -> np.ndarray:
+        return self.close - _lagged(self.close)
+
+    @_cached
+    def returns(self) -> np.ndarray:
+        return self.close / _lagged(self.close) - 1
+
+    @_cached
+    def gain(self) -> np.ndarray:
+        delta = self.delta()
+        return np.where(delta > 0, delta, 0.0)
+
+    @_cached
+    def loss(self) -> np.ndarray:
+        delta = self.delta()
+        return np.where(delta < 0, -delta, 0.0)
+
+    @_cached
+    def rolling(self, name: str, window: int, how: str) -> np.ndarray:
+        """Rolling mean/std/sum/skew/kurt of a base series or a derived one (e.g. 'returns')."""
+        return rolling_stat(self._base(name), window, how)
+
+    @_cached
+    def true_range(self) -> np.ndarray:
+        prev_close = _lagged(self.close)
+        # fmax skips NaN like DataFrame.max(axis=1), so the first bar is high - low
+        return np.fmax(
+            self.high - self.low,
+            np.fmax(np.abs(self.high - prev_close), np.abs(self.low - prev_close)),
+        )
+
+    # Indicators
+
+    @_cached
+    def ema(self, span: int) -> np.ndarray:
+        return ewm_mean(self.close, span)
+
+    @_cached
+    def macd(self) -> tuple[np.ndarray, np.ndarray]:
+        macd_line = self.ema(12) - self.ema(26)
+        signal_line = ewm_mean(macd_line, 9)
+        return macd_line, signal_line
+
+    @_cached
+    def rsi(self, period: int = 14) -> np.ndarray:
+        avg_gain = self.rolling("gain", period, "mean")
+        avg_loss = self.rolling("loss", period, "mean")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+            return 100 - (100 / (1 + rs))
+
+    @_cached
+    def bollinger_bands(self, window: int = 20) -> tuple[np.ndarray, np.ndarray]:
+        sma = self.rolling("close", window, "mean")
+        std_dev = self.rolling("close", window, "std")
+        return sma + (std_dev * 2), sma - (std_dev * 2)
+
+    @_cached
+    def atr(self, period: int = 14) -> np.ndarray:
+        return self.rolling("true_range", period, "mean")
+
+    @_cached
+    def adx(self, period: int = 14) -> dict[str, np.ndarray]:
+        up_move = self.high - _lagged(self.high)
+        down_move = _lagged(self.low) - self.low
+
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+        tr_ewm = ewm_mean(self.true_range(), period, adjust=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            plus_di = 100 * (ewm_mean(plus_dm, period, adjust=True) / tr_ewm)
+            minus_di = 100 * (ewm_mean(minus_dm, period, adjust=True) / tr_ewm)
+            dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        adx = ewm_mean(dx, period, adjust=True)
+        return {"adx": adx, "+di": plus_di, "-di": minus_di}
+
+    @_cached
+    def obv(self) -> np.ndarray:
+        delta = self.delta()
+        # Signed volume: +volume on up candles, -volume on down candles, 0 otherwise
+        # (the first candle has no delta and counts as 0)
+        signed_volume = np.where(
+            delta > 0, self.volume, np.where(delta < 0, -self.volume, 0.0)
+        )
+        return np.cumsum(signed_volume, axis=-1)
+
+    @_cached
+    def historical_volatility(self, window: int = 21) -> np.ndarray:
+        return self.rolling("returns", window, "std") * math.sqrt(252)
+
+    @_cached
+    def hurst(self, max_lag: int = 20) -> float:
+        """Hurst exponent of the whole close series over lags 2..max_lag-1.
+
+        Row t of a strided (n, max_lag) view holds close[t:t+max_lag], so the
+        differences for every lag come out of one subtraction; positions past the
+        end are NaN-padded and skipped by nanstd.
+        """
+        lags = np.arange(2, max_lag)
+        if len(self.close) <= lags[-1]:
+            return 0.5
+        padded = np.concatenate([self.close, np.full(max_lag - 1, np.nan)])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, max_lag)
+        lag_std = np.nanstd(windows[:, lags] - windows[:, :1], axis=0)
+        hurst = float(hurst_slope(lags, lag_std))
+        # Return 0.5 (random walk) if calculation fails
+        return hurst if math.isfinite(hurst) else 0.5
+
+    @_cached
+    def rolling_hurst(self, window: int = 63, max_lag: int = 20) -> np.ndarray:
+        """Hurst exponent over each trailing window of `window` closes.
+
+        For every lag the window holds window - lag differences, whose rolling
+        variance comes from cumulative sums of the (demeaned) differences and their
+        squares, so the cost is O(n * n_lags) whatever the window length.
+        """
+        lags = np.arange(2, max_lag)
+        close = self.close
+        n = close.shape[-1]
+        result = np.full(close.shape, np.nan)
+        if window <= lags[-1] or n < window:
+            return result
+
+        # One contiguous block per lag; hurst_slope takes the lags on the last axis
+        lag_var = np.empty((len(lags),) + close.shape[:-1] + (n - window + 1,))
+        zeros = np.zeros(close.shape[:-1] + (1,))
+        for column, lag in enumerate(lags):
+            diffs = close[..., lag:] - close[..., :-lag]
+            diffs = diffs - diffs.mean(axis=-1, keepdims=True)
+            count = window - lag
+            sums = np.concatenate([zeros, np.cumsum(diffs, axis=-1)], axis=-1)
+            squares = np.concatenate([zeros, np.cumsum(diffs * diffs, axis=-1)], axis=-1)
+            # Window ending at close[t] covers diffs[t - window + 1 .. t - lag]
+            s1 = sums[..., count:] - sums[..., :-count]
+            s2 = squares[..., count:] - squares[..., :-count]
+            lag_var[column] = np.maximum(s2 / count - (s1 / count) ** 2, 0.0)
+
+        lag_std = np.sqrt(np.moveaxis(lag_var, 0, -1), order="C")
+        result[..., window - 1 :] = hurst_slope(lags, lag_std)
+        return result
@@ -2,25 +2,25 @@ from langchain_openai.chat_models import ChatOpenAI
 from langchain_core.messages import HumanMessage
 
 from agents.state import AgentState, show_agent_reasoning
-from tools.api import get_price_API_HYPERLIQUID, get_LS_OI_Copin
+from tools import http_client
+from tools.api import aget_price_API_HYPERLIQUID, aget_LS_OI_Copin
 
+import asyncio
 from datetime import datetime
 import json
 
 
-def check_data_valid(crypto, start_date, end_date):
+def resolve_date_range(start_date, end_date):
     """
-    Validate if market data is available for the given crypto and date range.
+    Fill in the default analysis window.
 
     Args:
-        crypto (str): Cryptocurrency symbol
         start_date (str, optional): Start date in 'YYYY-MM-DD' format. If None, defaults to 1 month before end_date
         end_date (str, optional): End date in 'YYYY-MM-DD' format. If None, defaults to current date
 
     Returns:
-        bool: True if both price and insider trade data are available, False otherwise
+        tuple: (start_date, end_date) as 'YYYY-MM-DD' strings
     """
-    # Set default dates
     end_date = end_date or datetime.now().strftime("%Y-%m-%d")
     if not start_date:
         # Calculate 1 months before end_date
@@ -33,20 +33,54 @@ def check_data_valid(crypto, start_date, end_date):
             )
         )
         start_date = start_date.strftime("%Y-%m-%d")
-    else:
-        start_date = start_date
+    return start_date, end_date
+
+
+def check_data_valid(crypto, start_date, end_date, return_data=False):
+    """
+    Validate if market data is available for the given crypto and date range.
+
+    Args:
+        crypto (str): Cryptocurrency symbol
+        start_date (str, optional): Start date in 'YYYY-MM-DD' format. If None, defaults to 1 month before end_date
+        end_date (str, optional): End date in 'YYYY-MM-DD' format. If None, defaults to current date
+        return_data (bool, optional): Return the fetched data instead of a flag. Defaults to False
+
+    Returns:
+        bool: True if both price and insider trade data are available, False otherwise
+        dict or None: With return_data, the data to merge into the graph state's "data"
+            (prices, insider_trades, start_date, end_date) so market_data_agent does not
+            fetch it again, or None if the data is invalid
+    """
+    return http_client.run_sync(acheck_data_valid(crypto, start_date, end_date, return_data))
 
-    prices = get_price_API_HYPERLIQUID(
-        pair=crypto,
-        open_time=start_date,
-        close_time=end_date,
+
+async def acheck_data_valid(crypto, start_date, end_date, return_data=False):
+    """
+    Async version of check_data_valid; the price and open interest requests run concurrently.
+    """
+    start_date, end_date = resolve_date_range(start_date, end_date)
+
+    prices, insider_trades = await asyncio.gather(
+        aget_price_API_HYPERLIQUID(
+            pair=crypto,
+            open_time=start_date,
+            close_time=end_date,
+        ),
+        aget_LS_OI_Copin(pair=crypto),
     )
-    insider_trades = get_LS_OI_Copin(pair=crypto)
     if isinstance(prices, str) | isinstance(insider_trades, str):
         print("Data invalid")
-        return False
-    else:
+        return None if return_data else False
+
+    if not return_data:
         return True
+    return {
+        "prices": prices,
+        "insider_trades": insider_trades,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
 
 
 def market_data_agent(state: AgentState):
@@ -58,6 +92,10 @@ def market_data_agent(state: AgentState):
     2. Fetches historical price data from HyperLiquid
     3. Retrieves long/short open interest data from Copin
 
+    Steps 2 and 3 run concurrently; this is the synchronous entry point for
+    amarket_data_agent. Data already fetched by check_data_valid(return_data=True)
+    and merged into the state is reused instead of being fetched again.
+
     Args:
         state (AgentState): Current state containing:
             - messages: List of conversation messages
@@ -77,39 +115,40 @@ def market_data_agent(state: AgentState):
                 - insider_trades: Long/short open interest data
             - metadata: Original metadata
     """
+    return http_client.run_sync(amarket_data_agent(state))
+
+
+async def amarket_data_agent(state: AgentState):
+    """
+    Async version of market_data_agent.
+
+    The price request and both Copin open interest queries are issued at once, so
+    the stage takes as long as the slowest call rather than the sum of all three.
+    """
     messages = state["messages"]
     data = state["data"]
     metadata = state["metadata"]
     show_reasoning = metadata.get("show_reasoning", True)
     
-    # Set default dates
-    end_date = data["end_date"] or datetime.now().strftime("%Y-%m-%d")
-    if not data["start_date"]:
-        # Calculate 1 months before end_date
-        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d")
-        start_date = (
-            end_date_obj.replace(month=end_date_obj.month - 1)
-            if end_date_obj.month > 1
-            else end_date_obj.replace(
-                year=end_date_obj.year - 1, month=end_date_obj.month + 11
-            )
-        )
-        start_date = start_date.strftime("%Y-%m-%d")
+    start_date, end_date = resolve_date_range(data["start_date"], data["end_date"])
+
+    if "prices" in data and "insider_trades" in data:
+        # Already fetched while validating the request
+        prices = data["prices"]
+        insider_trades = data["insider_trades"]
     else:
-        start_date = data["start_date"]
-
-    # Get the historical price data
-    print(f"Fetching price data for {data['crypto']} from {start_date} to {end_date}")
-    prices = get_price_API_HYPERLIQUID(
-        pair=data["crypto"],
-        open_time=start_date,
-        close_time=end_date,
-    )
+        # Get the historical price data and the insider trades concurrently
+        print(f"Fetching price data for {data['crypto']} from {start_date} to {end_date}")
+        print(f"Fetching insider trades for {data['crypto']}")
+        prices, insider_trades = await asyncio.gather(
+            aget_price_API_HYPERLIQUID(
+                pair=data["crypto"],
+                open_time=start_date,
+                close_time=end_date,
+            ),
+            aget_LS_OI_Copin(pair=data["crypto"]),
+        )
 
-    # Get the insider trades
-    print(f"Fetching insider trades for {data['crypto']}")
-    insider_trades = get_LS_OI_Copin(pair=data["crypto"])
-    
     # Handle error case from get_LS_OI_Copin
     if isinstance(insider_trades, str):
         insider_trades = (0, 0)  # Default to no signals if error
@@ -1,56 +1,42 @@
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai.chat_models import ChatOpenAI
+from pydantic import ValidationError
 from config.analysis_weights import (
     TECHNICAL_ANALYSIS_WEIGHT,
     SENTIMENT_ANALYSIS_WEIGHT,
     SOCIAL_MONITOR_WEIGHT,
 )
 
+from agents.decision_schema import validate_decision
 from agents.state import AgentState, show_agent_reasoning
+from tools import llm_client
+from tools.decision_cache import DecisionCache, canonical_key
+import asyncio
+import json
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 dotenv_path = os.path.join(os.path.dirname(__file__), "../../.env")
 
 load_dotenv(dotenv_path)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+LLM_MODEL = "gpt-4o-mini"
+LLM_TEMPERATURE = 0.3
+# LLM calls per decision; the model is asked again only when its reply violates the schema
+DECISION_MAX_ATTEMPTS = int(os.getenv("DECISION_MAX_ATTEMPTS", 3))
 
+# How the decision is made, unless a run sets metadata["decision_engine"]:
+# "llm"           the LLM makes the decision (default)
+# "rules"         closed-form decision from the agent signals (rule_based_decision)
+# "rules+explain" closed-form decision, with the reasoning written by the LLM
+DECISION_ENGINES = ("llm", "rules", "rules+explain")
+PORTFOLIO_DECISION_ENGINE = os.getenv("PORTFOLIO_DECISION_ENGINE", "llm")
 
-##### Portfolio Management Agent #####
-def portfolio_management_agent(state: AgentState):
-    """Makes final trading decisions and generates orders"""
-    show_reasoning = state["metadata"]["show_reasoning"]
-    portfolio = state["data"]["portfolio"]
-
-    # Get all agent messages
-    technical_message = next(
-        msg for msg in state["messages"] if msg.name == "technical_analyst_agent"
-    )
-    sentiment_message = next(
-        msg for msg in state["messages"] if msg.name == "sentiment_agent"
-    )
-    social_message = next(
-        msg for msg in state["messages"] if msg.name == "social_monitor_agent"
-    )
-    risk_message = next(
-        msg for msg in state["messages"] if msg.name == "risk_management_agent"
-    )
+# Weighted signal scores closer to zero than this are not traded
+NEUTRAL_SCORE_THRESHOLD = 0.1
 
-    # Log the input signals
-    print("\nPortfolio Manager Input Signals:")
-    print("Technical Analysis:", technical_message.content)
-    print("Sentiment Analysis:", sentiment_message.content)
-    print("Social Monitoring:", social_message.content)
-    print("Risk Management:", risk_message.content)
-
-    # Create the prompt template
-    template = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                """You are a portfolio manager making final trading decisions.
+SYSTEM_PROMPT = """You are a portfolio manager making final trading decisions.
                 Your job is to make a trading decision based on the team's analysis while strictly adhering
                 to risk management constraints.
 
@@ -107,11 +93,9 @@ def portfolio_management_agent(state: AgentState):
                 Trading Rules:
                 - Never exceed risk management position limits
                 - Quantity must be ≤ current position for sells
-                - Quantity must be ≤ max_position_margin from risk management""",
-            ),
-            (
-                "human",
-                """Based on the team's analysis below, make your trading decision.
+                - Quantity must be ≤ max_position_margin from risk management"""
+
+HUMAN_PROMPT = """Based on the team's analysis below, make your trading decision.
 
                 Technical Analysis Trading Signal: {technical_message}
                 Sentiment Analysis Trading Signal: {sentiment_message}
@@ -131,37 +115,396 @@ def portfolio_management_agent(state: AgentState):
                 For the reasoning field, use bullet points separated by newlines (\\n).
                 The action must be either "long" or "short".
                 All numeric values should be formatted as strings with appropriate units (% for percentages).
-                """,
+                """
+
+EXPLAIN_SYSTEM_PROMPT = """You are a portfolio manager explaining a trading decision that has
+                already been made by the fund's rules. Do not change or second-guess the decision;
+                explain how the team's signals and the risk limits lead to it.
+
+                Return only the explanation as bullet points separated by newlines (\\n), e.g.
+                "• Point 1\\n• Point 2\\n• Point 3". Do not return JSON or markdown."""
+
+EXPLAIN_HUMAN_PROMPT = """Decision: {decision}
+
+                Technical Analysis Trading Signal: {technical_message}
+                Sentiment Analysis Trading Signal: {sentiment_message}
+                Social Monitoring Trading Signal: {social_message}
+                Risk Management : {risk_message}
+
+                Current portfolio:
+                Cash: {portfolio_cash}
+                Leverage: {portfolio_leverage}
+                Risk: {portfolio_risk}
+                """
+
+PROMPTS = {
+    "llm": (SYSTEM_PROMPT, HUMAN_PROMPT),
+    "rules+explain": (EXPLAIN_SYSTEM_PROMPT, EXPLAIN_HUMAN_PROMPT),
+}
+
+# Templates are compiled once at import and reused for every call
+PROMPT_TEMPLATES = {
+    engine: ChatPromptTemplate.from_messages(
+        [
+            ("system", system_prompt),
+            ("human", human_prompt),
+        ]
+    )
+    for engine, (system_prompt, human_prompt) in PROMPTS.items()
+}
+
+# Decisions for identical agent inputs are reused instead of calling the LLM again
+decision_cache = DecisionCache()
+
+
+##### Portfolio Management Agent #####
+def portfolio_management_agent(state: AgentState):
+    """Makes final trading decisions and generates orders
+
+    The decision engine is state["metadata"]["decision_engine"], falling back to
+    PORTFOLIO_DECISION_ENGINE (see DECISION_ENGINES).
+    """
+    steps = _decision_steps(state)
+    request, update = _advance(steps)
+    while request is not None:
+        prompt, json_mode = request
+        result = llm_client.invoke(prompt, LLM_MODEL, LLM_TEMPERATURE, json_mode=json_mode)
+        request, update = _advance(steps, result.content)
+    return update
+
+
+async def aportfolio_management_agent(state: AgentState):
+    """Async version of portfolio_management_agent; awaits the LLM call instead of blocking a thread.
+
+    Everything between LLM calls (the SQLite decision cache, prompt building,
+    validation) runs in the loop's default executor, so the event loop only
+    waits on the LLM.
+    """
+    steps = _decision_steps(state)
+    request, update = await asyncio.to_thread(_advance, steps)
+    while request is not None:
+        prompt, json_mode = request
+        result = await llm_client.ainvoke(
+            prompt, LLM_MODEL, LLM_TEMPERATURE, json_mode=json_mode
+        )
+        request, update = await asyncio.to_thread(_advance, steps, result.content)
+    return update
+
+
+def _advance(steps, content: Optional[str] = None):
+    """Run the decision flow up to its next LLM call.
+
+    Args:
+        steps: _decision_steps() generator
+        content: Reply to the previous LLM request (None to start)
+
+    Returns:
+        tuple: (next (prompt, json_mode) request, None), or (None, state update)
+            once the decision is made
+    """
+    try:
+        return steps.send(content), None
+    except StopIteration as done:
+        return None, done.value
+
+
+def _decision_steps(state: AgentState):
+    """Make the portfolio decision, leaving the LLM calls to the caller.
+
+    Generator shared by the sync and async agents: it yields (prompt, json_mode)
+    for each LLM call it needs and expects the reply content to be sent back.
+    Cached responses are reused without yielding.
+
+    Returns:
+        dict: State update with the portfolio management message (as StopIteration.value)
+    """
+    engine = get_decision_engine(state)
+    if engine == "rules":
+        return _decision_update(state, json.dumps(rule_based_decision(state)))
+
+    inputs = portfolio_prompt_inputs(state)
+    if engine == "rules+explain":
+        decision = rule_based_decision(state)
+        inputs["decision"] = json.dumps(decision)
+        cache_key = decision_cache_key(inputs, engine)
+        reasoning = decision_cache.get(cache_key)
+        if reasoning is None:
+            content = yield build_portfolio_prompt(inputs, engine), False
+            reasoning = content.strip()
+            decision_cache.set(cache_key, reasoning)
+        return _decision_update(state, json.dumps({**decision, "reasoning": reasoning}))
+
+    max_position_margin = _max_position_margin(inputs)
+    cache_key = decision_cache_key(inputs, engine)
+    decision = _cached_decision(cache_key, max_position_margin)
+
+    if decision is None:
+        # Invoke the LLM, asking again while the reply violates the schema
+        messages = build_portfolio_prompt(inputs, engine).to_messages()
+        for attempt in range(1, DECISION_MAX_ATTEMPTS + 1):
+            content = yield messages, True
+            decision, messages = _check_llm_decision(
+                content, max_position_margin, messages, attempt
+            )
+            if decision is not None:
+                decision_cache.set(cache_key, decision.model_dump_json())
+                break
+        else:
+            return _decision_update(state, _fallback_decision(state))
+
+    return _decision_update(state, decision.model_dump_json())
+
+
+def _max_position_margin(inputs: dict) -> Optional[float]:
+    try:
+        return float(json.loads(inputs["risk_message"])["max_position_margin"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _cached_decision(cache_key: str, max_position_margin: Optional[float]):
+    """Return the cached decision if there is one and it still validates."""
+    content = decision_cache.get(cache_key)
+    if content is None:
+        return None
+    try:
+        decision = validate_decision(content, max_position_margin)
+    except ValidationError:
+        return None
+    print("\nReusing cached portfolio decision")
+    return decision
+
+
+def _check_llm_decision(content: str, max_position_margin, messages: list, attempt: int):
+    """Validate an LLM reply against the decision schema.
+
+    Returns:
+        tuple: (TradingDecision or None, messages for the next attempt). On a schema
+            violation the reply and the validation errors are appended to the
+            conversation so the model can correct itself.
+    """
+    try:
+        return validate_decision(content, max_position_margin), messages
+    except ValidationError as e:
+        print(
+            f"Invalid portfolio decision (attempt {attempt}/{DECISION_MAX_ATTEMPTS}): "
+            f"{e.error_count()} error(s)"
+        )
+        return None, messages + [
+            AIMessage(content=content),
+            HumanMessage(
+                content="Your reply does not match the required JSON structure:\n"
+                f"{e}\nReturn the corrected JSON object only."
             ),
         ]
+
+
+def _fallback_decision(state: AgentState) -> str:
+    """Hold when the LLM never produced a valid decision."""
+    decision = rule_based_decision(state)
+    decision["decision"].update(action="hold", quantity=0.0)
+    decision["reasoning"] = (
+        f"• No valid LLM decision after {DECISION_MAX_ATTEMPTS} attempts; holding"
     )
+    return json.dumps(decision)
 
-    # Generate the prompt
-    prompt = template.invoke(
+
+def get_decision_engine(state: AgentState) -> str:
+    """Return the decision engine selected for this run."""
+    engine = state["metadata"].get("decision_engine") or PORTFOLIO_DECISION_ENGINE
+    if engine not in DECISION_ENGINES:
+        raise ValueError(
+            f"Unknown decision engine {engine!r}, expected one of {', '.join(DECISION_ENGINES)}"
+        )
+    return engine
+
+
+def _parse_confidence(confidence) -> float:
+    """Convert a confidence such as "62.5%", 62.5 or 0.625 to a fraction in [0, 1]."""
+    try:
+        value = float(str(confidence).strip().rstrip("%"))
+    except ValueError:
+        return 0.5
+    if (isinstance(confidence, str) and confidence.strip().endswith("%")) or value > 1:
+        value /= 100
+    return min(max(value, 0.0), 1.0)
+
+
+def _signal_direction(signal) -> int:
+    signal = str(signal).lower()
+    if signal in ("bullish", "buy", "long"):
+        return 1
+    if signal in ("bearish", "sell", "short"):
+        return -1
+    return 0
+
+
+def rule_based_decision(state: AgentState) -> dict:
+    """Compute the trading decision in closed form from the agent signals.
+
+    Each analyst signal is mapped to +1 (bullish), 0 (neutral) or -1 (bearish) and
+    weighted by its confidence and its weight in config/analysis_weights.py. The
+    weighted average is the score in [-1, 1]. Its sign picks the side, and its
+    magnitude is both the confidence and the fraction of the risk manager's
+    max_position_margin that is used, so the quantity never exceeds the risk
+    limit. Scores within NEUTRAL_SCORE_THRESHOLD of zero hold. Stop loss, take
+    profit and volatility are taken from the risk manager.
+
+    Args:
+        state (AgentState): State holding the technical, sentiment, social and risk messages
+
+    Returns:
+        dict: Decision in the same format as the LLM's (portfolio, decision,
+            agent_signals, reasoning)
+    """
+    portfolio = state["data"]["portfolio"]
+    contents = {}
+    for msg in state["messages"]:
+        if msg.name in (
+            "technical_analyst_agent",
+            "sentiment_agent",
+            "social_monitor_agent",
+            "risk_management_agent",
+        ) and msg.name not in contents:
+            contents[msg.name] = json.loads(msg.content)
+    risk = contents["risk_management_agent"]
+
+    signals = [
+        ("Technical Analysis", contents["technical_analyst_agent"], TECHNICAL_ANALYSIS_WEIGHT),
+        ("Sentiment Analysis", contents["sentiment_agent"], SENTIMENT_ANALYSIS_WEIGHT),
+        ("Social Monitoring", contents["social_monitor_agent"], SOCIAL_MONITOR_WEIGHT),
+    ]
+    total_weight = sum(weight for _, _, weight in signals)
+    score = sum(
+        _signal_direction(content.get("signal"))
+        * _parse_confidence(content.get("confidence", 0.5))
+        * weight
+        for _, content, weight in signals
+    ) / total_weight
+
+    max_position_margin = float(risk["max_position_margin"])
+    if abs(score) < NEUTRAL_SCORE_THRESHOLD:
+        action, quantity = "hold", 0.0
+    else:
+        action = "long" if score > 0 else "short"
+        quantity = round(max_position_margin * abs(score), 2)
+
+    risk_metrics = risk.get("risk_metrics", {})
+    agent_signals = [
         {
-            "technical_message": technical_message.content,
-            "sentiment_message": sentiment_message.content,
-            "social_message": social_message.content,
-            "risk_message": risk_message.content,
-            "portfolio_cash": f"{portfolio['cash']:.2f}",
-            "portfolio_leverage": f"{portfolio['leverage']:.2f}",
-            "portfolio_risk": f"{portfolio['risk']:.2f}",
+            "agent": agent,
+            "signal": str(content.get("signal", "neutral")).lower(),
+            "confidence": f"{_parse_confidence(content.get('confidence', 0.5)):.1%}",
         }
+        for agent, content, _ in signals
+    ]
+    reasoning = "\n".join(
+        [
+            f"• {signal['agent']} ({weight:.0%} weight): {signal['signal']} at {signal['confidence']} confidence"
+            for signal, (_, _, weight) in zip(agent_signals, signals)
+        ]
+        + [
+            f"• Weighted signal score: {score:+.3f} (|score| < {NEUTRAL_SCORE_THRESHOLD} holds)",
+            f"• Position: {abs(score):.1%} of the max position margin {max_position_margin:,.2f} = {quantity:,.2f}",
+            f"• Stop loss {risk_metrics.get('stop loss', 'n/a')}, take profit {risk_metrics.get('take profit', 'n/a')} from risk management",
+        ]
     )
-    
-    # Invoke the LLM
-    llm = ChatOpenAI(
-        openai_api_key=OPENAI_API_KEY, temperature=0.3, model="gpt-4o-mini"
+
+    return {
+        "portfolio": {
+            "cash": f"{portfolio['cash']:.2f}",
+            "leverage": f"{portfolio['leverage']:.2f}",
+            "risk": f"{portfolio['risk']:.2f}",
+        },
+        "decision": {
+            "action": action,
+            "quantity": quantity,
+            "volatility": risk_metrics.get("volatility"),
+            "stop_loss": risk_metrics.get("stop loss"),
+            "take_profit": risk_metrics.get("take profit"),
+            "confidence": f"{abs(score):.1%}",
+        },
+        "agent_signals": agent_signals,
+        "reasoning": reasoning,
+    }
+
+
+def portfolio_prompt_inputs(state: AgentState) -> dict:
+    """Collect the prompt inputs from the other agents' messages.
+
+    Args:
+        state (AgentState): State holding the technical, sentiment, social and risk messages
+
+    Returns:
+        dict: Values for the prompt template's placeholders
+    """
+    portfolio = state["data"]["portfolio"]
+
+    # Get all agent messages
+    technical_message = next(
+        msg for msg in state["messages"] if msg.name == "technical_analyst_agent"
+    )
+    sentiment_message = next(
+        msg for msg in state["messages"] if msg.name == "sentiment_agent"
     )
-    result = llm.invoke(prompt)
-
-    # Clean up the content to remove any markdown formatting
-    content = result.content.strip()
-    if content.startswith("```json"):
-        content = content[7:]  # Remove ```json prefix
-    if content.endswith("```"):
-        content = content[:-3]  # Remove ``` suffix
-    content = content.strip()  # Remove any extra whitespace
+    social_message = next(
+        msg for msg in state["messages"] if msg.name == "social_monitor_agent"
+    )
+    risk_message = next(
+        msg for msg in state["messages"] if msg.name == "risk_management_agent"
+    )
+
+    # Log the input signals
+    print("\nPortfolio Manager Input Signals:")
+    print("Technical Analysis:", technical_message.content)
+    print("Sentiment Analysis:", sentiment_message.content)
+    print("Social Monitoring:", social_message.content)
+    print("Risk Management:", risk_message.content)
+
+    return {
+        "technical_message": technical_message.content,
+        "sentiment_message": sentiment_message.content,
+        "social_message": social_message.content,
+        "risk_message": risk_message.content,
+        "portfolio_cash": f"{portfolio['cash']:.2f}",
+        "portfolio_leverage": f"{portfolio['leverage']:.2f}",
+        "portfolio_risk": f"{portfolio['risk']:.2f}",
+    }
+
+
+def decision_cache_key(inputs: dict, engine: str = "llm") -> str:
+    """Cache key of an LLM response: the prompt inputs, the prompt text and the model settings."""
+    system_prompt, human_prompt = PROMPTS[engine]
+    return canonical_key(
+        {
+            "inputs": inputs,
+            "system_prompt": system_prompt,
+            "human_prompt": human_prompt,
+            "model": LLM_MODEL,
+            "temperature": LLM_TEMPERATURE,
+        }
+    )
+
+
+def build_portfolio_prompt(inputs: dict, engine: str = "llm"):
+    """Build the portfolio manager prompt.
+
+    Args:
+        inputs (dict): portfolio_prompt_inputs() result (plus "decision" for rules+explain)
+        engine (str): "llm" for the decision prompt, "rules+explain" for the explanation prompt
+
+    Returns:
+        ChatPromptValue: Prompt for the LLM
+    """
+    template = PROMPT_TEMPLATES[engine]
+
+    # Generate the prompt
+    return template.invoke(inputs)
+
+
+def _decision_update(state: AgentState, content: str):
+    """Wrap the decision into the portfolio management message."""
+    show_reasoning = state["metadata"]["show_reasoning"]
 
     # Create the portfolio management message
     message = HumanMessage(
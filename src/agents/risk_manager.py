@@ -34,11 +34,10 @@ def risk_management_agent(state: AgentState):
     leverage = portfolio["leverage"]
     prices_df = data["prices"]
 
-    # 1. Calculate volatility
-    prices_df["returns"] = prices_df["close"].pct_change()
-    prices_df.dropna(inplace=True)
-    prices_df["volatility_24"] = prices_df["returns"].rolling(window=24).std()
-    volatility = prices_df["volatility_24"].mean()
+    # 1. Calculate volatility (the shared prices frame is read-only)
+    returns = prices_df["close"].pct_change().dropna()
+    volatility_24 = returns.rolling(window=24).std()
+    volatility = volatility_24.mean()
 
     # 2. Position Size Limits
     max_loss_cash = cash * max_loss
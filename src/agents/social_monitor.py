@@ -3,13 +3,18 @@ from agents.state import AgentState, show_agent_reasoning
 import json
 import os
 from datetime import datetime, timedelta
-import requests
 from dotenv import load_dotenv
 import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import socket
+import threading
+import asyncio
+from typing import Optional
 import dns.resolver
+import httpx
+from tools import http_client
+from tools.binance_ticker import ticker_snapshot
+from tools.snapshot_store import snapshot_store
+from tools.swr_cache import StaleWhileRevalidateCache
 
 # Load environment variables
 dotenv_path = os.path.join(os.path.dirname(__file__), "../../.env")
@@ -72,9 +77,28 @@ LUNARCRUSH_CONFIG = {
     "min_engagement": 1000
 }
 
+# Social metrics persisted across restarts. Entries older than cache_duration are
+# still served for SOCIAL_CACHE_MAX_STALE more seconds while they are refreshed in
+# the background; after a failed fetch a symbol is retried once update_interval has passed
+SOCIAL_CACHE_PATH = os.environ.get("SOCIAL_CACHE_PATH") or os.path.join(
+    os.path.dirname(__file__), "../../.cache/social_metrics.json"
+)
+SOCIAL_CACHE_MAX_STALE = float(os.environ.get("SOCIAL_CACHE_MAX_STALE", 3600))
+
+social_metrics_cache = StaleWhileRevalidateCache(
+    SOCIAL_CACHE_PATH,
+    ttl=LUNARCRUSH_CONFIG["cache_duration"],
+    stale_ttl=SOCIAL_CACHE_MAX_STALE,
+    retry_interval=LUNARCRUSH_CONFIG["update_interval"],
+)
+
 # Cache for topic mappings
 _topic_cache = {}
 
+# Process-wide coins/list cache: the records, their symbol index and when they were fetched
+_coins_cache = {"coins": None, "index": None, "fetched_at": 0.0}
+_coins_lock = threading.Lock()
+
 def resolve_dns(hostname):
     """
     Attempt to resolve DNS for a hostname with multiple DNS servers
@@ -98,80 +122,121 @@ def resolve_dns(hostname):
             continue
     return None
 
-def create_session_with_retries():
-    """Create a requests session with retry logic"""
-    session = requests.Session()
-    
-    # Configure retry strategy with more specific status codes
-    retries = Retry(
-        total=3,  # Number of retries
-        backoff_factor=0.5,  # Wait 0.5, 1, 2 seconds between retries
-        status_forcelist=[408, 429, 500, 502, 503, 504],
-        allowed_methods=["GET"],
-        respect_retry_after_header=True,
-        raise_on_status=True
-    )
-    
-    # Configure the adapter with longer timeouts
-    adapter = HTTPAdapter(
-        max_retries=retries,
-        pool_connections=10,
-        pool_maxsize=10,
-        pool_block=False
-    )
-    
-    # Mount the adapter for both HTTP and HTTPS
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    return session
-
 def extract_hostname(url):
     """Extract hostname from URL"""
     from urllib.parse import urlparse
     return urlparse(url).netloc
 
-def get_coin_metrics(symbol: str):
-    """
-    Fetch AltRank and Social Dominance from LunarCrush coins/list endpoint
-    """
+def _fetch_coins_list() -> Optional[list]:
+    """Download the LunarCrush coins/list endpoint."""
     if not LUNARCRUSH_API_KEY:
         print("Warning: LUNARCRUSH_API_KEY not found in environment variables")
         return None
-    
-    session = create_session_with_retries()
-    
+
     try:
-        # Use the /coins/list endpoint
         endpoint = f"{LUNARCRUSH_API_URL}/coins/list/v1"
-        print(f"\nFetching coin metrics from: {endpoint}")
-        
+        print(f"\nFetching coin list from: {endpoint}")
+
         headers = {
             'Authorization': f'Bearer {LUNARCRUSH_API_KEY}',
             'Accept': 'application/json'
         }
-        
-        response = session.get(
+
+        response = http_client.get(
             endpoint,
             headers=headers,
             timeout=10,
             verify=True
         )
-        
+
         response.raise_for_status()
         data = response.json()
-        
+
         if not data or "data" not in data:
             print("No data found in coins API response")
             return None
-            
+        return data["data"]
+
+    except Exception as e:
+        print(f"Error fetching coin list: {str(e)}")
+        return None
+
+def get_coins_list() -> Optional[list]:
+    """
+    Return the LunarCrush coins/list records, downloaded at most once per
+    LUNARCRUSH_CONFIG["cache_duration"] seconds per process.
+
+    Concurrent callers wait for a single download instead of starting their own.
+
+    Returns:
+        list | None: Coin records, or None if the list is unavailable
+    """
+    with _coins_lock:
+        age = time.monotonic() - _coins_cache["fetched_at"]
+        if _coins_cache["coins"] is None or age > LUNARCRUSH_CONFIG["cache_duration"]:
+            coins = _fetch_coins_list()
+            if coins is None:
+                # Keep serving the previous list, if any, while the API is failing
+                return _coins_cache["coins"]
+            coins_index = {}
+            for coin in coins:
+                # Keep the first record per symbol, like the linear scans this replaces
+                if coin.get("symbol"):
+                    coins_index.setdefault(coin["symbol"].upper(), coin)
+            _coins_cache.update(
+                coins=coins, index=coins_index, fetched_at=time.monotonic()
+            )
+        return _coins_cache["coins"]
+
+def get_coins_index() -> Optional[dict]:
+    """
+    Return the cached LunarCrush coins list indexed by symbol (see get_coins_list).
+
+    Returns:
+        dict | None: Upper-case symbol -> coin record, or None if the list is unavailable
+            (always None in snapshot replay mode, which serves recorded metrics instead)
+    """
+    if snapshot_store.mode == "replay":
+        return None
+    if get_coins_list() is None:
+        return None
+    return _coins_cache["index"]
+
+def _coins_cache_fresh() -> bool:
+    return (
+        _coins_cache["coins"] is not None
+        and time.monotonic() - _coins_cache["fetched_at"] <= LUNARCRUSH_CONFIG["cache_duration"]
+    )
+
+async def aget_coins_list() -> Optional[list]:
+    """Async version of get_coins_list; a cache miss downloads in a worker thread."""
+    if _coins_cache_fresh():
+        return _coins_cache["coins"]
+    return await asyncio.to_thread(get_coins_list)
+
+async def aget_coins_index() -> Optional[dict]:
+    """Async version of get_coins_index; a cache miss downloads in a worker thread."""
+    if _coins_cache_fresh() and snapshot_store.mode != "replay":
+        return _coins_cache["index"]
+    return await asyncio.to_thread(get_coins_index)
+
+def get_coin_metrics(symbol: str, coins_index: Optional[dict] = None):
+    """
+    Fetch AltRank and Social Dominance from LunarCrush coins/list endpoint
+
+    Args:
+        symbol: Cryptocurrency symbol
+        coins_index: Prefetched get_coins_index() result; fetched if not given
+    """
+    try:
+        if coins_index is None:
+            coins_index = get_coins_index()
+        if coins_index is None:
+            return None
+
         # Find the coin in the list
-        coin_data = None
-        for coin in data["data"]:
-            if coin.get("symbol") == symbol.upper():
-                coin_data = coin
-                break
-        
+        coin_data = coins_index.get(symbol.upper())
+
         if not coin_data:
             print(f"No coin data found for {symbol}")
             return None
@@ -192,10 +257,8 @@ def get_coin_metrics(symbol: str):
         print(f"Error fetching coin metrics: {str(e)}")
         return None
 
-def get_topic_for_symbol(symbol: str, session) -> str | None:
-    """Get the topic name for a symbol, using cache or fetching from API."""
-    symbol = symbol.upper()
-    
+def _known_topic(symbol: str) -> Optional[str]:
+    """Topic of a symbol that is cached or hardcoded, without the coins list."""
     # Check cache first
     if symbol in _topic_cache:
         return _topic_cache[symbol]
@@ -204,35 +267,28 @@ def get_topic_for_symbol(symbol: str, session) -> str | None:
     if symbol in CRYPTO_TOPIC_MAP:
         _topic_cache[symbol] = CRYPTO_TOPIC_MAP[symbol]
         return _topic_cache[symbol]
+    return None
+
+def get_topic_for_symbol(symbol: str, coins_index: Optional[dict] = None) -> Optional[str]:
+    """Get the topic name for a symbol, using cache or the coins list."""
+    symbol = symbol.upper()
+    topic = _known_topic(symbol)
+    if topic:
+        return topic
     
     try:
-        # Fetch from coins list API
-        endpoint = f"{LUNARCRUSH_API_URL}/coins/list/v1"
-        headers = {
-            'Authorization': f'Bearer {LUNARCRUSH_API_KEY}',
-            'Accept': 'application/json'
-        }
-        
-        response = session.get(
-            endpoint,
-            headers=headers,
-            timeout=10,
-            verify=True
-        )
-        
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data or "data" not in data:
+        # Look the coin up in the coins list
+        if coins_index is None:
+            coins_index = get_coins_index()
+        if coins_index is None:
             return None
         
-        # Find the coin in the list
-        for coin in data["data"]:
-            if coin.get("symbol") == symbol:
-                # Use name as topic, lowercase and hyphenated
-                topic = coin.get("name", "").lower().replace(" ", "-")
-                _topic_cache[symbol] = topic
-                return topic
+        coin = coins_index.get(symbol)
+        if coin:
+            # Use name as topic, lowercase and hyphenated
+            topic = coin.get("name", "").lower().replace(" ", "-")
+            _topic_cache[symbol] = topic
+            return topic
         
         # Fallback: use symbol itself as topic
         fallback = symbol.lower()
@@ -244,65 +300,113 @@ def get_topic_for_symbol(symbol: str, session) -> str | None:
         return None
 
 def get_price_change_24h(symbol: str) -> float:
-    """Fetch 24h price change percentage from Binance API"""
-    try:
-        # Use Binance API to get 24h ticker data
-        url = f"https://api.binance.com/api/v3/ticker/24hr?symbol={symbol}USDT"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return float(data.get("priceChangePercent", 0))
-    except Exception as e:
-        print(f"Error fetching price change from Binance: {str(e)}")
+    """Return the 24h price change percentage from the shared Binance ticker snapshot"""
+    price_change = ticker_snapshot.get(f"{symbol}USDT")
+    if price_change is None:
+        print(f"No Binance 24h price change for {symbol}USDT")
+        return 0
+    return price_change
+
+async def aget_price_change_24h(symbol: str) -> float:
+    """Async version of get_price_change_24h."""
+    price_change = await ticker_snapshot.aget(f"{symbol}USDT")
+    if price_change is None:
+        print(f"No Binance 24h price change for {symbol}USDT")
         return 0
+    return price_change
 
-def get_lunarcrush_data(symbol: str):
+def get_lunarcrush_data(symbol: str, coins_index: Optional[dict] = None):
     """
     Fetch social metrics from LunarCrush API4 with improved error handling and retries.
+
+    Live metrics are cached per symbol in social_metrics_cache: reused for
+    cache_duration seconds, then served stale while a background refresh runs.
+    They also go through the snapshot store: recorded in "record" mode, and
+    served as of the current point in time without any request in "replay" mode.
+    Recording always fetches live metrics (and refreshes the cache with them), so
+    a snapshot is never older than its timestamp.
+
+    Args:
+        symbol: Cryptocurrency symbol
+        coins_index: Prefetched get_coins_index() result, shared by a batch of symbols.
+            If not given, the coins list is fetched once for both the topic lookup and
+            the coin metrics.
+    """
+    def fetch():
+        cache_lookup = (
+            social_metrics_cache.refresh
+            if snapshot_store.mode == "record"
+            else social_metrics_cache.get
+        )
+        return cache_lookup(
+            symbol.upper(), lambda: _fetch_lunarcrush_data(symbol, coins_index)
+        )
+
+    return snapshot_store.fetch("lunarcrush", symbol.upper(), fetch)
+
+def _fetch_lunarcrush_data(symbol: str, coins_index: Optional[dict] = None):
+    """Fetch the social metrics from the live APIs (see get_lunarcrush_data)."""
+    return http_client.run_sync(_afetch_lunarcrush_data(symbol, coins_index))
+
+async def _afetch_lunarcrush_data(symbol: str, coins_index: Optional[dict] = None):
+    """
+    Fetch the social metrics from the live APIs, issuing the requests concurrently.
+
+    The topic endpoint, the Binance 24h ticker and the coins list are requested at
+    once. The coins list is only awaited before the topic request when the topic is
+    neither cached nor hardcoded, and the same list then serves the coin metrics.
     """
     if not LUNARCRUSH_API_KEY:
         print("Warning: LUNARCRUSH_API_KEY not found in environment variables")
         return None
-    
-    session = create_session_with_retries()
-    
-    try:
+
+    coins_task = None
+    if coins_index is None:
+        coins_task = asyncio.ensure_future(aget_coins_index())
+
+    async def coins():
+        return coins_index if coins_task is None else await coins_task
+
+    async def topic_data():
         # Get topic name for the symbol
-        topic = get_topic_for_symbol(symbol, session)
+        topic = _known_topic(symbol.upper())
         if not topic:
-            print(f"Could not determine topic for symbol {symbol}")
-            return None
-            
+            index = await coins()
+            if index is None:
+                return None, None
+            topic = get_topic_for_symbol(symbol, index)
+        if not topic:
+            return None, None
+
         # Use the /topic endpoint with the topic name
         endpoint = f"{LUNARCRUSH_API_URL}/topic/{topic}/v1"
         print(f"\nTrying LunarCrush API endpoint: {endpoint}")
-        
+
         # Headers for API4
         headers = {
             'Authorization': f'Bearer {LUNARCRUSH_API_KEY}',
             'Accept': 'application/json'
         }
-        
+
         print(f"Fetching LunarCrush data for {symbol} (topic: {topic})...")
-        
-        # Set explicit timeout and verify SSL
-        response = session.get(
-            endpoint,
-            headers=headers,
-            timeout=10,
-            verify=True
-        )
-        
+        response = await http_client.aget(endpoint, headers=headers, timeout=10)
         response.raise_for_status()
-        data = response.json()
-        
+        return topic, response.json()
+
+    try:
+        (topic, data), coins_index, price_change = await asyncio.gather(
+            topic_data(), coins(), aget_price_change_24h(symbol)
+        )
+
+        if not topic:
+            print(f"Could not determine topic for symbol {symbol}")
+            return None
+
         if not data:
             print(f"No data found in API response")
             print("API Response:", data)
             return None
-            
-        # Get price change from Binance
-        price_change = get_price_change_24h(symbol)
+
         print(f"\nPrice change from Binance: {price_change}%")
         
         # Extract metrics based on API4 topic endpoint response format
@@ -321,7 +425,7 @@ def get_lunarcrush_data(symbol: str):
         }
         
         # Get additional coin metrics
-        coin_metrics = get_coin_metrics(symbol)
+        coin_metrics = get_coin_metrics(symbol, coins_index) if coins_index is not None else None
         if coin_metrics:
             result.update({
                 "alt_rank": coin_metrics["alt_rank"],
@@ -339,13 +443,13 @@ def get_lunarcrush_data(symbol: str):
         print(f"Successfully fetched data for {symbol}")
         return result
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print(f"Timeout while fetching LunarCrush data")
         return None
-    except requests.exceptions.ConnectionError as e:
+    except httpx.TransportError as e:
         print(f"Connection error while fetching LunarCrush data: {str(e)}")
         return None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error fetching LunarCrush data: {str(e)}")
         return None
     except (KeyError, TypeError, ValueError) as e:
@@ -354,6 +458,9 @@ def get_lunarcrush_data(symbol: str):
     except Exception as e:
         print(f"Unexpected error in LunarCrush data fetch: {str(e)}")
         return None
+    finally:
+        if coins_task is not None and not coins_task.done():
+            coins_task.cancel()
 
 def social_monitor_agent(state: AgentState):
     """
@@ -378,8 +485,8 @@ def social_monitor_agent(state: AgentState):
         crypto = data["crypto"]
         print(f"\nAnalyzing social sentiment for {crypto}...")
         
-        # Fetch real data from LunarCrush
-        social_metrics = get_lunarcrush_data(crypto)
+        # Fetch real data from LunarCrush (batch runs share one coins list)
+        social_metrics = get_lunarcrush_data(crypto, data.get("lunarcrush_coins"))
         
         if not social_metrics:
             print(f"No social metrics available for {crypto}, using neutral stance")
@@ -10,6 +10,9 @@ import json
 def merge_dicts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
     """Merges two dictionaries by combining their key-value pairs.
 
+    "analyst_signals" is merged one level deeper, so parallel agents can each add
+    their own signal without mutating the shared state.
+
     Args:
         a (Dict[str, Any]): First dictionary
         b (Dict[str, Any]): Second dictionary
@@ -17,7 +20,12 @@ def merge_dicts(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Combined dictionary with all key-value pairs
     """
-    return {**a, **b}
+    merged = {**a, **b}
+    if isinstance(a.get("analyst_signals"), dict) and isinstance(
+        b.get("analyst_signals"), dict
+    ):
+        merged["analyst_signals"] = {**a["analyst_signals"], **b["analyst_signals"]}
+    return merged
 
 
 # Define agent state
@@ -0,0 +1,511 @@
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.indicators import hurst_slope
+
+
+def _div(a: float, b: float) -> float:
+    """Divide like NumPy (x/0 -> inf, 0/0 -> nan) so values match IndicatorEngine."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.divide(np.float64(a), np.float64(b)))
+
+
+def _dump(value):
+    if isinstance(value, StreamingIndicator):
+        return {"__class__": type(value).__name__, "state": value.state_dict()}
+    if isinstance(value, deque):
+        return {"__deque__": [_dump(item) for item in value], "maxlen": value.maxlen}
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    if isinstance(value, dict):
+        return {"__dict__": {key: _dump(item) for key, item in value.items()}}
+    return value
+
+
+def _load(value):
+    if isinstance(value, list):
+        return [_load(item) for item in value]
+    if isinstance(value, dict):
+        if "__class__" in value:
+            return _INDICATORS[value["__class__"]].from_state(value["state"])
+        if "__deque__" in value:
+            return deque([_load(item) for item in value["__deque__"]], value["maxlen"])
+        if "__dict__" in value:
+            return {key: _load(item) for key, item in value["__dict__"].items()}
+    return value
+
+
+class StreamingIndicator:
+    """Base class for indicators that are advanced one candle at a time.
+
+    Subclasses keep only the rolling state their formula needs, so update() costs
+    the same however long the history is. state_dict() returns a JSON-serializable
+    checkpoint and from_state() restores it, so a live process can persist its
+    state and resume from the last closed candle instead of replaying the window.
+    """
+
+    def state_dict(self) -> dict:
+        """Return the indicator state as JSON-serializable plain data."""
+        return {name: _dump(value) for name, value in vars(self).items()}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        """Rebuild an indicator from a state_dict() checkpoint."""
+        indicator = cls.__new__(cls)
+        for name, value in state.items():
+            setattr(indicator, name, _load(value))
+        return indicator
+
+
+class EWM(StreamingIndicator):
+    """Exponentially weighted mean, matching pandas' ewm(span, adjust).mean().
+
+    Keeps the running weighted mean and the total weight of past observations,
+    following pandas' recursion (NaN inputs decay the old weight but are skipped).
+    """
+
+    def __init__(self, span: int, adjust: bool = False):
+        alpha = 2 / (span + 1)
+        self.decay = 1 - alpha
+        self.new_weight = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.value = math.nan
+        self.old_weight = 1.0
+
+    def update(self, x: float) -> float:
+        if self.value != self.value:
+            if x == x:
+                self.value = float(x)
+            return self.value
+        self.old_weight *= self.decay
+        if x == x:
+            if self.value != x:
+                self.value = (self.old_weight * self.value + self.new_weight * x) / (
+                    self.old_weight + self.new_weight
+                )
+            self.old_weight = self.old_weight + self.new_weight if self.adjust else 1.0
+        return self.value
+
+
+class RollingWindow(StreamingIndicator):
+    """Rolling mean/sum/variance via Welford's algorithm, with removal.
+
+    Like pandas' rolling(window), NaN values occupy a slot but are ignored, and the
+    statistics are NaN until the window holds `window` valid values. With
+    window=None the statistics are expanding (all values seen so far) and no
+    values are retained.
+    """
+
+    def __init__(self, window: Optional[int]):
+        self.window = window
+        self.values = deque() if window else None
+        self.count = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+
+    def _add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean_
+        self.mean_ += delta / self.count
+        self.m2 += delta * (x - self.mean_)
+
+    def _remove(self, x: float) -> None:
+        if self.count == 1:
+            self.count, self.mean_, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = x - self.mean_
+        self.mean_ -= delta / self.count
+        self.m2 = max(self.m2 - delta * (x - self.mean_), 0.0)
+
+    def update(self, x: float) -> "RollingWindow":
+        if self.window:
+            if len(self.values) == self.window:
+                old = self.values.popleft()
+                if old == old:
+                    self._remove(old)
+            self.values.append(float(x))
+        if x == x:
+            self._add(float(x))
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= (self.window or 1)
+
+    @property
+    def mean(self) -> float:
+        return self.mean_ if self.ready else math.nan
+
+    @property
+    def sum(self) -> float:
+        return self.mean_ * self.count if self.ready else math.nan
+
+    def var(self, ddof: int = 1) -> float:
+        if not self.ready or self.count <= ddof:
+            return math.nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.var(ddof))
+
+
+class RollingExtreme(StreamingIndicator):
+    """Rolling max or min over a window, using a monotonic deque.
+
+    The deque holds (position, value) pairs whose values are strictly decreasing
+    (max) or increasing (min), so the extreme is always at the front and each value
+    is pushed and popped at most once: amortized O(1) per update.
+    """
+
+    def __init__(self, window: int, how: str = "max"):
+        if how not in ("max", "min"):
+            raise ValueError("how must be 'max' or 'min'")
+        self.window = window
+        self.how = how
+        self.position = -1
+        self.candidates = deque()
+        self.valid = deque()
+        self.valid_count = 0
+
+    def update(self, x: float) -> float:
+        self.position += 1
+        if len(self.valid) == self.window:
+            self.valid_count -= self.valid.popleft()
+        is_valid = int(x == x)
+        self.valid.append(is_valid)
+        self.valid_count += is_valid
+
+        if is_valid:
+            beaten = (lambda v: v <= x) if self.how == "max" else (lambda v: v >= x)
+            while self.candidates and beaten(self.candidates[-1][1]):
+                self.candidates.pop()
+            self.candidates.append([self.position, float(x)])
+        while self.candidates and self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.valid_count < self.window or not self.candidates:
+            return math.nan
+        return self.candidates[0][1]
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line (EMA 12 - EMA 26) and its 9-period signal line."""
+
+    def __init__(self):
+        self.fast = EWM(12)
+        self.slow = EWM(26)
+        self.signal = EWM(9)
+        self.value = (math.nan, math.nan)
+
+    def update(self, close: float) -> tuple[float, float]:
+        macd_line = self.fast.update(close) - self.slow.update(close)
+        self.value = (macd_line, self.signal.update(macd_line))
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """RSI from rolling mean gain and loss over `period` candles."""
+
+    def __init__(self, period: int = 14):
+        self.gain = RollingWindow(period)
+        self.loss = RollingWindow(period)
+        self.prev_close = math.nan
+        self.value = math.nan
+
+    def update(self, close: float) -> float:
+        delta = close - self.prev_close
+        self.prev_close = close
+        self.gain.update(delta if delta > 0 else 0.0)
+        self.loss.update(-delta if delta < 0 else 0.0)
+        rs = _div(self.gain.mean, self.loss.mean)
+        self.value = 100 - _div(100, 1 + rs)
+        return self.value
+
+
+class StreamingBollinger(StreamingIndicator):
+    """Upper and lower Bollinger Bands (SMA +/- 2 sample standard deviations)."""
+
+    def __init__(self, window: int = 20):
+        self.close = RollingWindow(window)
+        self.value = (math.nan, math.nan)
+
+    def update(self, close: float) -> tuple[float, float]:
+        self.close.update(close)
+        sma, std_dev = self.close.mean, self.close.std()
+        self.value = (sma + std_dev * 2, sma - std_dev * 2)
+        return self.value
+
+
+class TrueRange(StreamingIndicator):
+    """True range; the first candle has no previous close, so it is high - low."""
+
+    def __init__(self):
+        self.prev_close = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        ranges = [high - low, abs(high - self.prev_close), abs(low - self.prev_close)]
+        self.prev_close = close
+        self.value = float(np.fmax.reduce(ranges))
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range: rolling mean of the true range."""
+
+    def __init__(self, period: int = 14):
+        self.true_range = TrueRange()
+        self.window = RollingWindow(period)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.value = self.window.update(self.true_range.update(high, low, close)).mean
+        return self.value
+
+
+class StreamingADX(StreamingIndicator):
+    """ADX with +DI and -DI, using the same adjusted EWMs as IndicatorEngine.adx."""
+
+    def __init__(self, period: int = 14):
+        self.true_range = TrueRange()
+        self.tr_ewm = EWM(period, adjust=True)
+        self.plus_ewm = EWM(period, adjust=True)
+        self.minus_ewm = EWM(period, adjust=True)
+        self.dx_ewm = EWM(period, adjust=True)
+        self.prev_high = math.nan
+        self.prev_low = math.nan
+        self.value = {"adx": math.nan, "+di": math.nan, "-di": math.nan}
+
+    def update(self, high: float, low: float, close: float) -> dict[str, float]:
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+
+        tr_ewm = self.tr_ewm.update(self.true_range.update(high, low, close))
+        plus_di = 100 * _div(self.plus_ewm.update(plus_dm), tr_ewm)
+        minus_di = 100 * _div(self.minus_ewm.update(minus_dm), tr_ewm)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        self.value = {"adx": self.dx_ewm.update(dx), "+di": plus_di, "-di": minus_di}
+        return self.value
+
+
+class StreamingOBV(StreamingIndicator):
+    """On-Balance Volume: running sum of volume signed by the close-to-close move."""
+
+    def __init__(self):
+        self.prev_close = math.nan
+        self.value = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        if close > self.prev_close:
+            self.value += volume
+        elif close < self.prev_close:
+            self.value -= volume
+        self.prev_close = close
+        return self.value
+
+
+class StreamingIchimoku(StreamingIndicator):
+    """Tenkan-sen, Kijun-sen and the unshifted Senkou spans from rolling highs/lows.
+
+    senkou_span_a and senkou_span_b are the values calculate_ichimoku plots 26
+    candles ahead; the caller applies the shift.
+    """
+
+    def __init__(self):
+        self.highs = {window: RollingExtreme(window, "max") for window in (9, 26, 52)}
+        self.lows = {window: RollingExtreme(window, "min") for window in (9, 26, 52)}
+        self.value = {}
+
+    def update(self, high: float, low: float) -> dict[str, float]:
+        mid = {
+            window: (self.highs[window].update(high) + self.lows[window].update(low)) / 2
+            for window in self.highs
+        }
+        self.value = {
+            "tenkan_sen": mid[9],
+            "kijun_sen": mid[26],
+            "senkou_span_a": (mid[9] + mid[26]) / 2,
+            "senkou_span_b": mid[52],
+        }
+        return self.value
+
+    @classmethod
+    def from_state(cls, state: dict):
+        indicator = super().from_state(state)
+        # JSON object keys are strings
+        indicator.highs = {int(k): v for k, v in indicator.highs.items()}
+        indicator.lows = {int(k): v for k, v in indicator.lows.items()}
+        return indicator
+
+
+class StreamingHurst(StreamingIndicator):
+    """Hurst exponent with the formula of calculate_hurst_exponent.
+
+    For each lag in range(2, max_lag), the standard deviation of the lagged price
+    differences is tracked with Welford's algorithm over the last `window` prices
+    (or all prices when window is None); the exponent is the least-squares slope of
+    log(sqrt(std)) against log(lag).
+    """
+
+    def __init__(self, max_lag: int = 20, window: Optional[int] = None):
+        self.lags = list(range(2, max_lag))
+        self.prices = deque(maxlen=max_lag)
+        self.diffs = [RollingWindow(window - lag if window else None) for lag in self.lags]
+        self.value = 0.5
+
+    def update(self, close: float) -> float:
+        self.prices.append(float(close))
+        for lag, diffs in zip(self.lags, self.diffs):
+            if len(self.prices) > lag:
+                diffs.update(close - self.prices[-1 - lag])
+
+        stds = [diffs.std(ddof=0) for diffs in self.diffs]
+        if any(std != std for std in stds):
+            self.value = 0.5
+            return self.value
+        self.value = float(hurst_slope(np.array(self.lags), np.array(stds)))
+        return self.value
+
+
+class StreamingIndicators(StreamingIndicator):
+    """All streaming indicators used by the technical analyst, advanced together.
+
+    Seed once from a price frame with from_prices(), then call advance() with each
+    refreshed frame (or update() with each new candle): only candles newer than the
+    last one seen are processed. Feed closed candles only; an in-progress candle
+    would otherwise be counted again when it closes.
+    """
+
+    def __init__(self, hurst_window: Optional[int] = None):
+        self.macd = StreamingMACD()
+        self.rsi_14 = StreamingRSI(14)
+        self.rsi_28 = StreamingRSI(28)
+        self.bollinger = StreamingBollinger(20)
+        self.emas = {span: EWM(span) for span in (8, 21, 55)}
+        self.adx = StreamingADX(14)
+        self.atr = StreamingATR(14)
+        self.obv = StreamingOBV()
+        self.ichimoku = StreamingIchimoku()
+        self.hurst = StreamingHurst(window=hurst_window)
+        self.close = math.nan
+        self.last_timestamp = None
+
+    @classmethod
+    def from_prices(cls, prices_df: pd.DataFrame, hurst_window: Optional[int] = None):
+        """Build the state by replaying a price frame once.
+
+        Args:
+            prices_df: DataFrame with high, low, close and volume columns, indexed by time
+            hurst_window: Number of prices the Hurst exponent looks back over
+                (None: all prices seen)
+
+        Returns:
+            StreamingIndicators: State positioned after the last row of prices_df
+        """
+        indicators = cls(hurst_window)
+        indicators.advance(prices_df)
+        return indicators
+
+    @classmethod
+    def from_state(cls, state: dict):
+        indicators = super().from_state(state)
+        indicators.emas = {int(k): v for k, v in indicators.emas.items()}
+        return indicators
+
+    def advance(self, prices_df: pd.DataFrame) -> dict:
+        """Process the rows of prices_df that are newer than the last candle seen.
+
+        Args:
+            prices_df: DataFrame with high, low, close and volume columns, indexed by time
+
+        Returns:
+            dict: Latest indicator values (see snapshot)
+        """
+        timestamps = pd.DatetimeIndex(prices_df.index).asi8
+        start = 0
+        if self.last_timestamp is not None:
+            start = int(np.searchsorted(timestamps, self.last_timestamp, side="right"))
+        columns = [
+            prices_df[name].to_numpy(dtype=np.float64)[start:]
+            for name in ("high", "low", "close", "volume")
+        ]
+        for high, low, close, volume in zip(*columns):
+            self.update(high, low, close, volume)
+        if start < len(timestamps):
+            self.last_timestamp = int(timestamps[-1])
+        return self.snapshot()
+
+    def update(self, high: float, low: float, close: float, volume: float) -> dict:
+        """Advance every indicator by one candle.
+
+        Returns:
+            dict: Latest indicator values (see snapshot)
+        """
+        self.close = float(close)
+        self.macd.update(close)
+        self.rsi_14.update(close)
+        self.rsi_28.update(close)
+        self.bollinger.update(close)
+        for ema in self.emas.values():
+            ema.update(close)
+        self.adx.update(high, low, close)
+        self.atr.update(high, low, close)
+        self.obv.update(close, volume)
+        self.ichimoku.update(high, low)
+        self.hurst.update(close)
+        return self.snapshot()
+
+    def snapshot(self) -> dict:
+        """Return the latest value of every indicator.
+
+        Returns:
+            dict: Indicator name to latest value, named like the IndicatorEngine outputs
+        """
+        macd_line, signal_line = self.macd.value
+        upper_band, lower_band = self.bollinger.value
+        return {
+            "close": self.close,
+            "macd": macd_line,
+            "macd_signal": signal_line,
+            "rsi_14": self.rsi_14.value,
+            "rsi_28": self.rsi_28.value,
+            "bb_upper": upper_band,
+            "bb_lower": lower_band,
+            **{f"ema_{span}": ema.value for span, ema in self.emas.items()},
+            **self.adx.value,
+            "atr_14": self.atr.value,
+            "obv": self.obv.value,
+            **self.ichimoku.value,
+            "hurst_exponent": self.hurst.value,
+        }
+
+
+_INDICATORS = {
+    cls.__name__: cls
+    for cls in (
+        EWM,
+        RollingWindow,
+        RollingExtreme,
+        StreamingMACD,
+        StreamingRSI,
+        StreamingBollinger,
+        TrueRange,
+        StreamingATR,
+        StreamingADX,
+        StreamingOBV,
+        StreamingIchimoku,
+        StreamingHurst,
+        StreamingIndicators,
+    )
+}
@@ -1,15 +1,28 @@
-import math
-from typing import Dict
+from typing import Dict, Optional
 
 from langchain_core.messages import HumanMessage
 
 from agents.state import AgentState, show_agent_reasoning
+from agents.indicators import IndicatorEngine
 
 import json
 import pandas as pd
 import numpy as np
 
 
+# Weights of the strategies in the technical ensemble
+STRATEGY_WEIGHTS = {
+    "trend": 0.25,
+    "mean_reversion": 0.20,
+    "momentum": 0.25,
+    "volatility": 0.15,
+    "stat_arb": 0.15,
+}
+
+# Combined scores beyond this are bullish/bearish
+COMBINED_SIGNAL_THRESHOLD = 0.2
+
+
 ##### Technical Analyst #####
 def technical_analyst_agent(state: AgentState):
     """
@@ -19,60 +32,58 @@ def technical_analyst_agent(state: AgentState):
     3. Momentum
     4. Volatility Analysis
     5. Statistical Arbitrage Signals
+
+    All indicators come from one IndicatorEngine, so intermediates shared between
+    the strategies are computed once per analysis.
     """
     show_reasoning = state["metadata"]["show_reasoning"]
     data = state["data"]
     prices_df = data["prices"]
+    engine = IndicatorEngine(prices_df)
 
     # Calculate indicators
     # 1. MACD (Moving Average Convergence Divergence)
-    macd_line, signal_line = calculate_macd(prices_df)
+    macd_line, signal_line = engine.macd()
 
     # 2. RSI (Relative Strength Index)
-    rsi = calculate_rsi(prices_df)
+    rsi = engine.rsi(14)
 
     # 3. Bollinger Bands (Bollinger Bands)
-    upper_band, lower_band = calculate_bollinger_bands(prices_df)
+    upper_band, lower_band = engine.bollinger_bands(20)
 
     # 4. OBV (On-Balance Volume)
-    obv = calculate_obv(prices_df)
+    obv = engine.obv()
 
     # Generate individual signals
     signals = []
 
     # MACD signal
-    if (
-        macd_line.iloc[-2] < signal_line.iloc[-2]
-        and macd_line.iloc[-1] > signal_line.iloc[-1]
-    ):
+    if macd_line[-2] < signal_line[-2] and macd_line[-1] > signal_line[-1]:
         signals.append("bullish")
-    elif (
-        macd_line.iloc[-2] > signal_line.iloc[-2]
-        and macd_line.iloc[-1] < signal_line.iloc[-1]
-    ):
+    elif macd_line[-2] > signal_line[-2] and macd_line[-1] < signal_line[-1]:
         signals.append("bearish")
     else:
         signals.append("neutral")
 
     # RSI signal
-    if rsi.iloc[-1] < 30:
+    if rsi[-1] < 30:
         signals.append("bullish")
-    elif rsi.iloc[-1] > 70:
+    elif rsi[-1] > 70:
         signals.append("bearish")
     else:
         signals.append("neutral")
 
     # Bollinger Bands signal
-    current_price = prices_df["close"].iloc[-1]
-    if current_price < lower_band.iloc[-1]:
+    current_price = engine.close[-1]
+    if current_price < lower_band[-1]:
         signals.append("bullish")
-    elif current_price > upper_band.iloc[-1]:
+    elif current_price > upper_band[-1]:
         signals.append("bearish")
     else:
         signals.append("neutral")
 
     # OBV signal
-    obv_slope = obv.diff().iloc[-5:].mean()
+    obv_slope = np.diff(obv)[-5:].mean()
     if obv_slope > 0:
         signals.append("bullish")
     elif obv_slope < 0:
@@ -88,7 +99,7 @@ def technical_analyst_agent(state: AgentState):
         },
         "RSI": {
             "signal": signals[1],
-            "details": f"RSI is {rsi.iloc[-1]:.2f} ({'oversold' if signals[1] == 'bullish' else 'overbought' if signals[1] == 'bearish' else 'neutral'})",
+            "details": f"RSI is {rsi[-1]:.2f} ({'oversold' if signals[1] == 'bullish' else 'overbought' if signals[1] == 'bearish' else 'neutral'})",
         },
         "Bollinger": {
             "signal": signals[2],
@@ -128,28 +139,22 @@ def technical_analyst_agent(state: AgentState):
     }
 
     # 1. Trend Following Strategy
-    trend_signals = calculate_trend_signals(prices_df)
+    trend_signals = calculate_trend_signals(prices_df, engine)
 
     # 2. Mean Reversion Strategy
-    mean_reversion_signals = calculate_mean_reversion_signals(prices_df)
+    mean_reversion_signals = calculate_mean_reversion_signals(prices_df, engine)
 
     # 3. Momentum Strategy
-    momentum_signals = calculate_momentum_signals(prices_df)
+    momentum_signals = calculate_momentum_signals(prices_df, engine)
 
     # 4. Volatility Strategy
-    volatility_signals = calculate_volatility_signals(prices_df)
+    volatility_signals = calculate_volatility_signals(prices_df, engine)
 
     # 5. Statistical Arbitrage Signals
-    stat_arb_signals = calculate_stat_arb_signals(prices_df)
+    stat_arb_signals = calculate_stat_arb_signals(prices_df, engine)
 
     # Combine all signals using a weighted ensemble approach
-    strategy_weights = {
-        "trend": 0.25,
-        "mean_reversion": 0.20,
-        "momentum": 0.25,
-        "volatility": 0.15,
-        "stat_arb": 0.15,
-    }
+    strategy_weights = STRATEGY_WEIGHTS
 
     combined_signal = weighted_signal_combination(
         {
@@ -205,44 +210,47 @@ def technical_analyst_agent(state: AgentState):
         show_agent_reasoning(analysis_report, "Technical Analyst")
 
     # Add the signal to the analyst_signals list
-    state["data"]["analyst_signals"]["technical_analyst_agent"] = {
-        "signal": analysis_report["signal"],
-        "confidence": analysis_report["confidence"],
-        "reasoning": analysis_report["strategy_signals"],
-    }
-
     return {
         "messages": state["messages"] + [message],
-        "data": data,
+        "data": {
+            **data,
+            "analyst_signals": {
+                **data["analyst_signals"],
+                "technical_analyst_agent": {
+                    "signal": analysis_report["signal"],
+                    "confidence": analysis_report["confidence"],
+                    "reasoning": analysis_report["strategy_signals"],
+                },
+            },
+        },
     }
 
 
-def calculate_trend_signals(prices_df):
+def calculate_trend_signals(prices_df, engine: Optional[IndicatorEngine] = None):
     """
     Advanced trend following strategy using multiple timeframes and indicators
     """
+    engine = engine or IndicatorEngine(prices_df)
+
     # Calculate EMAs for multiple timeframes
-    ema_8 = calculate_ema(prices_df, 8)
-    ema_21 = calculate_ema(prices_df, 21)
-    ema_55 = calculate_ema(prices_df, 55)
+    ema_8 = engine.ema(8)
+    ema_21 = engine.ema(21)
+    ema_55 = engine.ema(55)
 
     # Calculate ADX for trend strength
-    adx = calculate_adx(prices_df, 14)
-
-    # Calculate Ichimoku Cloud
-    ichimoku = calculate_ichimoku(prices_df)
+    adx = engine.adx(14)["adx"]
 
     # Determine trend direction and strength
     short_trend = ema_8 > ema_21
     medium_trend = ema_21 > ema_55
 
     # Combine signals with confidence weighting
-    trend_strength = adx["adx"].iloc[-1] / 100.0
+    trend_strength = adx[-1] / 100.0
 
-    if short_trend.iloc[-1] and medium_trend.iloc[-1]:
+    if short_trend[-1] and medium_trend[-1]:
         signal = "bullish"
         confidence = trend_strength
-    elif not short_trend.iloc[-1] and not medium_trend.iloc[-1]:
+    elif not short_trend[-1] and not medium_trend[-1]:
         signal = "bearish"
         confidence = trend_strength
     else:
@@ -253,42 +261,43 @@ def calculate_trend_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "adx": float(adx["adx"].iloc[-1]),
+            "adx": float(adx[-1]),
             "trend_strength": float(trend_strength),
-            # 'ichimoku': ichimoku
+            # 'ichimoku': calculate_ichimoku(prices_df)
         },
     }
 
 
-def calculate_mean_reversion_signals(prices_df):
+def calculate_mean_reversion_signals(prices_df, engine: Optional[IndicatorEngine] = None):
     """
     Mean reversion strategy using statistical measures and Bollinger Bands
     """
+    engine = engine or IndicatorEngine(prices_df)
+    close = engine.close
+
     # Calculate z-score of price relative to moving average
-    ma_50 = prices_df["close"].rolling(window=50).mean()
-    std_50 = prices_df["close"].rolling(window=50).std()
-    z_score = (prices_df["close"] - ma_50) / std_50
+    ma_50 = engine.rolling("close", 50, "mean")
+    std_50 = engine.rolling("close", 50, "std")
+    z_score = (close - ma_50) / std_50
 
     # Calculate Bollinger Bands
-    bb_upper, bb_lower = calculate_bollinger_bands(prices_df)
+    bb_upper, bb_lower = engine.bollinger_bands(20)
 
     # Calculate RSI with multiple timeframes
-    rsi_14 = calculate_rsi(prices_df, 14)
-    rsi_28 = calculate_rsi(prices_df, 28)
+    rsi_14 = engine.rsi(14)
+    rsi_28 = engine.rsi(28)
 
     # Mean reversion signals
-    extreme_z_score = abs(z_score.iloc[-1]) > 2
-    price_vs_bb = (prices_df["close"].iloc[-1] - bb_lower.iloc[-1]) / (
-        bb_upper.iloc[-1] - bb_lower.iloc[-1]
-    )
+    extreme_z_score = abs(z_score[-1]) > 2
+    price_vs_bb = (close[-1] - bb_lower[-1]) / (bb_upper[-1] - bb_lower[-1])
 
     # Combine signals
-    if z_score.iloc[-1] < -2 and price_vs_bb < 0.2:
+    if z_score[-1] < -2 and price_vs_bb < 0.2:
         signal = "bullish"
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
-    elif z_score.iloc[-1] > 2 and price_vs_bb > 0.8:
+        confidence = min(abs(z_score[-1]) / 4, 1.0)
+    elif z_score[-1] > 2 and price_vs_bb > 0.8:
         signal = "bearish"
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
+        confidence = min(abs(z_score[-1]) / 4, 1.0)
     else:
         signal = "neutral"
         confidence = 0.5
@@ -297,36 +306,37 @@ def calculate_mean_reversion_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "z_score": float(z_score.iloc[-1]),
+            "z_score": float(z_score[-1]),
             "price_vs_bb": float(price_vs_bb),
-            "rsi_14": float(rsi_14.iloc[-1]),
-            "rsi_28": float(rsi_28.iloc[-1]),
+            "rsi_14": float(rsi_14[-1]),
+            "rsi_28": float(rsi_28[-1]),
         },
     }
 
 
-def calculate_momentum_signals(prices_df):
+def calculate_momentum_signals(prices_df, engine: Optional[IndicatorEngine] = None):
     """
     Multi-factor momentum strategy
     """
+    engine = engine or IndicatorEngine(prices_df)
+
     # Price momentum
-    returns = prices_df["close"].pct_change()
-    mom_1m = returns.rolling(21).sum()
-    mom_3m = returns.rolling(63).sum()
-    mom_6m = returns.rolling(126).sum()
+    mom_1m = engine.rolling("returns", 21, "sum")
+    mom_3m = engine.rolling("returns", 63, "sum")
+    mom_6m = engine.rolling("returns", 126, "sum")
 
     # Volume momentum
-    volume_ma = prices_df["volume"].rolling(21).mean()
-    volume_momentum = prices_df["volume"] / volume_ma
+    volume_ma = engine.rolling("volume", 21, "mean")
+    volume_momentum = engine.volume / volume_ma
 
     # Relative strength
     # (would compare to market/sector in real implementation)
 
     # Calculate momentum score
-    momentum_score = (0.4 * mom_1m + 0.3 * mom_3m + 0.3 * mom_6m).iloc[-1]
+    momentum_score = 0.4 * mom_1m[-1] + 0.3 * mom_3m[-1] + 0.3 * mom_6m[-1]
 
     # Volume confirmation
-    volume_confirmation = volume_momentum.iloc[-1] > 1.0
+    volume_confirmation = volume_momentum[-1] > 1.0
 
     if momentum_score > 0.05 and volume_confirmation:
         signal = "bullish"
@@ -342,38 +352,37 @@ def calculate_momentum_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "momentum_1m": float(mom_1m.iloc[-1]),
-            "momentum_3m": float(mom_3m.iloc[-1]),
-            "momentum_6m": float(mom_6m.iloc[-1]),
-            "volume_momentum": float(volume_momentum.iloc[-1]),
+            "momentum_1m": float(mom_1m[-1]),
+            "momentum_3m": float(mom_3m[-1]),
+            "momentum_6m": float(mom_6m[-1]),
+            "volume_momentum": float(volume_momentum[-1]),
         },
     }
 
 
-def calculate_volatility_signals(prices_df):
+def calculate_volatility_signals(prices_df, engine: Optional[IndicatorEngine] = None):
     """
     Volatility-based trading strategy
     """
-    # Calculate various volatility metrics
-    returns = prices_df["close"].pct_change()
+    engine = engine or IndicatorEngine(prices_df)
 
     # Historical volatility
-    hist_vol = returns.rolling(21).std() * math.sqrt(252)
+    hist_vol = engine.historical_volatility(21)
 
     # Volatility regime detection
-    vol_ma = hist_vol.rolling(63).mean()
+    vol_ma = engine.rolling("historical_volatility", 63, "mean")
     vol_regime = hist_vol / vol_ma
 
     # Volatility mean reversion
-    vol_z_score = (hist_vol - vol_ma) / hist_vol.rolling(63).std()
+    vol_z_score = (hist_vol - vol_ma) / engine.rolling("historical_volatility", 63, "std")
 
     # ATR ratio
-    atr = calculate_atr(prices_df)
-    atr_ratio = atr / prices_df["close"]
+    atr = engine.atr(14)
+    atr_ratio = atr / engine.close
 
     # Generate signal based on volatility regime
-    current_vol_regime = vol_regime.iloc[-1]
-    vol_z = vol_z_score.iloc[-1]
+    current_vol_regime = vol_regime[-1]
+    vol_z = vol_z_score[-1]
 
     if current_vol_regime < 0.8 and vol_z < -1:
         signal = "bullish"  # Low vol regime, potential for expansion
@@ -389,36 +398,38 @@ def calculate_volatility_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "historical_volatility": float(hist_vol.iloc[-1]),
+            "historical_volatility": float(hist_vol[-1]),
             "volatility_regime": float(current_vol_regime),
             "volatility_z_score": float(vol_z),
-            "atr_ratio": float(atr_ratio.iloc[-1]),
+            "atr_ratio": float(atr_ratio[-1]),
         },
     }
 
 
-def calculate_stat_arb_signals(prices_df):
+def calculate_stat_arb_signals(prices_df, engine: Optional[IndicatorEngine] = None):
     """
     Statistical arbitrage signals based on price action analysis
     """
-    # Calculate price distribution statistics
-    returns = prices_df["close"].pct_change()
+    engine = engine or IndicatorEngine(prices_df)
 
     # Skewness and kurtosis
-    skew = returns.rolling(63).skew()
-    kurt = returns.rolling(63).kurt()
+    skew = engine.rolling("returns", 63, "skew")
+    kurt = engine.rolling("returns", 63, "kurt")
 
-    # Test for mean reversion using Hurst exponent
-    hurst = calculate_hurst_exponent(prices_df["close"])
+    # Test for mean reversion using the Hurst exponent of the latest 63 candles,
+    # falling back to the whole series when it is shorter than that
+    hurst = engine.rolling_hurst(63)[-1]
+    if np.isnan(hurst):
+        hurst = engine.hurst()
 
     # Correlation analysis
     # (would include correlation with related securities in real implementation)
 
     # Generate signal based on statistical properties
-    if hurst < 0.4 and skew.iloc[-1] > 1:
+    if hurst < 0.4 and skew[-1] > 1:
         signal = "bullish"
         confidence = (0.5 - hurst) * 2
-    elif hurst < 0.4 and skew.iloc[-1] < -1:
+    elif hurst < 0.4 and skew[-1] < -1:
         signal = "bearish"
         confidence = (0.5 - hurst) * 2
     else:
@@ -430,8 +441,8 @@ def calculate_stat_arb_signals(prices_df):
         "confidence": confidence,
         "metrics": {
             "hurst_exponent": float(hurst),
-            "skewness": float(skew.iloc[-1]),
-            "kurtosis": float(kurt.iloc[-1]),
+            "skewness": float(skew[-1]),
+            "kurtosis": float(kurt[-1]),
         },
     }
 
@@ -461,9 +472,9 @@ def weighted_signal_combination(signals, weights):
         final_score = 0
 
     # Convert back to signal
-    if final_score > 0.2:
+    if final_score > COMBINED_SIGNAL_THRESHOLD:
         signal = "bullish"
-    elif final_score < -0.2:
+    elif final_score < -COMBINED_SIGNAL_THRESHOLD:
         signal = "bearish"
     else:
         signal = "neutral"
@@ -471,6 +482,152 @@ def weighted_signal_combination(signals, weights):
     return {"signal": signal, "confidence": abs(final_score)}
 
 
+def _signal_arrays(bullish, bearish, confidence):
+    """Per-bar (direction, confidence) arrays; neutral bars get confidence 0.5."""
+    direction = np.where(bullish, 1.0, np.where(bearish, -1.0, 0.0))
+    return direction, np.where(direction != 0, confidence, 0.5)
+
+
+def calculate_strategy_signal_arrays(engine: IndicatorEngine) -> dict:
+    """
+    Vectorized version of the five technical strategies and their ensemble.
+
+    Applies the same rules as the calculate_*_signals functions to every bar at
+    once instead of only the latest one, so a whole price history is scored in a
+    single pass. Signals are +1 (bullish), 0 (neutral) or -1 (bearish). The Hurst
+    exponent has no whole-series fallback here, which would look ahead: bars
+    before the first full 63-bar window use 0.5 (neutral).
+
+    Args:
+        engine (IndicatorEngine): Engine over the price history
+
+    Returns:
+        dict: Strategy name ("trend", "mean_reversion", "momentum", "volatility",
+            "stat_arb" and "combined") -> (direction, confidence) arrays aligned
+            with the price frame
+    """
+    close = engine.close
+
+    # 1. Trend following
+    short_trend = engine.ema(8) > engine.ema(21)
+    medium_trend = engine.ema(21) > engine.ema(55)
+    trend = _signal_arrays(
+        short_trend & medium_trend,
+        ~short_trend & ~medium_trend,
+        engine.adx(14)["adx"] / 100.0,
+    )
+
+    # 2. Mean reversion
+    z_score = (close - engine.rolling("close", 50, "mean")) / engine.rolling(
+        "close", 50, "std"
+    )
+    bb_upper, bb_lower = engine.bollinger_bands(20)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_vs_bb = (close - bb_lower) / (bb_upper - bb_lower)
+    mean_reversion = _signal_arrays(
+        (z_score < -2) & (price_vs_bb < 0.2),
+        (z_score > 2) & (price_vs_bb > 0.8),
+        np.minimum(np.abs(z_score) / 4, 1.0),
+    )
+
+    # 3. Momentum
+    momentum_score = (
+        0.4 * engine.rolling("returns", 21, "sum")
+        + 0.3 * engine.rolling("returns", 63, "sum")
+        + 0.3 * engine.rolling("returns", 126, "sum")
+    )
+    volume_confirmation = engine.volume / engine.rolling("volume", 21, "mean") > 1.0
+    momentum = _signal_arrays(
+        (momentum_score > 0.05) & volume_confirmation,
+        (momentum_score < -0.05) & volume_confirmation,
+        np.minimum(np.abs(momentum_score) * 5, 1.0),
+    )
+
+    # 4. Volatility
+    hist_vol = engine.historical_volatility(21)
+    vol_ma = engine.rolling("historical_volatility", 63, "mean")
+    vol_regime = hist_vol / vol_ma
+    vol_z = (hist_vol - vol_ma) / engine.rolling("historical_volatility", 63, "std")
+    volatility = _signal_arrays(
+        (vol_regime < 0.8) & (vol_z < -1),
+        (vol_regime > 1.2) & (vol_z > 1),
+        np.minimum(np.abs(vol_z) / 3, 1.0),
+    )
+
+    # 5. Statistical arbitrage
+    skew = engine.rolling("returns", 63, "skew")
+    hurst = np.nan_to_num(engine.rolling_hurst(63), nan=0.5)
+    stat_arb = _signal_arrays(
+        (hurst < 0.4) & (skew > 1),
+        (hurst < 0.4) & (skew < -1),
+        (0.5 - hurst) * 2,
+    )
+
+    signals = {
+        "trend": trend,
+        "mean_reversion": mean_reversion,
+        "momentum": momentum,
+        "volatility": volatility,
+        "stat_arb": stat_arb,
+    }
+    signals["combined"] = combine_signal_arrays(signals)
+    return signals
+
+
+def ensemble_score_arrays(signals: dict, weights: Optional[dict] = None) -> np.ndarray:
+    """
+    Signed weighted ensemble score of every bar, before thresholding.
+
+    This is weighted_signal_combination's final_score: from -1 (every weighted
+    strategy bearish) to 1 (every one bullish).
+
+    Args:
+        signals (dict): Strategy name -> (direction, confidence) arrays
+        weights (dict): Strategy name -> weight (default STRATEGY_WEIGHTS)
+
+    Returns:
+        numpy.ndarray: Ensemble score per bar (0 where no strategy has confidence)
+    """
+    weights = STRATEGY_WEIGHTS if weights is None else weights
+    weighted_sum = sum(
+        direction * weights[name] * confidence
+        for name, (direction, confidence) in signals.items()
+        if name in weights
+    )
+    total_confidence = sum(
+        weights[name] * confidence
+        for name, (_, confidence) in signals.items()
+        if name in weights
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        final_score = np.where(total_confidence > 0, weighted_sum / total_confidence, 0.0)
+    # Warm-up bars with undefined indicators count as neutral
+    return np.nan_to_num(final_score)
+
+
+def combine_signal_arrays(
+    signals: dict,
+    weights: Optional[dict] = None,
+    threshold: float = COMBINED_SIGNAL_THRESHOLD,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized weighted_signal_combination over every bar.
+
+    Args:
+        signals (dict): Strategy name -> (direction, confidence) arrays
+        weights (dict): Strategy name -> weight (default STRATEGY_WEIGHTS)
+        threshold (float): Combined score beyond which the signal is bullish/bearish
+
+    Returns:
+        tuple: (direction, confidence) arrays of the ensemble
+    """
+    final_score = ensemble_score_arrays(signals, weights)
+    direction = np.where(
+        final_score > threshold, 1.0, np.where(final_score < -threshold, -1.0, 0.0)
+    )
+    return direction, np.abs(final_score)
+
+
 def normalize_pandas(obj):
     """Convert pandas Series/DataFrames to primitive Python types"""
     if isinstance(obj, pd.Series):
@@ -496,11 +653,9 @@ def calculate_macd(prices_df: pd.DataFrame) -> tuple[pd.Series, pd.Series]:
             - MACD line: Difference between 12-period and 26-period EMAs
             - Signal line: 9-period EMA of MACD line
     """
-    ema_12 = prices_df["close"].ewm(span=12, adjust=False).mean()
-    ema_26 = prices_df["close"].ewm(span=26, adjust=False).mean()
-    macd_line = ema_12 - ema_26
-    signal_line = macd_line.ewm(span=9, adjust=False).mean()
-    return macd_line, signal_line
+    engine = IndicatorEngine(prices_df)
+    macd_line, signal_line = engine.macd()
+    return engine.series(macd_line), engine.series(signal_line)
 
 
 def calculate_rsi(prices_df: pd.DataFrame, period: int = 14) -> pd.Series:
@@ -516,14 +671,8 @@ def calculate_rsi(prices_df: pd.DataFrame, period: int = 14) -> pd.Series:
             - RSI > 70 typically indicates overbought conditions
             - RSI < 30 typically indicates oversold conditions
     """
-    delta = prices_df["close"].diff()
-    gain = (delta.where(delta > 0, 0)).fillna(0)
-    loss = (-delta.where(delta < 0, 0)).fillna(0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    engine = IndicatorEngine(prices_df)
+    return engine.series(engine.rsi(period))
 
 
 def calculate_bollinger_bands(
@@ -541,11 +690,9 @@ def calculate_bollinger_bands(
             - Upper band: SMA + (2 * Standard Deviation)
             - Lower band: SMA - (2 * Standard Deviation)
     """
-    sma = prices_df["close"].rolling(window).mean()
-    std_dev = prices_df["close"].rolling(window).std()
-    upper_band = sma + (std_dev * 2)
-    lower_band = sma - (std_dev * 2)
-    return upper_band, lower_band
+    engine = IndicatorEngine(prices_df)
+    upper_band, lower_band = engine.bollinger_bands(window)
+    return engine.series(upper_band), engine.series(lower_band)
 
 
 def calculate_ema(df: pd.DataFrame, window: int) -> pd.Series:
@@ -559,7 +706,8 @@ def calculate_ema(df: pd.DataFrame, window: int) -> pd.Series:
     Returns:
         pd.Series: EMA values
     """
-    return df["close"].ewm(span=window, adjust=False).mean()
+    engine = IndicatorEngine(df)
+    return engine.series(engine.ema(window))
 
 
 def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
@@ -573,34 +721,8 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     Returns:
         DataFrame with ADX values
     """
-    # Calculate True Range
-    df["high_low"] = df["high"] - df["low"]
-    df["high_close"] = abs(df["high"] - df["close"].shift())
-    df["low_close"] = abs(df["low"] - df["close"].shift())
-    df["tr"] = df[["high_low", "high_close", "low_close"]].max(axis=1)
-
-    # Calculate Directional Movement
-    df["up_move"] = df["high"] - df["high"].shift()
-    df["down_move"] = df["low"].shift() - df["low"]
-
-    df["plus_dm"] = np.where(
-        (df["up_move"] > df["down_move"]) & (df["up_move"] > 0), df["up_move"], 0
-    )
-    df["minus_dm"] = np.where(
-        (df["down_move"] > df["up_move"]) & (df["down_move"] > 0), df["down_move"], 0
-    )
-
-    # Calculate ADX
-    df["+di"] = 100 * (
-        df["plus_dm"].ewm(span=period).mean() / df["tr"].ewm(span=period).mean()
-    )
-    df["-di"] = 100 * (
-        df["minus_dm"].ewm(span=period).mean() / df["tr"].ewm(span=period).mean()
-    )
-    df["dx"] = 100 * abs(df["+di"] - df["-di"]) / (df["+di"] + df["-di"])
-    df["adx"] = df["dx"].ewm(span=period).mean()
-
-    return df[["adx", "+di", "-di"]]
+    engine = IndicatorEngine(df)
+    return pd.DataFrame(engine.adx(period), index=engine.index)
 
 
 def calculate_ichimoku(df: pd.DataFrame) -> Dict[str, pd.Series]:
@@ -654,14 +776,8 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     Returns:
         pd.Series: ATR values
     """
-    high_low = df["high"] - df["low"]
-    high_close = abs(df["high"] - df["close"].shift())
-    low_close = abs(df["low"] - df["close"].shift())
-
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-
-    return true_range.rolling(period).mean()
+    engine = IndicatorEngine(df)
+    return engine.series(engine.atr(period))
 
 
 def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> float:
@@ -676,22 +792,28 @@ def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> floa
         max_lag: Maximum lag for R/S calculation
 
     Returns:
-        float: Hurst exponent
+        float: Hurst exponent (0.5 if the series is too short)
     """
-    lags = range(2, max_lag)
-    # Add small epsilon to avoid log(0)
-    tau = [
-        max(1e-8, np.sqrt(np.std(np.subtract(price_series[lag:], price_series[:-lag]))))
-        for lag in lags
-    ]
+    prices = np.asarray(price_series, dtype=np.float64)
+    return IndicatorEngine(pd.DataFrame({"close": prices})).hurst(max_lag)
+
 
-    # Return the Hurst exponent from linear fit
-    try:
-        reg = np.polyfit(np.log(lags), np.log(tau), 1)
-        return reg[0]  # Hurst exponent is the slope
-    except (ValueError, RuntimeWarning):
-        # Return 0.5 (random walk) if calculation fails
-        return 0.5
+def calculate_rolling_hurst(
+    price_series: pd.Series, window: int = 63, max_lag: int = 20
+) -> pd.Series:
+    """
+    Calculate the Hurst exponent over a rolling window
+
+    Args:
+        price_series: Price series
+        window: Number of prices in each window (must exceed max_lag - 1)
+        max_lag: Maximum lag for R/S calculation
+
+    Returns:
+        pd.Series: Hurst exponent of the window ending at each row (NaN for the first window - 1 rows)
+    """
+    engine = IndicatorEngine(pd.DataFrame({"close": price_series}))
+    return engine.series(engine.rolling_hurst(window, max_lag), name="hurst")
 
 
 def calculate_obv(prices_df: pd.DataFrame) -> pd.Series:
@@ -707,13 +829,5 @@ def calculate_obv(prices_df: pd.DataFrame) -> pd.Series:
     Returns:
         pd.Series: Cumulative OBV values
     """
-    obv = [0]
-    for i in range(1, len(prices_df)):
-        if prices_df["close"].iloc[i] > prices_df["close"].iloc[i - 1]:
-            obv.append(obv[-1] + prices_df["volume"].iloc[i])
-        elif prices_df["close"].iloc[i] < prices_df["close"].iloc[i - 1]:
-            obv.append(obv[-1] - prices_df["volume"].iloc[i])
-        else:
-            obv.append(obv[-1])
-    prices_df["OBV"] = obv
-    return prices_df["OBV"]
+    engine = IndicatorEngine(prices_df)
+    return engine.series(engine.obv(), name="OBV")
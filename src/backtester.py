@@ -1,14 +1,20 @@
 from datetime import datetime, timedelta
+from functools import partial
 
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from agents.decision_schema import validate_decision
+from agents.portfolio_manager import DECISION_ENGINES
 from main import run_hedge_fund
 from tools.api import get_price_API_HYPERLIQUID
+from tools.snapshot_store import SNAPSHOT_MODES, point_in_time, snapshot_store
 
 
 class Backtester:
-    def __init__(self, agent, crypto, start_date, end_date, initial_capital):
+    def __init__(
+        self, agent, crypto, start_date, end_date, initial_capital, leverage=1.0, risk=0.01
+    ):
         """Initialize the backtester with trading parameters.
 
         Args:
@@ -17,6 +23,8 @@ class Backtester:
             start_date: Start date for the backtest (YYYY-MM-DD)
             end_date: End date for the backtest (YYYY-MM-DD)
             initial_capital: Initial capital to start trading with
+            leverage: Leverage passed to the agent with the portfolio
+            risk: Fraction of the fund the agent may lose per trade
         """
         self.agent = agent
         self.crypto = crypto
@@ -25,6 +33,8 @@ class Backtester:
         self.initial_capital = initial_capital
         self.portfolio = {
             "cash": initial_capital,
+            "leverage": leverage,
+            "risk": risk,
             "collateral_long": 0,
             "collateral_short": 0,
             "price_collateral": 0,
@@ -35,20 +45,17 @@ class Backtester:
         """Parse the trading action from the agent's output.
 
         Args:
-            agent_output: JSON string containing trading decision from agent
+            agent_output: JSON trading decision from the agent ({"decision": {"action", "quantity", ...}, ...})
 
         Returns:
             tuple: (action, quantity) where action is the trading action
             (long/short/hold) and quantity is the trade size
         """
         try:
-            # Expect JSON output from agent
-            import json
-
-            decision = json.loads(agent_output)
-            return decision["action"], decision["quantity"]
-        except:
-            print(f"Error parsing action: {agent_output}")
+            decision = validate_decision(agent_output).decision
+            return decision.action, decision.quantity
+        except ValueError as e:
+            print(f"Error parsing action: {agent_output} ({str(e)})")
             return "hold", 0
 
     def execute_trade(self, action, quantity, current_price):
@@ -124,12 +131,15 @@ class Backtester:
 
             self.sell_collateral(current_price)
 
-            agent_output = self.agent(
-                crypto=self.crypto,
-                start_date=lookback_start,
-                end_date=current_date_str,
-                portfolio=self.portfolio,
-            )
+            # With SNAPSHOT_MODE=replay the agents see the Copin and LunarCrush
+            # data recorded up to this day instead of today's
+            with point_in_time(current_date_str):
+                agent_output = self.agent(
+                    crypto=self.crypto,
+                    start_date=lookback_start,
+                    end_date=current_date_str,
+                    portfolio=self.portfolio,
+                )
 
             action, quantity = self.parse_action(agent_output)
 
@@ -235,16 +245,42 @@ if __name__ == "__main__":
         default=100000,
         help="Initial capital amount (default: 100000)",
     )
+    parser.add_argument(
+        "--leverage", type=float, default=1.0, help="Leverage (default: 1)"
+    )
+    parser.add_argument(
+        "--risk",
+        type=float,
+        default=0.01,
+        help="Fraction of the fund risked per trade (default: 0.01)",
+    )
+    parser.add_argument(
+        "--decision-engine",
+        choices=DECISION_ENGINES,
+        help="Portfolio decision engine; 'rules' makes reproducible decisions without "
+        "LLM calls. Default: PORTFOLIO_DECISION_ENGINE or llm",
+    )
+
+    parser.add_argument(
+        "--snapshot-mode",
+        choices=SNAPSHOT_MODES,
+        help="'replay' runs offline on recorded upstream snapshots as of each day; "
+        "'record' saves live data. Default: SNAPSHOT_MODE or off",
+    )
 
     args = parser.parse_args()
+    if args.snapshot_mode:
+        snapshot_store.mode = args.snapshot_mode
 
     # Create an instance of Backtester
     backtester = Backtester(
-        agent=run_hedge_fund,
+        agent=partial(run_hedge_fund, decision_engine=args.decision_engine),
         crypto=args.crypto,
         start_date=args.start_date,
         end_date=args.end_date,
         initial_capital=args.initial_capital,
+        leverage=args.leverage,
+        risk=args.risk,
     )
 
     # Run the backtesting process
@@ -0,0 +1,187 @@
+import argparse
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from agents.indicators import IndicatorEngine
+from agents.technicals import (
+    calculate_obv,
+    calculate_strategy_signal_arrays,
+    ensemble_score_arrays,
+)
+from scanner import SCAN_INTERVAL, SCAN_STRATEGIES, SCANNER_LOOKBACK, load_panel, score_panel
+from tools.api import PRICE_COLUMNS
+from tools.candle_store import CANDLE_DTYPE, CandleStore
+
+
+def make_prices(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic hourly OHLCV frame with a random-walk close.
+
+    Args:
+        n_rows: Number of candles
+        seed: Random seed
+
+    Returns:
+        pd.DataFrame: Frame with open, close, high, low and volume columns
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.005, n_rows)) * close
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "close": close,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "volume": rng.uniform(100, 10_000, n_rows),
+        },
+        index=pd.date_range("2020-01-01", periods=n_rows, freq="h", tz="UTC"),
+    )
+
+
+def obv_loop(prices_df: pd.DataFrame) -> pd.Series:
+    """Reference row-by-row OBV, kept to check and time the vectorized version."""
+    obv = [0]
+    for i in range(1, len(prices_df)):
+        if prices_df["close"].iloc[i] > prices_df["close"].iloc[i - 1]:
+            obv.append(obv[-1] + prices_df["volume"].iloc[i])
+        elif prices_df["close"].iloc[i] < prices_df["close"].iloc[i - 1]:
+            obv.append(obv[-1] - prices_df["volume"].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return pd.Series(obv, index=prices_df.index, dtype=float)
+
+
+def benchmark_obv(sizes, repeat: int = 3):
+    """Time the loop and vectorized OBV implementations and check they agree.
+
+    Args:
+        sizes: Frame lengths to benchmark
+        repeat: Number of timing runs for the vectorized version (best is kept)
+    """
+    print(f"{'Rows':>10} {'Loop (ms)':>12} {'Vectorized (ms)':>16} {'Speedup':>10}")
+    for n_rows in sizes:
+        prices_df = make_prices(n_rows)
+        expected = obv_loop(prices_df)
+        result = calculate_obv(prices_df.copy())
+        assert np.allclose(expected.to_numpy(), result.to_numpy()), "OBV mismatch"
+
+        loop_time = timeit.timeit(lambda: obv_loop(prices_df), number=1)
+        vector_time = min(
+            timeit.repeat(
+                lambda: calculate_obv(prices_df.copy()), number=1, repeat=repeat
+            )
+        )
+        print(
+            f"{n_rows:>10} {loop_time * 1000:>12.2f} {vector_time * 1000:>16.3f} "
+            f"{loop_time / vector_time:>9.0f}x"
+        )
+
+
+def scan_loop(symbols, frames) -> dict:
+    """Reference per-symbol scan, kept to check and time the panel version."""
+    scores = {}
+    for symbol, prices_df in zip(symbols, frames):
+        signals = calculate_strategy_signal_arrays(IndicatorEngine(prices_df))
+        scores[symbol] = ensemble_score_arrays(
+            {name: signals[name] for name in SCAN_STRATEGIES}
+        )[-1]
+    return scores
+
+
+def benchmark_scanner(universe_sizes, lookback: int = SCANNER_LOOKBACK, repeat: int = 3):
+    """Time a scan of synthetic universes read from a temporary candle store.
+
+    Reports loading the (symbol, time) panel from the store and scoring it in one
+    vectorized pass, against scoring each symbol on its own, and checks that both
+    give the same combined scores.
+
+    Args:
+        universe_sizes: Numbers of symbols to scan
+        lookback: Hourly bars per symbol
+        repeat: Number of timing runs for the panel version (best is kept)
+    """
+    print(
+        f"{'Symbols':>10} {'Load (ms)':>10} {'Score (ms)':>11} "
+        f"{'Per-symbol (ms)':>16} {'Speedup':>10}"
+    )
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        end = pd.Timestamp.now(tz="UTC").floor("h")
+        for n_symbols in universe_sizes:
+            symbols = [f"COIN{i}" for i in range(n_symbols)]
+            for seed, symbol in enumerate(symbols):
+                if store.coverage("synthetic", symbol, SCAN_INTERVAL):
+                    continue
+                prices_df = make_prices(lookback + 24, seed)
+                prices_df.index = pd.date_range(
+                    end=end, periods=len(prices_df), freq="h"
+                )
+                candles = np.empty(len(prices_df), dtype=CANDLE_DTYPE)
+                candles["timestamp"] = prices_df.index.as_unit("ms").asi8
+                for column in PRICE_COLUMNS:
+                    candles[column] = prices_df[column]
+                store.write(
+                    "synthetic",
+                    symbol,
+                    SCAN_INTERVAL,
+                    candles,
+                    int(candles["timestamp"][0]),
+                    int(candles["timestamp"][-1]),
+                )
+
+            load_time = min(
+                timeit.repeat(
+                    lambda: load_panel(symbols, lookback=lookback, venue="synthetic", store=store),
+                    number=1,
+                    repeat=repeat,
+                )
+            )
+            kept, _, panel = load_panel(symbols, lookback=lookback, venue="synthetic", store=store)
+            score_time = min(
+                timeit.repeat(lambda: score_panel(kept, panel), number=1, repeat=repeat)
+            )
+
+            frames = [
+                pd.DataFrame({column: panel[column][row] for column in PRICE_COLUMNS})
+                for row in range(len(kept))
+            ]
+            expected = scan_loop(kept, frames)
+            results = score_panel(kept, panel)["combined_score"]
+            assert np.allclose(
+                results.loc[kept].to_numpy(), [expected[symbol] for symbol in kept]
+            ), "Scanner mismatch"
+            loop_time = timeit.timeit(lambda: scan_loop(kept, frames), number=1)
+
+            print(
+                f"{n_symbols:>10} {load_time * 1000:>10.1f} {score_time * 1000:>11.1f} "
+                f"{loop_time * 1000:>16.1f} {loop_time / score_time:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for indicators")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 50_000],
+        help="Number of candles to benchmark with",
+    )
+    parser.add_argument(
+        "--universe-sizes",
+        type=int,
+        nargs="+",
+        default=[50, 500],
+        help="Number of symbols to benchmark the scanner with",
+    )
+    args = parser.parse_args()
+
+    print("\nOn-Balance Volume")
+    benchmark_obv(args.sizes)
+
+    print("\nCross-sectional scanner")
+    benchmark_scanner(args.universe_sizes)
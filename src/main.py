@@ -1,15 +1,12 @@
-from langchain_core.messages import HumanMessage
-from langgraph.graph import END, StateGraph
-
-from agents.market_data import market_data_agent, check_data_valid
-from agents.portfolio_manager import portfolio_management_agent
-from agents.technicals import technical_analyst_agent
-from agents.risk_manager import risk_management_agent
-from agents.sentiment import sentiment_agent
-from agents.state import AgentState
+from agents.market_data import check_data_valid
+from tools import http_client, llm_client
+from tools.snapshot_store import SNAPSHOT_MODES, snapshot_store
+from agents.portfolio_manager import DECISION_ENGINES
+from workflow import DEFAULT_BATCH_CONCURRENCY, arun_batch, create_initial_state, create_workflow
 
 import argparse
 from datetime import datetime
+from typing import Optional
 
 
 ##### Run the AIBrokers #####
@@ -19,6 +16,7 @@ def run_hedge_fund(
     end_date: str,
     portfolio: dict,
     show_reasoning: bool = False,
+    decision_engine: Optional[str] = None,
 ):
     """Run the AI-powered hedge fund trading system.
 
@@ -31,61 +29,95 @@ def run_hedge_fund(
             - leverage: Trading leverage
             - risk: Risk tolerance per trade
         show_reasoning: Whether to display agent reasoning
+        decision_engine: "llm", "rules" (closed-form, no LLM call) or "rules+explain"
+            (closed-form decision explained by the LLM). Defaults to PORTFOLIO_DECISION_ENGINE
 
     Returns:
         str: Trading decision in JSON format containing action and quantity
     """
-    valid = check_data_valid(crypto, start_date, end_date)
-    if valid:
+    market_data = check_data_valid(crypto, start_date, end_date, return_data=True)
+    if market_data:
         final_state = app.invoke(
-            {
-                "messages": [
-                    HumanMessage(
-                        content="Make a trading decision based on the provided data.",
-                    )
-                ],
-                "data": {
-                    "crypto": crypto,
-                    "portfolio": portfolio,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "analyst_signals": {},
-                },
-                "metadata": {
-                    "show_reasoning": show_reasoning,
-                },
-            },
+            create_initial_state(
+                crypto,
+                start_date,
+                end_date,
+                portfolio,
+                show_reasoning,
+                market_data,
+                decision_engine,
+            )
         )
         return final_state["messages"][-1].content
     else:
         return "Cant Run AI"
 
 
-# Define the new workflow
-workflow = StateGraph(AgentState)
+def run_hedge_fund_batch(
+    cryptos: list[str],
+    start_date: str,
+    end_date: str,
+    portfolio: dict,
+    show_reasoning: bool = False,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    on_result=None,
+    decision_engine: Optional[str] = None,
+):
+    """Run the trading system for several cryptocurrencies at once.
+
+    The symbols share one upstream fetch pass and one pooled HTTP client, and at
+    most max_concurrency graphs run at a time (see workflow.arun_batch).
 
-# Add nodes
-workflow.add_node("market_data_agent", market_data_agent)
-workflow.add_node("technical_analyst_agent", technical_analyst_agent)
-workflow.add_node("sentiment_agent", sentiment_agent)
-workflow.add_node("risk_management_agent", risk_management_agent)
-workflow.add_node("portfolio_management_agent", portfolio_management_agent)
+    Args:
+        cryptos: Symbols of the cryptocurrencies to trade
+        start_date: Start date for analysis (YYYY-MM-DD)
+        end_date: End date for analysis (YYYY-MM-DD)
+        portfolio: Dictionary containing portfolio information, used for every symbol
+        show_reasoning: Whether to display agent reasoning
+        max_concurrency: Maximum number of symbols analysed at once
+        on_result: Optional callback(crypto, decision) called as each symbol finishes
+        decision_engine: Portfolio decision engine (see run_hedge_fund)
 
-# Define the workflow
-workflow.set_entry_point("market_data_agent")
-workflow.add_edge("market_data_agent", "technical_analyst_agent")
-workflow.add_edge("market_data_agent", "sentiment_agent")
-workflow.add_edge("technical_analyst_agent", "risk_management_agent")
-workflow.add_edge("sentiment_agent", "risk_management_agent")
-workflow.add_edge("risk_management_agent", "portfolio_management_agent")
-workflow.add_edge("portfolio_management_agent", END)
+    Returns:
+        dict: Symbol -> trading decision in JSON format, or "Cant Run AI"
+    """
 
-app = workflow.compile()
+    async def collect():
+        results = {}
+        try:
+            async for result in arun_batch(
+                app,
+                cryptos,
+                start_date,
+                end_date,
+                portfolio,
+                show_reasoning,
+                max_concurrency,
+                decision_engine,
+            ):
+                final_state = result["final_state"]
+                decision = final_state["messages"][-1].content if final_state else "Cant Run AI"
+                results[result["crypto"]] = decision
+                if on_result:
+                    on_result(result["crypto"], decision)
+        finally:
+            await llm_client.aclose_async_llm()
+        return results
+
+    return http_client.run_sync(collect())
+
+
+app = create_workflow()
 
 # Add this at the bottom of the file
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the hedge fund trading system")
-    parser.add_argument("--crypto", type=str, required=True, help="Stock crypto symbol")
+    parser.add_argument(
+        "--crypto",
+        type=str,
+        required=True,
+        help="Crypto symbol, or a comma-separated list (e.g. BTC,ETH,SOL) to analyse a batch",
+    )
     parser.add_argument(
         "--balance",
         type=float,
@@ -110,8 +142,28 @@ if __name__ == "__main__":
     parser.add_argument(
         "--show-reasoning", action="store_true", help="Show reasoning from each agent"
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help=f"Symbols analysed at once in a batch. Default: {DEFAULT_BATCH_CONCURRENCY}",
+    )
+    parser.add_argument(
+        "--decision-engine",
+        choices=DECISION_ENGINES,
+        help="How the portfolio manager decides: llm, rules (closed-form, no LLM call) "
+        "or rules+explain. Default: PORTFOLIO_DECISION_ENGINE or llm",
+    )
+    parser.add_argument(
+        "--snapshot-mode",
+        choices=SNAPSHOT_MODES,
+        help="'record' saves the Copin and LunarCrush data of this run for backtest "
+        "replay. Default: SNAPSHOT_MODE or off",
+    )
 
     args = parser.parse_args()
+    if args.snapshot_mode:
+        snapshot_store.mode = args.snapshot_mode
 
     # Validate dates if provided
     if args.start_date:
@@ -134,13 +186,27 @@ if __name__ == "__main__":
     if not args.risk:
         portfolio["risk"] = 0.05
 
-    result = run_hedge_fund(
-        crypto=args.crypto,
-        start_date=args.start_date,
-        end_date=args.end_date,
-        portfolio=portfolio,
-        show_reasoning=args.show_reasoning,
-    )
-    print("\nFinal Result:")
+    cryptos = [crypto.strip() for crypto in args.crypto.split(",") if crypto.strip()]
+    if len(cryptos) > 1:
+        run_hedge_fund_batch(
+            cryptos=cryptos,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            portfolio=portfolio,
+            show_reasoning=args.show_reasoning,
+            max_concurrency=args.max_concurrency,
+            decision_engine=args.decision_engine,
+            on_result=lambda crypto, result: print(f"\nFinal Result ({crypto}):\n{result}"),
+        )
+    else:
+        result = run_hedge_fund(
+            crypto=cryptos[0],
+            start_date=args.start_date,
+            end_date=args.end_date,
+            portfolio=portfolio,
+            show_reasoning=args.show_reasoning,
+            decision_engine=args.decision_engine,
+        )
+        print("\nFinal Result:")
 
-    print(result)
+        print(result)
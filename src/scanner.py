@@ -0,0 +1,222 @@
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.indicators import IndicatorEngine
+from agents.technicals import calculate_strategy_signal_arrays, ensemble_score_arrays
+from tools.api import PRICE_COLUMNS, backfill_candles, candle_store, date_to_timestamp
+from tools.candle_store import INTERVAL_MS
+
+
+# Hourly bars loaded per symbol: enough for the 126-bar momentum window and the
+# 84-bar volatility regime, and for the EMAs and ADX to settle (longer histories
+# give the same latest scores)
+SCANNER_LOOKBACK = 300
+# Symbols with fewer stored candles in the lookback are left out of the ranking
+MIN_SCAN_BARS = 200
+SCAN_STRATEGIES = ("trend", "momentum", "mean_reversion", "volatility", "stat_arb")
+SCAN_INTERVAL = "1h"
+
+
+def _last_candle_time(end=None) -> int:
+    """Open time (ms) of the last candle closed at `end` (default now)."""
+    step = INTERVAL_MS[SCAN_INTERVAL]
+    end = int(time.time() * 1000) if end is None else date_to_timestamp(end)
+    return (end - step) // step * step
+
+
+def load_panel(
+    symbols: list[str],
+    end=None,
+    lookback: int = SCANNER_LOOKBACK,
+    venue: str = "hyperliquid",
+    store=candle_store,
+) -> tuple[list[str], np.ndarray, dict]:
+    """Load the stored candles of a universe into (symbol, time) arrays.
+
+    Every symbol is placed on the same hourly grid of `lookback` bars ending at
+    the last closed candle. Gaps are filled with flat candles at the previous
+    close and zero volume; bars before a symbol's first candle stay NaN.
+
+    Args:
+        symbols: Symbols to load
+        end: End of the window (YYYY-MM-DD string or datetime, default now)
+        lookback: Hourly bars per symbol
+        venue: Candle store venue
+        store: Candle store to read from
+
+    Returns:
+        tuple: (symbols with at least MIN_SCAN_BARS candles, grid open times in ms,
+            dict of PRICE_COLUMNS -> (symbol, time) float64 arrays)
+    """
+    step = INTERVAL_MS[SCAN_INTERVAL]
+    grid = _last_candle_time(end) - step * np.arange(lookback - 1, -1, -1)
+    panel = {column: np.full((len(symbols), lookback), np.nan) for column in PRICE_COLUMNS}
+    for row, symbol in enumerate(symbols):
+        candles = store.read(venue, symbol, SCAN_INTERVAL, grid[0], grid[-1])
+        bars = (candles["timestamp"] - grid[0]) // step
+        for column in PRICE_COLUMNS:
+            panel[column][row, bars] = candles[column]
+
+    valid = ~np.isnan(panel["close"])
+    keep = valid.sum(axis=1) >= min(MIN_SCAN_BARS, lookback)
+    valid = valid[keep]
+    panel = {column: values[keep] for column, values in panel.items()}
+
+    # Index of the latest stored bar at or before each bar, for forward filling
+    latest = np.where(valid, np.arange(lookback), 0)
+    np.maximum.accumulate(latest, axis=1, out=latest)
+    close = np.take_along_axis(panel["close"], latest, axis=1)
+    for column in ("open", "high", "low"):
+        panel[column] = np.where(valid, panel[column], close)
+    panel["close"] = close
+    panel["volume"] = np.where(valid, panel["volume"], 0.0)
+    return [symbol for symbol, kept in zip(symbols, keep) if kept], grid, panel
+
+
+def score_panel(symbols: list[str], panel: dict) -> pd.DataFrame:
+    """Score every symbol of a panel with the technical strategies in one pass.
+
+    The strategies are the vectorized technicals rules, evaluated on the whole
+    (symbol, time) panel at once. Each strategy score is the latest bar's signed
+    direction times its confidence, and combined_score is the signed weighted
+    ensemble score before the neutral band is applied, both from -1 (strongly
+    bearish) to 1 (strongly bullish). Ranking by combined_score therefore orders
+    coins whose ensemble is neutral too; signal and confidence are the thresholded
+    ensemble the technical analyst would report.
+
+    Args:
+        symbols: Row labels of the panel
+        panel: PRICE_COLUMNS -> (symbol, time) arrays (see load_panel)
+
+    Returns:
+        pd.DataFrame: One row per symbol, ranked by combined_score, with rank,
+            signal, confidence, close, change_24h, <strategy>_score, combined_score
+            and the adx, z_score, momentum and volatility_regime metrics behind them
+    """
+    engine = IndicatorEngine(panel)
+    signals = calculate_strategy_signal_arrays(engine)
+    close = engine.close
+
+    table = {
+        "close": close[:, -1],
+        "change_24h": close[:, -1] / close[:, -25] - 1 if close.shape[1] > 24 else np.nan,
+    }
+    for name in SCAN_STRATEGIES:
+        direction, confidence = signals[name]
+        table[f"{name}_score"] = direction[:, -1] * confidence[:, -1]
+    table["combined_score"] = ensemble_score_arrays(
+        {name: signals[name] for name in SCAN_STRATEGIES}
+    )[:, -1]
+
+    # Metrics already computed by the strategies (the engine memoizes them)
+    table["adx"] = engine.adx(14)["adx"][:, -1]
+    table["z_score"] = (
+        (close[:, -1] - engine.rolling("close", 50, "mean")[:, -1])
+        / engine.rolling("close", 50, "std")[:, -1]
+    )
+    table["momentum"] = (
+        0.4 * engine.rolling("returns", 21, "sum")[:, -1]
+        + 0.3 * engine.rolling("returns", 63, "sum")[:, -1]
+        + 0.3 * engine.rolling("returns", 126, "sum")[:, -1]
+    )
+    table["volatility_regime"] = (
+        engine.historical_volatility(21)[:, -1]
+        / engine.rolling("historical_volatility", 63, "mean")[:, -1]
+    )
+
+    results = pd.DataFrame(table, index=pd.Index(symbols, name="symbol"))
+    direction, confidence = signals["combined"]
+    results.insert(0, "confidence", confidence[:, -1])
+    results.insert(
+        0,
+        "signal",
+        np.where(
+            direction[:, -1] > 0,
+            "bullish",
+            np.where(direction[:, -1] < 0, "bearish", "neutral"),
+        ),
+    )
+    results = results.sort_values("combined_score", ascending=False, kind="stable")
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    return results
+
+
+def scan(
+    symbols: Optional[list[str]] = None,
+    end=None,
+    lookback: int = SCANNER_LOOKBACK,
+    venue: str = "hyperliquid",
+    refresh: bool = False,
+) -> pd.DataFrame:
+    """Rank a universe of coins by the technical strategies.
+
+    Args:
+        symbols: Symbols to scan (default: every symbol in the candle store)
+        end: End of the window (YYYY-MM-DD string or datetime, default now)
+        lookback: Hourly bars per symbol
+        venue: Candle store venue
+        refresh: Fetch the candles missing from the store before scanning
+
+    Returns:
+        pd.DataFrame: score_panel() table (empty if no symbol has enough candles)
+    """
+    if symbols is None:
+        symbols = candle_store.symbols(venue, SCAN_INTERVAL)
+    if refresh and symbols:
+        last = _last_candle_time(end)
+        start = last - INTERVAL_MS[SCAN_INTERVAL] * (lookback - 1)
+        backfill_candles(
+            symbols,
+            datetime.fromtimestamp(start / 1000),
+            datetime.fromtimestamp(last / 1000),
+            venue,
+        )
+
+    symbols, _, panel = load_panel(symbols, end, lookback, venue)
+    return score_panel(symbols, panel)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Rank coins from the candle store by the technical strategies"
+    )
+    parser.add_argument(
+        "--symbols",
+        type=str,
+        help="Comma-separated symbols (default: every symbol in the candle store)",
+    )
+    parser.add_argument("--end-date", type=str, help="End date in YYYY-MM-DD format (default: now)")
+    parser.add_argument(
+        "--lookback",
+        type=int,
+        default=SCANNER_LOOKBACK,
+        help=f"Hourly bars per symbol (default: {SCANNER_LOOKBACK})",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Fetch missing candles from HyperLiquid before scanning",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Rows to print (default: 20)")
+    parser.add_argument("--output", type=str, help="Write the ranked table to this CSV file")
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = scan(
+        args.symbols.split(",") if args.symbols else None,
+        args.end_date,
+        args.lookback,
+        refresh=args.refresh,
+    )
+    print(f"Scanned {len(results)} symbols in {time.perf_counter() - started:.2f}s")
+    print(results.head(args.top).to_string())
+    if args.output:
+        results.to_csv(args.output)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,259 @@
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.indicators import IndicatorEngine
+from agents.technicals import STRATEGY_WEIGHTS, calculate_strategy_signal_arrays
+from tools.api import PRICE_COLUMNS, get_price_API_HYPERLIQUID
+from vector_backtester import WARMUP_DAYS, performance_metrics, simulate
+
+
+# Parameters a sweep may vary. "weight_<strategy>" sets one technical strategy
+# weight; the others keep their STRATEGY_WEIGHTS value
+SIMULATION_PARAMETERS = (
+    "leverage",
+    "risk",
+    "rebalance_every",
+    "fee_rate",
+    "signal_threshold",
+    "neutral_threshold",
+)
+WEIGHT_PREFIX = "weight_"
+SWEEP_PARAMETERS = SIMULATION_PARAMETERS + tuple(
+    WEIGHT_PREFIX + strategy for strategy in STRATEGY_WEIGHTS
+)
+
+# Per-worker state: the shared price block and the signals scored from it
+_worker = {}
+
+
+def parameter_grid(grid: dict) -> list[dict]:
+    """Every combination of the values in a grid.
+
+    Args:
+        grid: Parameter name -> list of values
+
+    Returns:
+        list: One parameter dict per combination
+    """
+    _check_parameters(grid)
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def random_search(space: dict, n_samples: int, seed: Optional[int] = None) -> list[dict]:
+    """Random parameter configurations.
+
+    Args:
+        space: Parameter name -> list of values to choose from, or [low, high]
+            given as a tuple (or {"low": .., "high": ..}) to sample uniformly
+        n_samples: Number of configurations
+        seed: Random seed, for reproducible sweeps
+
+    Returns:
+        list: One parameter dict per sample
+    """
+    _check_parameters(space)
+    rng = random.Random(seed)
+
+    def sample(values):
+        if isinstance(values, dict):
+            values = (values["low"], values["high"])
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(values)
+
+    return [
+        {name: sample(values) for name, values in space.items()}
+        for _ in range(n_samples)
+    ]
+
+
+def _check_parameters(space: dict):
+    unknown = set(space) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(
+            f"Unknown sweep parameters {sorted(unknown)}, expected some of {SWEEP_PARAMETERS}"
+        )
+
+
+def _share_prices(prices_df: pd.DataFrame) -> shared_memory.SharedMemory:
+    """Copy the timestamps and OHLCV columns into one shared (6, n) float64 block."""
+    block = shared_memory.SharedMemory(create=True, size=6 * len(prices_df) * 8)
+    values = np.ndarray((6, len(prices_df)), dtype=np.float64, buffer=block.buf)
+    # Millisecond timestamps are exact in float64
+    values[0] = prices_df.index.as_unit("ms").asi8
+    values[1:] = prices_df[PRICE_COLUMNS].to_numpy(dtype=np.float64).T
+    return block
+
+
+def _init_worker(block_name: str, length: int):
+    """Attach to the shared prices and score the history once for this process."""
+    block = shared_memory.SharedMemory(name=block_name)
+    values = np.ndarray((6, length), dtype=np.float64, buffer=block.buf)
+    values.flags.writeable = False
+    index = pd.to_datetime(values[0].astype(np.int64), unit="ms", utc=True)
+    prices_df = pd.DataFrame(
+        values[1:].T, index=index, columns=PRICE_COLUMNS, copy=False
+    )
+    _worker.update(
+        block=block,
+        prices=prices_df,
+        signals=calculate_strategy_signal_arrays(IndicatorEngine(prices_df)),
+    )
+
+
+def _run_config(task: tuple) -> dict:
+    params, start, initial_capital = task
+    options = {name: params[name] for name in SIMULATION_PARAMETERS if name in params}
+    weights = {
+        name[len(WEIGHT_PREFIX) :]: value
+        for name, value in params.items()
+        if name.startswith(WEIGHT_PREFIX)
+    }
+    if weights:
+        options["strategy_weights"] = {**STRATEGY_WEIGHTS, **weights}
+    try:
+        results = simulate(
+            _worker["prices"],
+            start,
+            initial_capital,
+            signals=_worker["signals"],
+            **options,
+        )
+        return {**params, **performance_metrics(results, initial_capital), "error": None}
+    except Exception as e:
+        return {**params, "error": str(e)}
+
+
+def run_sweep(
+    prices_df: pd.DataFrame,
+    configs: list[dict],
+    start=None,
+    initial_capital: float = 100000,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """Backtest many parameter configurations in parallel.
+
+    The price history is placed once in shared memory; each worker process
+    attaches to it without copying, scores the technical strategies once, and
+    then only re-runs the cheap ensemble and position simulation per config.
+
+    Args:
+        prices_df: 1h OHLCV frame, including the warm-up history
+        configs: Parameter dicts (see parameter_grid and random_search)
+        start: First bar to trade (timestamp or date string)
+        initial_capital: Starting portfolio value
+        max_workers: Worker processes (default: CPU count)
+
+    Returns:
+        pd.DataFrame: One row per config with its parameters, total_return,
+            sharpe_ratio, max_drawdown, trades and error, best Sharpe ratio first
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    block = _share_prices(prices_df)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(block.name, len(prices_df)),
+        ) as executor:
+            tasks = [(config, start, initial_capital) for config in configs]
+            chunksize = max(1, len(tasks) // (max_workers * 4))
+            rows = list(executor.map(_run_config, tasks, chunksize=chunksize))
+    finally:
+        block.close()
+        block.unlink()
+
+    results = pd.DataFrame(rows)
+    if "sharpe_ratio" in results:
+        results = results.sort_values("sharpe_ratio", ascending=False, ignore_index=True)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Sweep backtest parameters in parallel with the vectorized backtester"
+    )
+    parser.add_argument("--crypto", type=str, required=True, help="Crypto symbol (e.g., BTC)")
+    parser.add_argument(
+        "--end-date",
+        type=str,
+        default=datetime.now().strftime("%Y-%m-%d"),
+        help="End date in YYYY-MM-DD format",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        default=(datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d"),
+        help="Start date in YYYY-MM-DD format",
+    )
+    parser.add_argument(
+        "--initial-capital",
+        type=float,
+        default=100000,
+        help="Initial capital amount (default: 100000)",
+    )
+    parser.add_argument(
+        "--grid",
+        type=str,
+        help='Parameter grid as JSON, e.g. \'{"risk": [0.01, 0.02], "leverage": [1, 2, 5]}\'',
+    )
+    parser.add_argument(
+        "--random",
+        type=int,
+        help="Random search: number of samples from --space",
+    )
+    parser.add_argument(
+        "--space",
+        type=str,
+        help='Random search space as JSON; lists are sampled from, {"low", "high"} '
+        'uniformly, e.g. \'{"risk": {"low": 0.005, "high": 0.05}, "rebalance_every": [1, 4, 24]}\'',
+    )
+    parser.add_argument("--seed", type=int, help="Random search seed")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", type=str, help="Write the results table to this CSV file")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print (default: 20)")
+
+    args = parser.parse_args()
+
+    if args.grid:
+        configs = parameter_grid(json.loads(args.grid))
+    elif args.random and args.space:
+        configs = random_search(json.loads(args.space), args.random, args.seed)
+    else:
+        parser.error("Give either --grid or --random with --space")
+
+    warmup_start = datetime.strptime(args.start_date, "%Y-%m-%d") - timedelta(
+        days=WARMUP_DAYS
+    )
+    prices_df = get_price_API_HYPERLIQUID(args.crypto, warmup_start, args.end_date)
+    if isinstance(prices_df, str):
+        raise SystemExit(f"Error loading prices for {args.crypto}: {prices_df}")
+
+    started = time.perf_counter()
+    results = run_sweep(
+        prices_df, configs, args.start_date, args.initial_capital, args.workers
+    )
+    print(
+        f"Ran {len(results)} backtests of {args.crypto} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    print(results.head(args.top).to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Results written to {args.output}")
@@ -1,9 +1,16 @@
+import asyncio
 import os
+import numpy as np
 import pandas as pd
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from tools import http_client
+from tools.candle_store import CANDLE_DTYPE, INTERVAL_MS, CandleStore
+from tools.snapshot_store import snapshot_store
 
 
 load_dotenv(".env", override=True)
@@ -12,6 +19,14 @@ HYPERLIQUID_API_URL = os.environ.get("HYPERLIQUID_API_URL")
 BINANCE_API_URL = os.environ.get("BINANCE_API_URL")
 API_COPIN_OI = os.environ.get("API_COPIN_OI")
 
+candle_store = CandleStore()
+
+# Maximum number of candles each venue returns for a single request
+CANDLE_PAGE_SIZE = {
+    "hyperliquid": 5000,
+    "binance": 1500,
+}
+
 
 def date_to_timestamp(date):
     """
@@ -30,29 +45,174 @@ def date_to_timestamp(date):
     return timestamp_milliseconds
 
 
-def get_price_API_HYPERLIQUID(pair, open_time, close_time):
+PRICE_COLUMNS = ["open", "close", "high", "low", "volume"]
+
+
+def freeze_prices(data, index=None):
     """
-    Fetch historical price data from HyperLiquid API.
+    Return a read-only copy of price data as a DataFrame.
+
+    The OHLCV columns are stored in one read-only float64 block laid out column by
+    column, so df["close"].to_numpy() is a zero-copy, contiguous view. Agents share
+    this frame across graph branches and must treat it as immutable.
+
+    What is enforced: writing values in place raises ValueError, whether through
+    .loc, .iloc, .at, .iat, a column Series or a to_numpy() view. What is not:
+    structural changes to the frame object itself, such as df["new_col"] = ...,
+    replacing or deleting a column, setting df.index or df.columns, and any
+    inplace=True method (dropna, fillna, rename, ...). Those still succeed and are
+    seen by every agent holding the frame, so derive new Series/arrays (or call
+    df.copy()) instead.
 
     Args:
+        data (pandas.DataFrame or numpy.ndarray): Frame or structured candle array
+            with open, close, high, low and volume fields
+        index (pandas.Index, optional): Row index. Defaults to data.index
+
+    Returns:
+        pandas.DataFrame: Read-only frame with the OHLCV columns
+    """
+    values = np.empty((len(PRICE_COLUMNS), len(data)), dtype=np.float64)
+    for row, col in enumerate(PRICE_COLUMNS):
+        values[row] = data[col]
+    values.flags.writeable = False
+    if index is None:
+        index = data.index
+    return pd.DataFrame(values.T, index=index, columns=PRICE_COLUMNS, copy=False)
+
+
+def _candles_to_frame(candles):
+    """
+    Convert a structured candle array from the candle store into a price DataFrame.
+
+    Args:
+        candles (numpy.ndarray): Structured array with CANDLE_DTYPE
+
+    Returns:
+        pandas.DataFrame: Read-only DataFrame (see freeze_prices) with open, close,
+            high, low and volume columns, indexed by the candle open time (UTC)
+    """
+    if len(candles) == 0:
+        raise ValueError("No candles available for the requested window")
+    index = pd.to_datetime(candles["timestamp"], unit="ms", utc=True).rename(
+        "timestamp"
+    )
+    return freeze_prices(candles, index)
+
+
+def _candle_pages(venue, pair, open_time, close_time):
+    """
+    Walk the pages of a candle window that are missing from the candle store.
+
+    Generator shared by the sync and async loaders: it yields the (start_ms, end_ms,
+    limit) of each page to request and expects the fetched structured candle array
+    to be sent back, which it merges into the store before moving on (only the span
+    the returned candles cover is marked as stored, see CandleStore.write). Each missing
+    range is split into venue-sized pages, so gaps inside a stored window are filled
+    and long windows are never truncated by the venue's per-request limit. In
+    snapshot replay mode nothing is requested.
+
+    Args:
+        venue (str): Data source name used as the candle store key
         pair (str): Trading pair symbol
-        open_time (str or datetime): Start time for data fetch
-        close_time (str or datetime): End time for data fetch
+        open_time (int): Start time in milliseconds
+        close_time (int): End time in milliseconds
+
+    Yields:
+        tuple: (start_ms, end_ms, limit) of the next page to fetch
+    """
+    page_size = CANDLE_PAGE_SIZE[venue]
+    page_span = page_size * INTERVAL_MS["1h"]
+
+    # Replayed backtests run offline on the candles stored so far
+    missing_ranges = (
+        []
+        if snapshot_store.mode == "replay"
+        else candle_store.missing_ranges(venue, pair, "1h", open_time, close_time)
+    )
+    for start, end in missing_ranges:
+        cursor = start
+        while cursor <= end:
+            page_end = min(cursor + page_span - 1, end)
+            candles = yield cursor, page_end, page_size
+            if len(candles) >= page_size:
+                # The page was truncated, so only the returned span is complete
+                page_end = int(candles["timestamp"].max())
+            candle_store.write(venue, pair, "1h", candles, cursor, page_end)
+            cursor = page_end + 1
+
+
+def _load_candles(venue, pair, open_time, close_time, fetch_page):
+    """
+    Serve a candle window from the candle store, fetching only what is missing.
+
+    The missing pages (see _candle_pages) are requested one after another.
+
+    Args:
+        venue (str): Data source name used as the candle store key
+        pair (str): Trading pair symbol
+        open_time (int): Start time in milliseconds
+        close_time (int): End time in milliseconds
+        fetch_page (callable): Function (pair, start_ms, end_ms, limit) returning a
+            structured candle array for one page
 
     Returns:
-        pandas.DataFrame: DataFrame containing OHLCV data with columns:
-            - open: Opening price
-            - close: Closing price
-            - high: Highest price
-            - low: Lowest price
-            - volume: Trading volume
-        str: Error message if request fails
+        numpy.ndarray: Structured array with CANDLE_DTYPE covering the window
     """
-    open_time = date_to_timestamp(open_time)
-    close_time = date_to_timestamp(close_time)
-    APIURL = HYPERLIQUID_API_URL
+    pages = _candle_pages(venue, pair, open_time, close_time)
+    page = _next_page(pages)
+    while page is not None:
+        page = _next_page(pages, fetch_page(pair, *page))
+    return candle_store.read(venue, pair, "1h", open_time, close_time)
+
+
+async def _aload_candles(venue, pair, open_time, close_time, afetch_page):
+    """
+    Async version of _load_candles; afetch_page is a coroutine function.
+
+    The candle store file I/O runs in the loop's default executor, so the event
+    loop only waits on the page requests.
+    """
+    pages = _candle_pages(venue, pair, open_time, close_time)
+    page = await asyncio.to_thread(_next_page, pages)
+    while page is not None:
+        candles = await afetch_page(pair, *page)
+        page = await asyncio.to_thread(_next_page, pages, candles)
+    return await asyncio.to_thread(
+        candle_store.read, venue, pair, "1h", open_time, close_time
+    )
+
+
+def _next_page(pages, candles=None):
+    """
+    Store the previous page (if any) and return the next one to fetch.
+
+    Args:
+        pages (generator): _candle_pages() generator
+        candles (numpy.ndarray, optional): Candles of the previous page (None to start)
+
+    Returns:
+        tuple: (start_ms, end_ms, limit) of the next page, or None when the window is stored
+    """
+    try:
+        return pages.send(candles)
+    except StopIteration:
+        return None
+
 
-    data = {
+def _candle_snapshot_HYPERLIQUID(pair, open_time, close_time):
+    """
+    Build the HyperLiquid candleSnapshot request body for a millisecond window.
+
+    Args:
+        pair (str): Trading pair symbol
+        open_time (int): Start time in milliseconds
+        close_time (int): End time in milliseconds
+
+    Returns:
+        dict: Request body
+    """
+    return {
         "type": "candleSnapshot",
         "req": {
             "coin": pair,
@@ -62,52 +222,82 @@ def get_price_API_HYPERLIQUID(pair, open_time, close_time):
         },
     }
 
-    headers = {"Content-Type": "application/json"}
 
-    try:
-        response = requests.post(APIURL, json=data, headers=headers)
-        data = response.json()
-        df = pd.DataFrame(data)
-        df.rename(
-            columns={
-                "t": "timestamp",
-                "T": "close_time",
-                "s": "symbol",
-                "i": "interval",
-                "o": "open",
-                "c": "close",
-                "h": "high",
-                "l": "low",
-                "v": "volume",
-                "n": "number_of_trades",
-            },
-            inplace=True,
-        )
+def _parse_candles_HYPERLIQUID(data):
+    """
+    Convert a HyperLiquid candleSnapshot response into a structured candle array.
 
-        df = df[["open", "close", "high", "low", "volume"]]
-        numeric_cols = ["open", "close", "high", "low", "volume"]
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df.sort_index(inplace=True)
+    Args:
+        data (list): Decoded JSON response
 
-        return df
-    except Exception as e:
-        print(e)
-        return "Cannot find price of this crypto"
+    Returns:
+        numpy.ndarray: Structured array with CANDLE_DTYPE
+    """
+    if not isinstance(data, list):
+        raise ValueError(f"Unexpected HyperLiquid response: {data}")
 
+    candles = np.empty(len(data), dtype=CANDLE_DTYPE)
+    for field, key in [
+        ("timestamp", "t"),
+        ("open", "o"),
+        ("close", "c"),
+        ("high", "h"),
+        ("low", "l"),
+        ("volume", "v"),
+    ]:
+        candles[field] = [candle[key] for candle in data]
+    return candles
 
-def get_price_API_BINANCE(pair, open_time, close_time, limit: int = 1000):
+
+def _fetch_candles_HYPERLIQUID(pair, open_time, close_time, limit=None):
     """
-    Fetch historical price data from Binance Futures API.
+    Fetch raw 1h candles for a millisecond window from the HyperLiquid API.
+
+    Args:
+        pair (str): Trading pair symbol
+        open_time (int): Start time in milliseconds
+        close_time (int): End time in milliseconds
+        limit (int, optional): Unused, HyperLiquid caps each snapshot on its own
+
+    Returns:
+        numpy.ndarray: Structured array with CANDLE_DTYPE
+    """
+    headers = {"Content-Type": "application/json"}
+    response = http_client.post(
+        HYPERLIQUID_API_URL,
+        json=_candle_snapshot_HYPERLIQUID(pair, open_time, close_time),
+        headers=headers,
+    )
+    return _parse_candles_HYPERLIQUID(response.json())
+
+
+async def _afetch_candles_HYPERLIQUID(pair, open_time, close_time, limit=None):
+    """
+    Async version of _fetch_candles_HYPERLIQUID using the shared async client.
+    """
+    headers = {"Content-Type": "application/json"}
+    response = await http_client.apost(
+        HYPERLIQUID_API_URL,
+        json=_candle_snapshot_HYPERLIQUID(pair, open_time, close_time),
+        headers=headers,
+    )
+    return _parse_candles_HYPERLIQUID(response.json())
+
+
+def get_price_API_HYPERLIQUID(pair, open_time, close_time):
+    """
+    Fetch historical price data from HyperLiquid API.
+
+    Candles are served from the local candle store; only the parts of the window
+    that have not been stored yet are requested from the API, page by page.
 
     Args:
         pair (str): Trading pair symbol
         open_time (str or datetime): Start time for data fetch
         close_time (str or datetime): End time for data fetch
-        limit (int, optional): Maximum number of records to return. Defaults to 1000
 
     Returns:
-        pandas.DataFrame: DataFrame containing OHLCV data with columns:
+        pandas.DataFrame: Read-only DataFrame indexed by candle open time containing OHLCV data with columns:
             - open: Opening price
             - close: Closing price
             - high: Highest price
@@ -117,6 +307,56 @@ def get_price_API_BINANCE(pair, open_time, close_time, limit: int = 1000):
     """
     open_time = date_to_timestamp(open_time)
     close_time = date_to_timestamp(close_time)
+
+    try:
+        candles = _load_candles(
+            "hyperliquid", pair, open_time, close_time, _fetch_candles_HYPERLIQUID
+        )
+        return _candles_to_frame(candles)
+    except Exception as e:
+        print(e)
+        return "Cannot find price of this crypto"
+
+
+async def aget_price_API_HYPERLIQUID(pair, open_time, close_time):
+    """
+    Async version of get_price_API_HYPERLIQUID.
+
+    Args:
+        pair (str): Trading pair symbol
+        open_time (str or datetime): Start time for data fetch
+        close_time (str or datetime): End time for data fetch
+
+    Returns:
+        pandas.DataFrame: Same frame as get_price_API_HYPERLIQUID
+        str: Error message if request fails
+    """
+    open_time = date_to_timestamp(open_time)
+    close_time = date_to_timestamp(close_time)
+
+    try:
+        candles = await _aload_candles(
+            "hyperliquid", pair, open_time, close_time, _afetch_candles_HYPERLIQUID
+        )
+        return _candles_to_frame(candles)
+    except Exception as e:
+        print(e)
+        return "Cannot find price of this crypto"
+
+
+def _fetch_candles_BINANCE(pair, open_time, close_time, limit):
+    """
+    Fetch raw 1h candles for a millisecond window from the Binance Futures API.
+
+    Args:
+        pair (str): Trading pair symbol
+        open_time (int): Start time in milliseconds
+        close_time (int): End time in milliseconds
+        limit (int): Maximum number of records to return
+
+    Returns:
+        numpy.ndarray: Structured array with CANDLE_DTYPE
+    """
     APIURL = BINANCE_API_URL + "/fapi/v1/continuousKlines"
     paramsMap = {
         "pair": pair,
@@ -126,53 +366,108 @@ def get_price_API_BINANCE(pair, open_time, close_time, limit: int = 1000):
         "endTime": close_time,
         "limit": limit,
     }
-    try:
-        response = requests.get(APIURL, params=paramsMap)
-        print(paramsMap)
-        data = response.json()
-        df = pd.DataFrame(
-            data,
-            columns=[
-                "timestamp",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "close_time",
-                "quote_asset_volume",
-                "number_of_trades",
-                "taker_buy_base_asset_volume",
-                "taker_buy_quote_asset_volume",
-                "ignore",
-            ],
-        )
+    response = http_client.get(APIURL, params=paramsMap)
+    print(paramsMap)
+    data = response.json()
+    if not isinstance(data, list):
+        raise ValueError(f"Unexpected Binance response: {data}")
 
-        df = df[["open", "close", "high", "low", "volume"]]
-        numeric_cols = ["open", "close", "high", "low", "volume"]
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df.sort_index(inplace=True)
+    candles = np.empty(len(data), dtype=CANDLE_DTYPE)
+    for field, index in [
+        ("timestamp", 0),
+        ("open", 1),
+        ("high", 2),
+        ("low", 3),
+        ("close", 4),
+        ("volume", 5),
+    ]:
+        candles[field] = [kline[index] for kline in data]
+    return candles
 
-        return df
+
+def get_price_API_BINANCE(pair, open_time, close_time, limit: Optional[int] = None):
+    """
+    Fetch historical price data from Binance Futures API.
+
+    Candles are served from the local candle store; only the parts of the window
+    that have not been stored yet are requested from the API, page by page.
+
+    Args:
+        pair (str): Trading pair symbol
+        open_time (str or datetime): Start time for data fetch
+        close_time (str or datetime): End time for data fetch
+        limit (int, optional): Maximum number of records to return. Defaults to the whole window
+
+    Returns:
+        pandas.DataFrame: Read-only DataFrame indexed by candle open time containing OHLCV data with columns:
+            - open: Opening price
+            - close: Closing price
+            - high: Highest price
+            - low: Lowest price
+            - volume: Trading volume
+        str: Error message if request fails
+    """
+    open_time = date_to_timestamp(open_time)
+    close_time = date_to_timestamp(close_time)
+
+    try:
+        candles = _load_candles(
+            "binance", pair, open_time, close_time, _fetch_candles_BINANCE
+        )
+        return _candles_to_frame(candles[:limit])
     except Exception as e:
         print(e)
         return "Cannot find price of this crypto"
 
 
-def get_OI_position_Copin(pair: str, isLong: bool):
+def backfill_candles(pairs, open_time, close_time, venue="hyperliquid", max_workers=4):
     """
-    Fetch open interest data for a specific position type from Copin API.
+    Backfill the candle store for many pairs as one bounded job.
+
+    Pairs are processed by a fixed-size thread pool and every pair only requests the
+    pages it does not have yet, so re-running a backfill is close to free.
+
+    Args:
+        pairs (list): Trading pair symbols
+        open_time (str or datetime): Start time for data fetch
+        close_time (str or datetime): End time for data fetch
+        venue (str, optional): 'hyperliquid' or 'binance'. Defaults to 'hyperliquid'
+        max_workers (int, optional): Maximum number of pairs fetched at once. Defaults to 4
+
+    Returns:
+        dict: Number of stored candles in the window per pair, or an error message
+    """
+    fetch_page = {
+        "hyperliquid": _fetch_candles_HYPERLIQUID,
+        "binance": _fetch_candles_BINANCE,
+    }[venue]
+    open_time = date_to_timestamp(open_time)
+    close_time = date_to_timestamp(close_time)
+
+    def backfill_pair(pair):
+        try:
+            return len(_load_candles(venue, pair, open_time, close_time, fetch_page))
+        except Exception as e:
+            print(f"Backfill failed for {pair}: {e}")
+            return "Cannot find price of this crypto"
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(pairs, executor.map(backfill_pair, pairs)))
+
+
+def _copin_request(pair: str, isLong: bool):
+    """
+    Build the Copin top-positions request for one side of a pair.
+
+    Shared by the sync and async fetchers so both send byte-identical requests.
 
     Args:
         pair (str): Trading pair symbol (without -USDT suffix)
         isLong (bool): True for long positions, False for short positions
 
     Returns:
-        float: Total size of open interest for the specified position type
-        str: Error message if request fails
+        dict: Keyword arguments (headers and JSON-encoded body) for the POST request
     """
-    APIURL = API_COPIN_OI
     pair = pair + "-USDT"
     if isLong:
         value_long = "true"
@@ -187,22 +482,85 @@ def get_OI_position_Copin(pair: str, isLong: bool):
         "sortBy": "size",
         "sortType": "desc",
     }
-    headers = {"Content-Type": "application/json"}
+    return {
+        "headers": {"Content-Type": "application/json"},
+        "data": json.dumps(query),
+    }
+
+
+def _copin_total_size(data):
+    """
+    Sum the position sizes of a Copin top-positions response.
+
+    Args:
+        data (dict): Decoded JSON response
+
+    Returns:
+        float: Total size of the positions
+    """
+    return sum(d["size"] for d in data["data"])
+
+
+def get_OI_position_Copin(pair: str, isLong: bool):
+    """
+    Fetch open interest data for a specific position type from Copin API.
+
+    Args:
+        pair (str): Trading pair symbol (without -USDT suffix)
+        isLong (bool): True for long positions, False for short positions
+
+    Returns:
+        float: Total size of open interest for the specified position type
+        str: Error message if request fails
+    """
     try:
-        response = requests.post(APIURL, headers=headers, data=json.dumps(query))
-        data = response.json()
-        df = data["data"]
-        total_size = sum(d["size"] for d in df)
-        return total_size
+        response = http_client.post(API_COPIN_OI, **_copin_request(pair, isLong))
+        return _copin_total_size(response.json())
     except Exception as e:
         print(e)
         return "Cannot find OI of this crypto"
 
 
+async def aget_OI_position_Copin(pair: str, isLong: bool):
+    """
+    Async version of get_OI_position_Copin.
+    """
+    try:
+        response = await http_client.apost(API_COPIN_OI, **_copin_request(pair, isLong))
+        return _copin_total_size(response.json())
+    except Exception as e:
+        print(e)
+        return "Cannot find OI of this crypto"
+
+
+COPIN_OI_ERROR = "Cannot find OI of this crypto"
+
+
+def _is_open_interest(value):
+    return not isinstance(value, str)
+
+
+def _from_snapshot(value):
+    # JSON snapshots store the (long_oi, short_oi) tuple as a list
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _fetch_LS_OI_Copin(pair):
+    longOI = get_OI_position_Copin(pair, True)
+    shortOI = get_OI_position_Copin(pair, False)
+    if isinstance(longOI, str) | isinstance(shortOI, str):
+        return COPIN_OI_ERROR
+
+    return longOI, shortOI
+
+
 def get_LS_OI_Copin(pair):
     """
     Fetch both long and short open interest data from Copin API.
 
+    Goes through the snapshot store: recorded in "record" mode, and served as of
+    the current point in time without any request in "replay" mode.
+
     Args:
         pair (str): Trading pair symbol (without -USDT suffix)
 
@@ -210,9 +568,45 @@ def get_LS_OI_Copin(pair):
         tuple: (long_oi, short_oi) containing the total open interest for long and short positions
         str: Error message if request fails
     """
-    longOI = get_OI_position_Copin(pair, True)
-    shortOI = get_OI_position_Copin(pair, False)
+    return _from_snapshot(
+        snapshot_store.fetch(
+            "copin_oi",
+            pair,
+            lambda: _fetch_LS_OI_Copin(pair),
+            is_valid=_is_open_interest,
+            missing=COPIN_OI_ERROR,
+        )
+    )
+
+
+async def _afetch_LS_OI_Copin(pair):
+    longOI, shortOI = await asyncio.gather(
+        aget_OI_position_Copin(pair, True),
+        aget_OI_position_Copin(pair, False),
+    )
     if isinstance(longOI, str) | isinstance(shortOI, str):
-        return "Cannot find OI of this crypto"
+        return COPIN_OI_ERROR
 
     return longOI, shortOI
+
+
+async def aget_LS_OI_Copin(pair):
+    """
+    Async version of get_LS_OI_Copin; the long and short queries run concurrently.
+
+    Args:
+        pair (str): Trading pair symbol (without -USDT suffix)
+
+    Returns:
+        tuple: (long_oi, short_oi) containing the total open interest for long and short positions
+        str: Error message if request fails
+    """
+    return _from_snapshot(
+        await snapshot_store.afetch(
+            "copin_oi",
+            pair,
+            lambda: _afetch_LS_OI_Copin(pair),
+            is_valid=_is_open_interest,
+            missing=COPIN_OI_ERROR,
+        )
+    )
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from tools import http_client
+
+
+BINANCE_TICKER_URL = os.environ.get(
+    "BINANCE_TICKER_URL", "https://api.binance.com/api/v3/ticker/24hr"
+)
+# Seconds one all-symbols snapshot is served before it is downloaded again
+BINANCE_TICKER_TTL = float(os.environ.get("BINANCE_TICKER_TTL", 60))
+# Seconds after a failed download during which no new download is attempted
+BINANCE_TICKER_RETRY = float(os.environ.get("BINANCE_TICKER_RETRY", 10))
+
+# Ticker fields kept per symbol, in column order
+TICKER_FIELDS = (
+    "priceChangePercent",
+    "lastPrice",
+    "openPrice",
+    "highPrice",
+    "lowPrice",
+    "volume",
+    "quoteVolume",
+)
+
+
+class TickerSnapshot:
+    """Binance 24h ticker of every symbol, downloaded in one request and queried locally.
+
+    The snapshot is a float64 array with one row per symbol and one column per
+    TICKER_FIELDS entry, plus a symbol -> row index. Both are swapped in together
+    as one immutable (index, values, fetched_at) tuple, so readers never need the
+    lock. It is refreshed at most once per `ttl` seconds; concurrent callers wait
+    for a single download. While Binance is failing, the previous snapshot keeps
+    being served and a new download is only tried every `retry_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        url: str = BINANCE_TICKER_URL,
+        ttl: float = BINANCE_TICKER_TTL,
+        retry_interval: float = BINANCE_TICKER_RETRY,
+    ):
+        """Initialize the snapshot.
+
+        Args:
+            url: All-symbols 24h ticker endpoint
+            ttl: Seconds a snapshot is served before it is refreshed
+            retry_interval: Seconds to wait after a failed download before retrying
+        """
+        self.url = url
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._snapshot = ({}, np.empty((0, len(TICKER_FIELDS))), None)
+        self._failed_at = None
+        self._lock = threading.Lock()
+
+    def _download(self):
+        try:
+            response = http_client.get(self.url, timeout=10)
+            response.raise_for_status()
+            tickers = response.json()
+        except Exception as e:
+            print(f"Error fetching the Binance 24h ticker: {str(e)}")
+            return None
+        if not isinstance(tickers, list):
+            print(f"Unexpected Binance 24h ticker response: {tickers}")
+            return None
+
+        index = {}
+        values = np.full((len(tickers), len(TICKER_FIELDS)), np.nan)
+        for row, ticker in enumerate(tickers):
+            index[ticker["symbol"]] = row
+            for column, field in enumerate(TICKER_FIELDS):
+                try:
+                    values[row, column] = float(ticker[field])
+                except (KeyError, TypeError, ValueError):
+                    pass
+        values.flags.writeable = False
+        return index, values
+
+    def _fresh(self) -> bool:
+        """Whether no download is due: the snapshot is within its TTL, or the last
+        download failed less than retry_interval seconds ago."""
+        now = time.monotonic()
+        fetched_at = self._snapshot[2]
+        if fetched_at is not None and now - fetched_at <= self.ttl:
+            return True
+        return self._failed_at is not None and now - self._failed_at < self.retry_interval
+
+    def refresh(self, force: bool = False) -> bool:
+        """Download a new snapshot if the current one is older than the TTL.
+
+        Args:
+            force: Download even if the snapshot is fresh
+
+        Returns:
+            bool: Whether a snapshot is available
+        """
+        with self._lock:
+            if force or not self._fresh():
+                snapshot = self._download()
+                if snapshot is None:
+                    self._failed_at = time.monotonic()
+                else:
+                    self._snapshot = (*snapshot, time.monotonic())
+                    self._failed_at = None
+            return self._snapshot[2] is not None
+
+    async def arefresh(self) -> bool:
+        """Async version of refresh; a due download runs in a worker thread."""
+        if self._fresh():
+            return self._snapshot[2] is not None
+        return await asyncio.to_thread(self.refresh)
+
+    def _lookup(self, symbol: str, field: str):
+        index, values, _ = self._snapshot
+        row = index.get(symbol.upper())
+        if row is None:
+            return None
+        value = values[row, TICKER_FIELDS.index(field)]
+        return None if np.isnan(value) else float(value)
+
+    def get(self, symbol: str, field: str = "priceChangePercent") -> Optional[float]:
+        """Return one ticker field of a symbol.
+
+        Args:
+            symbol: Binance symbol (e.g. "BTCUSDT")
+            field: One of TICKER_FIELDS
+
+        Returns:
+            float | None: The value, or None if the symbol or the ticker is unavailable
+        """
+        self.refresh()
+        return self._lookup(symbol, field)
+
+    async def aget(self, symbol: str, field: str = "priceChangePercent") -> Optional[float]:
+        """Async version of get."""
+        await self.arefresh()
+        return self._lookup(symbol, field)
+
+    def table(self) -> tuple[dict, np.ndarray]:
+        """Return the symbol -> row index and the (symbols, TICKER_FIELDS) array.
+
+        The index and the read-only array come from the same snapshot and are
+        replaced, never modified, by later refreshes, so callers may keep using them.
+        """
+        self.refresh()
+        index, values, _ = self._snapshot
+        return index, values
+
+
+ticker_snapshot = TickerSnapshot()
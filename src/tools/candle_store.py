@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+CANDLE_STORE_DIR = os.environ.get("CANDLE_STORE_DIR") or os.path.join(
+    os.path.dirname(__file__), "../../.cache/candles"
+)
+
+CANDLE_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("open", "<f8"),
+        ("close", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+class CandleStore:
+    """On-disk OHLCV store keyed by (venue, symbol, interval).
+
+    Candles are kept as one structured NumPy file per key and read back through a
+    memory map, so a window lookup only touches the pages it needs. Next to each
+    file a small JSON sidecar records which millisecond ranges have already been
+    fetched from the venue, which lets callers ask for just the missing ranges.
+    Only the span actually returned by the venue and only closed candles count as
+    covered, so empty pages and the still-forming candle are always re-fetched.
+    """
+
+    def __init__(self, root: str = CANDLE_STORE_DIR):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the candle files
+        """
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _paths(self, venue: str, symbol: str, interval: str) -> tuple[str, str]:
+        directory = os.path.join(self.root, venue, interval)
+        name = symbol.replace(os.sep, "_").replace("/", "_")
+        return (
+            os.path.join(directory, f"{name}.npy"),
+            os.path.join(directory, f"{name}.json"),
+        )
+
+    def _lock(self, venue: str, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((venue, symbol, interval), threading.Lock())
+
+    def symbols(self, venue: str, interval: str) -> list[str]:
+        """Return the sorted symbols that have stored candles.
+
+        Args:
+            venue: Data source name (e.g. 'hyperliquid')
+            interval: Candle interval (e.g. '1h')
+
+        Returns:
+            list: Symbols as stored (path separators replaced by '_')
+        """
+        try:
+            names = os.listdir(os.path.join(self.root, venue, interval))
+        except OSError:
+            return []
+        return sorted(name[: -len(".npy")] for name in names if name.endswith(".npy"))
+
+    def coverage(self, venue: str, symbol: str, interval: str) -> list[list[int]]:
+        """Return the sorted, merged list of [start, end] ranges already fetched.
+
+        Args:
+            venue: Data source name (e.g. 'hyperliquid')
+            symbol: Trading pair symbol
+            interval: Candle interval (e.g. '1h')
+
+        Returns:
+            list: Inclusive millisecond ranges that are fully stored
+        """
+        _, meta_path = self._paths(venue, symbol, interval)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)["coverage"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def missing_ranges(
+        self, venue: str, symbol: str, interval: str, start: int, end: int
+    ) -> list[tuple[int, int]]:
+        """Return the parts of [start, end] that are not stored yet.
+
+        Args:
+            venue: Data source name
+            symbol: Trading pair symbol
+            interval: Candle interval
+            start: Window start in milliseconds
+            end: Window end in milliseconds (inclusive)
+
+        Returns:
+            list: Inclusive (start, end) millisecond ranges to fetch
+        """
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(venue, symbol, interval):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start - 1))
+            cursor = max(cursor, covered_end + 1)
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def read(
+        self, venue: str, symbol: str, interval: str, start: int, end: int
+    ) -> np.ndarray:
+        """Read the stored candles whose open time falls within [start, end].
+
+        Args:
+            venue: Data source name
+            symbol: Trading pair symbol
+            interval: Candle interval
+            start: Window start in milliseconds
+            end: Window end in milliseconds (inclusive)
+
+        Returns:
+            numpy.ndarray: Structured array with CANDLE_DTYPE, sorted by timestamp
+        """
+        data_path, _ = self._paths(venue, symbol, interval)
+        try:
+            candles = np.load(data_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        timestamps = candles["timestamp"]
+        lo = np.searchsorted(timestamps, start, side="left")
+        hi = np.searchsorted(timestamps, end, side="right")
+        window = np.array(candles[lo:hi])
+        del candles
+        return window
+
+    def write(
+        self,
+        venue: str,
+        symbol: str,
+        interval: str,
+        candles: np.ndarray,
+        start: int,
+        end: int,
+    ) -> None:
+        """Merge freshly fetched candles into the store and mark what they cover.
+
+        Newer rows replace stored rows with the same timestamp. Only the span of the
+        returned candles, from the first to the last one and clipped to the fetched
+        [start, end], is marked as covered: an empty or short response may be transient or lie before
+        the venue's history, so the rest of the range stays missing and is requested
+        again next time. The covered range is also clipped to the last closed candle
+        so an in-progress candle is never treated as final.
+
+        Args:
+            venue: Data source name
+            symbol: Trading pair symbol
+            interval: Candle interval
+            candles: Structured array with CANDLE_DTYPE
+            start: Start of the fetched range in milliseconds
+            end: End of the fetched range in milliseconds (inclusive)
+        """
+        if len(candles) == 0:
+            return
+        data_path, meta_path = self._paths(venue, symbol, interval)
+        step = INTERVAL_MS[interval]
+        last_closed = int(time.time() * 1000) - step
+        # No candle can open strictly between two returned ones, so the covered span
+        # runs from just after the candle before the first to the end of the last
+        start = max(start, int(candles["timestamp"].min()) - step + 1)
+        end = min(end, int(candles["timestamp"].max()) + step - 1, last_closed)
+
+        with self._lock(venue, symbol, interval):
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            try:
+                stored = np.load(data_path)
+            except (OSError, ValueError):
+                stored = np.empty(0, dtype=CANDLE_DTYPE)
+
+            merged = np.concatenate([candles.astype(CANDLE_DTYPE), stored])
+            # np.unique keeps the first occurrence, so fresh rows win over stored ones
+            _, first = np.unique(merged["timestamp"], return_index=True)
+            merged = merged[first]
+
+            tmp_path = data_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, merged)
+            os.replace(tmp_path, data_path)
+
+            if start <= end:
+                coverage = self.coverage(venue, symbol, interval) + [[start, end]]
+                coverage.sort()
+                merged_coverage = [coverage[0]]
+                for range_start, range_end in coverage[1:]:
+                    if range_start <= merged_coverage[-1][1] + 1:
+                        merged_coverage[-1][1] = max(merged_coverage[-1][1], range_end)
+                    else:
+                        merged_coverage.append([range_start, range_end])
+                tmp_path = meta_path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"coverage": merged_coverage}, f)
+                os.replace(tmp_path, meta_path)
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+DECISION_CACHE_PATH = os.environ.get("DECISION_CACHE_PATH") or os.path.join(
+    os.path.dirname(__file__), "../../.cache/decisions.sqlite"
+)
+# Seconds a cached decision stays valid; 0 disables the cache
+DECISION_CACHE_TTL = float(os.environ.get("DECISION_CACHE_TTL", 3600))
+DECISION_CACHE_MAX_ENTRIES = int(os.environ.get("DECISION_CACHE_MAX_ENTRIES", 1000))
+
+# Floats are rounded to this many significant digits before hashing, so values that
+# only differ by float noise map to the same key
+SIGNIFICANT_DIGITS = 8
+
+
+def _normalize(value):
+    if isinstance(value, float):
+        if not math.isfinite(value) or value == 0:
+            return value
+        return round(value, SIGNIFICANT_DIGITS - 1 - int(math.floor(math.log10(abs(value)))))
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        # Agent messages are JSON documents: compare them by content, not formatting
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return value
+        if isinstance(parsed, (dict, list)):
+            return {"__json__": _normalize(parsed)}
+        return value
+    return value
+
+
+def canonical_key(inputs: dict) -> str:
+    """Hash prompt inputs into a cache key.
+
+    JSON-encoded strings are parsed, dict keys are sorted and floats are rounded
+    before hashing, so inputs that differ only in formatting, key order or float
+    noise share a key.
+
+    Args:
+        inputs: JSON-compatible prompt inputs (including the model settings)
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    canonical = json.dumps(
+        _normalize(inputs), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """Persistent cache of LLM decisions in a local SQLite file.
+
+    Entries expire `ttl` seconds after they were stored. When the cache holds more
+    than `max_entries`, the least recently used entries are evicted. Every call
+    opens the database under a lock, so the cache can be shared across threads and
+    processes.
+    """
+
+    def __init__(
+        self,
+        path: str = DECISION_CACHE_PATH,
+        ttl: float = DECISION_CACHE_TTL,
+        max_entries: int = DECISION_CACHE_MAX_ENTRIES,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite file holding the decisions
+            ttl: Seconds a decision stays valid (0 disables the cache)
+            max_entries: Maximum number of decisions kept
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if not self._initialized:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            try:
+                with connection:
+                    if not self._initialized:
+                        connection.execute(
+                            "CREATE TABLE IF NOT EXISTS decisions ("
+                            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+                        )
+                        connection.execute(
+                            "CREATE INDEX IF NOT EXISTS decisions_last_used "
+                            "ON decisions (last_used)"
+                        )
+                        self._initialized = True
+                    yield connection
+            finally:
+                connection.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached decision for a key, or None if missing or expired."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._transaction() as connection:
+                row = connection.execute(
+                    "SELECT value, created_at FROM decisions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl:
+                    connection.execute("DELETE FROM decisions WHERE key = ?", (key,))
+                    return None
+                connection.execute(
+                    "UPDATE decisions SET last_used = ? WHERE key = ?", (now, key)
+                )
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"Decision cache read error: {str(e)}")
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a decision, evicting expired and least recently used entries."""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._transaction() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                connection.execute(
+                    "DELETE FROM decisions WHERE created_at < ?", (now - self.ttl,)
+                )
+                connection.execute(
+                    "DELETE FROM decisions WHERE key IN ("
+                    "SELECT key FROM decisions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            print(f"Decision cache write error: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every cached decision."""
+        try:
+            with self._transaction() as connection:
+                connection.execute("DELETE FROM decisions")
+        except sqlite3.Error as e:
+            print(f"Decision cache clear error: {str(e)}")
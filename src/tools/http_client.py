@@ -0,0 +1,256 @@
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Shared settings for every outbound call (HyperLiquid, Binance, Copin, LunarCrush)
+DEFAULT_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 10))
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5  # Wait 0.5, 1, 2 seconds between retries
+RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", 8))
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+
+_async_clients = weakref.WeakKeyDictionary()
+# Event loop that runs the coroutines of sync callers (see run_sync)
+_sync_loop = None
+_async_host_semaphores = weakref.WeakKeyDictionary()
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide requests session.
+
+    The session keeps connections alive per host and retries idempotent reads on
+    connection errors and retryable status codes with exponential backoff. The
+    data-source POST endpoints are read-only queries, so POST is retried too.
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retries = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=["GET", "POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                max_retries=retries,
+                pool_connections=16,
+                pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+                pool_block=False,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+@contextmanager
+def _host_slot(url: str):
+    with _session_lock:
+        semaphore = _host_semaphores.setdefault(
+            _host(url), threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        )
+    with semaphore:
+        yield
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the shared session.
+
+    At most MAX_CONNECTIONS_PER_HOST requests per host are in flight at once across
+    all threads; callers beyond that wait for a free slot.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        **kwargs: Passed to requests.Session.request (timeout defaults to DEFAULT_TIMEOUT)
+
+    Returns:
+        requests.Response: Response of the last attempt
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    with _host_slot(url):
+        return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Send a GET request through the shared session."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Send a POST request through the shared session."""
+    return request("POST", url, **kwargs)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared async client for the running event loop.
+
+    One pooled client is kept per event loop, since httpx connections cannot be
+    shared across loops.
+
+    Returns:
+        httpx.AsyncClient: Shared async client
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=MAX_CONNECTIONS_PER_HOST * 4,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=MAX_RETRIES),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _async_host_slot(url: str) -> asyncio.Semaphore:
+    semaphores = _async_host_semaphores.setdefault(asyncio.get_running_loop(), {})
+    return semaphores.setdefault(_host(url), asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST))
+
+
+async def arequest(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the shared async client.
+
+    Connection errors are retried by the transport; retryable status codes are
+    retried here with the same backoff as the sync session, honouring Retry-After.
+    Per-host concurrency is capped at MAX_CONNECTIONS_PER_HOST; a request only
+    holds its slot while an attempt is in flight, not while it backs off.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        **kwargs: Passed to httpx.AsyncClient.request
+
+    Returns:
+        httpx.Response: Response of the last attempt
+    """
+    client = get_async_client()
+    for attempt in range(MAX_RETRIES + 1):
+        async with _async_host_slot(url):
+            response = await client.request(method, url, **kwargs)
+        if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+            return response
+        retry_after = response.headers.get("Retry-After")
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = BACKOFF_FACTOR * 2**attempt
+        # The host slot is released while backing off, so other requests can use it
+        await asyncio.sleep(delay)
+
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    """Send a GET request through the shared async client."""
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs) -> httpx.Response:
+    """Send a POST request through the shared async client."""
+    return await arequest("POST", url, **kwargs)
+
+
+async def aclose_async_client() -> None:
+    """Close the shared async client of the running event loop, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _start_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _session_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="http-sync-loop", daemon=True
+            ).start()
+            _sync_loop = loop
+        return _sync_loop
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code.
+
+    The coroutine runs on one long-lived background event loop, so every sync
+    caller shares that loop's pooled async client and its keep-alive connections.
+    Context variables (e.g. the snapshot point in time) are carried over, and the
+    calling thread blocks until the result is ready.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    loop = _start_sync_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync cannot be called from the background HTTP loop")
+
+    result = concurrent.futures.Future()
+    context = contextvars.copy_context()
+
+    def finish(task):
+        if task.cancelled():
+            result.cancel()
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+
+    def start():
+        # Tasks run in a copy of the context that is current when they are created
+        context.run(loop.create_task, coro).add_done_callback(finish)
+
+    loop.call_soon_threadsafe(start)
+    return result.result()
+
+
+def close_sync_loop() -> None:
+    """Close the background loop's async client and stop the loop (at shutdown)."""
+    global _sync_loop
+    with _session_lock:
+        loop, _sync_loop = _sync_loop, None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_async_client(), loop).result(timeout=5)
+    except Exception as e:
+        print(f"Error closing the background HTTP client: {str(e)}")
+    loop.call_soon_threadsafe(loop.stop)
+
+
+atexit.register(close_sync_loop)
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from langchain_openai.chat_models import ChatOpenAI
+
+
+# Shared settings for every chat model call
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 60))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+# Maximum number of LLM requests in flight at once, per process (sync) and per
+# event loop (async); callers beyond that wait for a free slot
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+
+_lock = threading.Lock()
+_llms = {}
+_http_client = None
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+_async_llms = weakref.WeakKeyDictionary()
+_async_http_clients = weakref.WeakKeyDictionary()
+_async_slots = weakref.WeakKeyDictionary()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONCURRENCY,
+        max_keepalive_connections=LLM_MAX_CONCURRENCY,
+    )
+
+
+def _create_llm(model: str, temperature: float, **http_clients) -> ChatOpenAI:
+    return ChatOpenAI(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model,
+        temperature=temperature,
+        timeout=LLM_TIMEOUT,
+        max_retries=LLM_MAX_RETRIES,
+        **http_clients,
+    )
+
+
+def get_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Return the process-wide chat model for synchronous calls.
+
+    One client is kept per (model, temperature), and all of them share a pooled
+    keep-alive HTTP client sized to LLM_MAX_CONCURRENCY.
+
+    Args:
+        model: OpenAI model name
+        temperature: Sampling temperature
+
+    Returns:
+        ChatOpenAI: Shared chat model
+    """
+    global _http_client
+    with _lock:
+        llm = _llms.get((model, temperature))
+        if llm is None:
+            if _http_client is None:
+                _http_client = httpx.Client(timeout=LLM_TIMEOUT, limits=_limits())
+            llm = _create_llm(model, temperature, http_client=_http_client)
+            _llms[(model, temperature)] = llm
+        return llm
+
+
+def get_async_llm(model: str, temperature: float) -> ChatOpenAI:
+    """Return the shared chat model for async calls on the running event loop.
+
+    httpx async connections cannot be shared across loops, so the clients are
+    kept per event loop, like tools.http_client.get_async_client.
+
+    Args:
+        model: OpenAI model name
+        temperature: Sampling temperature
+
+    Returns:
+        ChatOpenAI: Shared chat model
+    """
+    loop = asyncio.get_running_loop()
+    http_client = _async_http_clients.get(loop)
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(timeout=LLM_TIMEOUT, limits=_limits())
+        _async_http_clients[loop] = http_client
+        _async_llms[loop] = {}
+    llms = _async_llms[loop]
+    llm = llms.get((model, temperature))
+    if llm is None:
+        llm = _create_llm(model, temperature, http_async_client=http_client)
+        llms[(model, temperature)] = llm
+    return llm
+
+
+def _json_mode(llm: ChatOpenAI, json_mode: bool):
+    # JSON mode makes the model return a bare JSON object (no prose or code fences)
+    return llm.bind(response_format={"type": "json_object"}) if json_mode else llm
+
+
+def invoke(prompt, model: str, temperature: float, json_mode: bool = False):
+    """Call the chat model, waiting for a free slot if LLM_MAX_CONCURRENCY calls are in flight.
+
+    Args:
+        prompt: Prompt value or messages to send
+        model: OpenAI model name
+        temperature: Sampling temperature
+        json_mode: Constrain the reply to a JSON object (the prompt must mention JSON)
+
+    Returns:
+        AIMessage: Model response
+    """
+    llm = _json_mode(get_llm(model, temperature), json_mode)
+    with _slots:
+        return llm.invoke(prompt)
+
+
+async def ainvoke(prompt, model: str, temperature: float, json_mode: bool = False):
+    """Async version of invoke, limited per event loop."""
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.setdefault(loop, asyncio.Semaphore(LLM_MAX_CONCURRENCY))
+    llm = _json_mode(get_async_llm(model, temperature), json_mode)
+    async with slots:
+        return await llm.ainvoke(prompt)
+
+
+async def aclose_async_llm() -> None:
+    """Close the async chat model connections of the running event loop, if any."""
+    loop = asyncio.get_running_loop()
+    _async_llms.pop(loop, None)
+    http_client = _async_http_clients.pop(loop, None)
+    if http_client is not None:
+        await http_client.aclose()
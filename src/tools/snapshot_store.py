@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+
+SNAPSHOT_STORE_PATH = os.environ.get("SNAPSHOT_STORE_PATH") or os.path.join(
+    os.path.dirname(__file__), "../../.cache/snapshots.sqlite"
+)
+# "off": live data only; "record": live data, saved with its fetch time;
+# "replay": recorded data only, as it was at the point in time being simulated
+SNAPSHOT_MODES = ("off", "record", "replay")
+SNAPSHOT_MODE = os.environ.get("SNAPSHOT_MODE", "off")
+# Replayed snapshots older than this (seconds) at the point in time are ignored
+SNAPSHOT_MAX_AGE = float(os.environ.get("SNAPSHOT_MAX_AGE", 86400))
+
+# Point in time being replayed (ms); None means now
+_as_of = contextvars.ContextVar("snapshot_as_of", default=None)
+
+
+def to_timestamp(moment) -> int:
+    """Convert a YYYY-MM-DD string, datetime or millisecond timestamp to milliseconds."""
+    if isinstance(moment, str):
+        moment = datetime.strptime(moment, "%Y-%m-%d")
+    if isinstance(moment, datetime):
+        return int(moment.timestamp() * 1000)
+    return int(moment)
+
+
+@contextmanager
+def point_in_time(moment):
+    """Replay upstream data as it was at `moment` inside this block.
+
+    The point in time is a context variable, so it follows the call into graph
+    nodes, coroutines run through http_client.run_sync and asyncio tasks.
+
+    Args:
+        moment: YYYY-MM-DD string, datetime or millisecond timestamp
+    """
+    token = _as_of.set(to_timestamp(moment))
+    try:
+        yield
+    finally:
+        _as_of.reset(token)
+
+
+class SnapshotStore:
+    """Timestamped snapshots of upstream API results in a local SQLite file.
+
+    In "record" mode every successful fetch is stored under (source, key) with
+    its fetch time. In "replay" mode nothing is fetched: each lookup returns the
+    latest snapshot taken at or before the current point_in_time(), so a
+    backtest sees the data that was available on each simulated day and runs
+    offline.
+    """
+
+    def __init__(
+        self,
+        path: str = SNAPSHOT_STORE_PATH,
+        mode: str = SNAPSHOT_MODE,
+        max_age: float = SNAPSHOT_MAX_AGE,
+    ):
+        """Initialize the store.
+
+        Args:
+            path: SQLite file holding the snapshots
+            mode: One of SNAPSHOT_MODES
+            max_age: Seconds before the point in time a replayed snapshot stays usable
+        """
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown snapshot mode {mode!r}, expected one of {SNAPSHOT_MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if not self._initialized:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10)
+            try:
+                with connection:
+                    if not self._initialized:
+                        connection.execute(
+                            "CREATE TABLE IF NOT EXISTS snapshots ("
+                            "source TEXT NOT NULL, key TEXT NOT NULL, "
+                            "timestamp INTEGER NOT NULL, value TEXT NOT NULL, "
+                            "PRIMARY KEY (source, key, timestamp))"
+                        )
+                        self._initialized = True
+                    yield connection
+            finally:
+                connection.close()
+
+    def record(self, source: str, key: str, value, timestamp: Optional[int] = None) -> None:
+        """Store a JSON-serializable value fetched at `timestamp` (ms, default now)."""
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        try:
+            with self._transaction() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                    (source, key, timestamp, json.dumps(value)),
+                )
+        except sqlite3.Error as e:
+            print(f"Snapshot store write error: {str(e)}")
+
+    def latest(self, source: str, key: str, as_of: Optional[int] = None):
+        """Return the latest value recorded at or before `as_of` (ms, default now).
+
+        Returns:
+            The decoded value, or None if there is no snapshot within max_age
+        """
+        if as_of is None:
+            as_of = int(time.time() * 1000)
+        try:
+            with self._transaction() as connection:
+                row = connection.execute(
+                    "SELECT value FROM snapshots WHERE source = ? AND key = ? "
+                    "AND timestamp BETWEEN ? AND ? ORDER BY timestamp DESC LIMIT 1",
+                    (source, key, as_of - int(self.max_age * 1000), as_of),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Snapshot store read error: {str(e)}")
+            return None
+        return None if row is None else json.loads(row[0])
+
+    def _replay(self, source: str, key: str, missing):
+        value = self.latest(source, key, _as_of.get())
+        if value is None:
+            print(f"No {source} snapshot for {key} at this point in time")
+            return missing
+        return value
+
+    def fetch(self, source: str, key: str, fetch, is_valid=lambda value: value is not None, missing=None):
+        """Fetch a value through the store according to the mode.
+
+        Args:
+            source: Upstream source name (e.g. "copin_oi")
+            key: Key within the source (e.g. the symbol)
+            fetch: Function performing the live fetch
+            is_valid: Whether a fetched value should be recorded (errors are not)
+            missing: Value returned when replay has no snapshot
+
+        Returns:
+            The live value, or the replayed one in "replay" mode
+        """
+        if self.mode == "replay":
+            return self._replay(source, key, missing)
+        value = fetch()
+        if self.mode == "record" and is_valid(value):
+            self.record(source, key, value)
+        return value
+
+    async def afetch(self, source: str, key: str, afetch, is_valid=lambda value: value is not None, missing=None):
+        """Async version of fetch; afetch is a coroutine function.
+
+        The SQLite reads and writes run in the loop's default executor.
+        """
+        if self.mode == "replay":
+            return await asyncio.to_thread(self._replay, source, key, missing)
+        value = await afetch()
+        if self.mode == "record" and is_valid(value):
+            await asyncio.to_thread(self.record, source, key, value)
+        return value
+
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,169 @@
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+
+class StaleWhileRevalidateCache:
+    """Keyed cache of JSON values with stale-while-revalidate refreshes, persisted to disk.
+
+    A value younger than `ttl` is served as is. A value that is older but still
+    within `ttl + stale_ttl` is served immediately while one background refresh
+    replaces it. Anything older, or missing, is fetched before returning. Only one
+    fetch per key runs at a time: callers that need a key which is already being
+    fetched wait for that fetch's result instead of starting another. Failed
+    fetches (None) are never cached, and after one a key is not fetched again for
+    `retry_interval` seconds, so an upstream outage does not turn every request
+    into a call. Entries are saved to a JSON file after each update and reloaded
+    on first use, so the cache survives restarts.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl: float,
+        stale_ttl: float = 0,
+        retry_interval: float = 0,
+        max_workers: int = 2,
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: JSON file the entries are persisted to (None keeps them in memory)
+            ttl: Seconds a value is fresh
+            stale_ttl: Seconds past ttl a value is still served while it is refreshed
+            retry_interval: Seconds after a failed fetch before a key is fetched again
+            max_workers: Background refresh threads
+        """
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.retry_interval = retry_interval
+        self._entries = None
+        self._failed_at = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="cache-refresh"
+        )
+
+    def _load(self):
+        # Called with the lock held
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable cache file {self.path}: {str(e)}")
+
+    def _save(self):
+        # Called with the lock held; write-then-rename so readers never see a partial file
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Cache write error for {self.path}: {str(e)}")
+
+    def _fetch(self, key: str, fetch):
+        """Fetch a key, cache the value and return it (None on failure)."""
+        value = None
+        try:
+            value = fetch()
+            return value
+        finally:
+            # An exception counts as a failed fetch too
+            with self._lock:
+                if value is None:
+                    self._failed_at[key] = time.time()
+                else:
+                    self._failed_at.pop(key, None)
+                    self._entries[key] = {"value": value, "fetched_at": time.time()}
+                    self._save()
+
+    def _run(self, key: str, fetch, future: Future):
+        # Runs the in-flight fetch of a key and hands its outcome to every waiter
+        try:
+            future.set_result(self._fetch(key, fetch))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, key: str, fetch, future: Future):
+        self._run(key, fetch, future)
+        if future.exception() is not None:
+            print(f"Background refresh of {key} failed: {str(future.exception())}")
+
+    def get(self, key: str, fetch):
+        """Return the value for a key, fetching or refreshing it as needed.
+
+        Args:
+            key: Cache key
+            fetch: Function returning the live value, or None on failure
+
+        Returns:
+            The cached or fetched value (None if it is unavailable)
+        """
+        now = time.time()
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            age = now - entry["fetched_at"] if entry else None
+            if entry and age <= self.ttl:
+                return entry["value"]
+            future = self._inflight.get(key)
+            may_fetch = now - self._failed_at.get(key, -math.inf) >= self.retry_interval
+            if entry and age <= self.ttl + self.stale_ttl:
+                if future is None and may_fetch:
+                    future = self._inflight[key] = Future()
+                    self._executor.submit(self._refresh, key, fetch, future)
+                return entry["value"]
+            if future is None:
+                if not may_fetch:
+                    # Failed moments ago; serve what is left, if anything
+                    return entry["value"] if entry else None
+                future = self._inflight[key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if owner:
+            self._run(key, fetch, future)
+        # Waiters share the first caller's result (or its exception)
+        value = future.result()
+        if value is not None:
+            return value
+        return entry["value"] if entry else None
+
+    def refresh(self, key: str, fetch):
+        """Fetch a key now, bypassing any cached value, and cache the result.
+
+        Args:
+            key: Cache key
+            fetch: Function returning the live value, or None on failure
+
+        Returns:
+            The fetched value (None on failure)
+        """
+        with self._lock:
+            self._load()
+        return self._fetch(key, fetch)
+
+    def clear(self):
+        """Remove every entry, in memory and on disk."""
+        with self._lock:
+            self._entries = {}
+            self._failed_at.clear()
+            self._save()
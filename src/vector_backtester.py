@@ -0,0 +1,303 @@
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.indicators import IndicatorEngine
+from agents.portfolio_manager import NEUTRAL_SCORE_THRESHOLD
+from agents.technicals import (
+    COMBINED_SIGNAL_THRESHOLD,
+    calculate_strategy_signal_arrays,
+    combine_signal_arrays,
+)
+from tools.api import get_price_API_HYPERLIQUID
+
+
+# History loaded before the start date, matching the 30-day lookback the agent
+# backtester gives each decision
+WARMUP_DAYS = 30
+# Candles per risk-manager volatility estimate (30 days of 1h candles) and per
+# volatility sample (24 candles), as in risk_management_agent
+RISK_LOOKBACK = 30 * 24
+VOLATILITY_WINDOW = 24
+BARS_PER_YEAR = 365 * 24
+
+
+def simulate(
+    prices_df: pd.DataFrame,
+    start=None,
+    initial_capital: float = 100000,
+    leverage: float = 1.0,
+    risk: float = 0.01,
+    rebalance_every: int = 1,
+    fee_rate: float = 0.0,
+    strategy_weights: Optional[dict] = None,
+    signal_threshold: float = COMBINED_SIGNAL_THRESHOLD,
+    neutral_threshold: float = NEUTRAL_SCORE_THRESHOLD,
+    signals: Optional[dict] = None,
+) -> pd.DataFrame:
+    """Score every bar and simulate the resulting trades in one vectorized pass.
+
+    Decisions follow the rule-based portfolio engine on the technical signal alone
+    (sentiment and social data have no price-aligned history): the position is
+    long or short by the technical signal, holds when its confidence is below
+    neutral_threshold, and commits confidence * max_position_margin, where
+    max_position_margin is the risk manager's cash * risk / volatility, capped at
+    the cash and divided by the leverage. As in Backtester, every position is
+    opened with the whole portfolio as cash and closed at the next decision, so
+    each period multiplies the portfolio value by
+    1 + direction * fraction * (price change), and the equity curve is a
+    cumulative product.
+
+    Args:
+        prices_df: 1h OHLCV frame, including the warm-up history
+        start: First bar to trade (timestamp or date string); None trades from the first bar
+        initial_capital: Starting portfolio value
+        leverage: Leverage used by the risk manager's position limit
+        risk: Fraction of the fund the risk manager may lose per trade
+        rebalance_every: Bars between decisions (24 trades once a day like Backtester)
+        fee_rate: Fee charged on the traded amount when a position is opened and closed
+        strategy_weights: Weights of the technical strategies (default STRATEGY_WEIGHTS)
+        signal_threshold: Ensemble score beyond which the technical signal is bullish/bearish
+        neutral_threshold: Technical confidence below which the portfolio holds
+        signals: Precomputed calculate_strategy_signal_arrays() result for prices_df,
+            so parameter sweeps score the history only once
+
+    Returns:
+        pd.DataFrame: One row per traded bar with close, action, quantity (cash
+            committed at the decision bar, 0 elsewhere) and portfolio_value
+    """
+    engine = IndicatorEngine(prices_df)
+    close = engine.close
+    if signals is None:
+        signals = calculate_strategy_signal_arrays(engine)
+    direction, confidence = combine_signal_arrays(
+        signals, strategy_weights, signal_threshold
+    )
+    # The technical agent reports its confidence as a whole percentage
+    confidence = np.round(confidence * 100) / 100
+
+    volatility = (
+        pd.Series(engine.rolling("returns", VOLATILITY_WINDOW, "std"))
+        .rolling(RISK_LOOKBACK, min_periods=1)
+        .mean()
+        .to_numpy()
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        max_margin_fraction = np.minimum(risk / volatility, 1.0) / leverage
+    fraction = np.where(
+        confidence >= neutral_threshold,
+        np.nan_to_num(max_margin_fraction) * confidence,
+        0.0,
+    )
+    position = direction * fraction
+
+    first = 0
+    if start is not None:
+        start = pd.Timestamp(start)
+        if start.tzinfo is None and prices_df.index.tz is not None:
+            start = start.tz_localize(prices_df.index.tz)
+        first = int(prices_df.index.searchsorted(start))
+    bars = np.arange(first, len(close))
+    if len(bars) == 0:
+        raise ValueError("No candles to trade after the start date")
+
+    # Decision bar of every traded bar; the position taken there is held until the next one
+    decision = first + (bars - first) // rebalance_every * rebalance_every
+    decision_bars = np.arange(first, len(close), rebalance_every)
+
+    # Value multiplier of each completed holding period, closed at the next decision bar
+    exit_bars = np.minimum(decision_bars + rebalance_every, len(close) - 1)
+    period_growth = (
+        1
+        + position[decision_bars] * (close[exit_bars] / close[decision_bars] - 1)
+        - 2 * fee_rate * np.abs(position[decision_bars])
+    )
+    period_start_value = initial_capital * np.concatenate(
+        [[1.0], np.cumprod(period_growth)[:-1]]
+    )
+
+    period = (bars - first) // rebalance_every
+    marked = 1 + position[decision] * (close[bars] / close[decision] - 1)
+    # Opening fee is paid at the decision bar; the closing fee is in the next period's start value
+    marked -= fee_rate * np.abs(position[decision])
+    portfolio_value = period_start_value[period] * marked
+
+    is_decision = bars == decision
+    action = np.where(
+        position[bars] > 0, "long", np.where(position[bars] < 0, "short", "hold")
+    )
+    return pd.DataFrame(
+        {
+            "close": close[bars],
+            "action": np.where(is_decision, action, ""),
+            "quantity": np.where(
+                is_decision, np.abs(position[bars]) * period_start_value[period], 0.0
+            ).round(2),
+            "portfolio_value": portfolio_value,
+        },
+        index=prices_df.index[bars],
+    )
+
+
+def performance_metrics(results: pd.DataFrame, initial_capital: float) -> dict:
+    """Total return, annualized Sharpe ratio, maximum drawdown and trade count of a simulate() result."""
+    portfolio_value = results["portfolio_value"]
+    returns = portfolio_value.pct_change().dropna()
+    std_return = returns.std()
+    drawdown = portfolio_value / portfolio_value.cummax() - 1
+    return {
+        "total_return": portfolio_value.iloc[-1] / initial_capital - 1,
+        "sharpe_ratio": (
+            returns.mean() / std_return * math.sqrt(BARS_PER_YEAR)
+            if std_return > 0
+            else 0.0
+        ),
+        "max_drawdown": drawdown.min(),
+        "trades": int(results["action"].isin(["long", "short"]).sum()),
+    }
+
+
+class VectorizedBacktester:
+    def __init__(
+        self,
+        crypto,
+        start_date,
+        end_date,
+        initial_capital,
+        leverage=1.0,
+        risk=0.01,
+        rebalance_every=1,
+        fee_rate=0.0,
+    ):
+        """Initialize the backtester with trading parameters.
+
+        Args:
+            crypto: Symbol of the cryptocurrency to trade
+            start_date: Start date for the backtest (YYYY-MM-DD)
+            end_date: End date for the backtest (YYYY-MM-DD)
+            initial_capital: Initial capital to start trading with
+            leverage: Leverage used for the position limit
+            risk: Fraction of the fund the risk manager may lose per trade
+            rebalance_every: Hourly bars between decisions
+            fee_rate: Fee charged on the traded amount when opening and closing
+        """
+        self.crypto = crypto
+        self.start_date = start_date
+        self.end_date = end_date
+        self.initial_capital = initial_capital
+        self.leverage = leverage
+        self.risk = risk
+        self.rebalance_every = rebalance_every
+        self.fee_rate = fee_rate
+        self.results = None
+
+    def run_backtest(self):
+        """Load the whole price history once and simulate it.
+
+        Returns:
+            pd.DataFrame: simulate() result, or None if the prices are unavailable
+        """
+        warmup_start = datetime.strptime(self.start_date, "%Y-%m-%d") - timedelta(
+            days=WARMUP_DAYS
+        )
+        prices_df = get_price_API_HYPERLIQUID(
+            self.crypto, warmup_start, self.end_date
+        )
+        if isinstance(prices_df, str):
+            print(f"Error loading prices for {self.crypto}: {prices_df}")
+            return None
+
+        started = time.perf_counter()
+        self.results = simulate(
+            prices_df,
+            self.start_date,
+            self.initial_capital,
+            self.leverage,
+            self.risk,
+            self.rebalance_every,
+            self.fee_rate,
+        )
+        print(
+            f"Simulated {len(self.results)} bars of {self.crypto} "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        return self.results
+
+    def analyze_performance(self):
+        """Compute the backtest performance metrics.
+
+        Returns:
+            dict: total_return, sharpe_ratio (annualized from hourly returns),
+                max_drawdown and trades
+        """
+        metrics = performance_metrics(self.results, self.initial_capital)
+        print(f"Total Return: {metrics['total_return'] * 100:.2f}%")
+        print(f"Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+        print(f"Maximum Drawdown: {metrics['max_drawdown'] * 100:.2f}%")
+        print(f"Trades: {metrics['trades']}")
+        return metrics
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Run a vectorized backtest of the technical signals"
+    )
+    parser.add_argument("--crypto", type=str, required=True, help="Crypto symbol (e.g., BTC)")
+    parser.add_argument(
+        "--end-date",
+        type=str,
+        default=datetime.now().strftime("%Y-%m-%d"),
+        help="End date in YYYY-MM-DD format",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        default=(datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d"),
+        help="Start date in YYYY-MM-DD format",
+    )
+    parser.add_argument(
+        "--initial-capital",
+        type=float,
+        default=100000,
+        help="Initial capital amount (default: 100000)",
+    )
+    parser.add_argument("--leverage", type=float, default=1.0, help="Leverage (default: 1)")
+    parser.add_argument(
+        "--risk",
+        type=float,
+        default=0.01,
+        help="Fraction of the fund risked per trade (default: 0.01)",
+    )
+    parser.add_argument(
+        "--rebalance-every",
+        type=int,
+        default=1,
+        help="Hourly bars between decisions (default: 1, use 24 for daily)",
+    )
+    parser.add_argument(
+        "--fee-rate",
+        type=float,
+        default=0.0,
+        help="Fee per side as a fraction of the traded amount (default: 0)",
+    )
+
+    args = parser.parse_args()
+
+    backtester = VectorizedBacktester(
+        crypto=args.crypto,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        initial_capital=args.initial_capital,
+        leverage=args.leverage,
+        risk=args.risk,
+        rebalance_every=args.rebalance_every,
+        fee_rate=args.fee_rate,
+    )
+    if backtester.run_backtest() is not None:
+        backtester.analyze_performance()
@@ -0,0 +1,178 @@
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, StateGraph
+
+from agents.market_data import market_data_agent, amarket_data_agent, acheck_data_valid
+from agents.portfolio_manager import portfolio_management_agent, aportfolio_management_agent
+from agents.technicals import technical_analyst_agent
+from agents.risk_manager import risk_management_agent
+from agents.sentiment import sentiment_agent
+from agents.social_monitor import social_monitor_agent, aget_coins_index
+from agents.state import AgentState
+
+import asyncio
+from typing import Optional
+
+
+# Number of symbols analysed at once by a batch run
+DEFAULT_BATCH_CONCURRENCY = 4
+
+
+def create_workflow():
+    """Build and compile the agent graph shared by the CLI and the API.
+
+    Returns:
+        CompiledStateGraph: Graph runnable with invoke() and ainvoke(). Under
+            ainvoke, the market data and portfolio manager nodes run natively on
+            the event loop; the other nodes run in the loop's default executor.
+    """
+    workflow = StateGraph(AgentState)
+
+    # Add nodes
+    workflow.add_node(
+        "market_data_agent",
+        RunnableLambda(market_data_agent, afunc=amarket_data_agent),
+    )
+    workflow.add_node("technical_analyst_agent", technical_analyst_agent)
+    workflow.add_node("sentiment_agent", sentiment_agent)
+    workflow.add_node("social_monitor_agent", social_monitor_agent)
+    workflow.add_node("risk_management_agent", risk_management_agent)
+    workflow.add_node(
+        "portfolio_management_agent",
+        RunnableLambda(portfolio_management_agent, afunc=aportfolio_management_agent),
+    )
+
+    # Define the workflow
+    workflow.set_entry_point("market_data_agent")
+    workflow.add_edge("market_data_agent", "technical_analyst_agent")
+    workflow.add_edge("market_data_agent", "sentiment_agent")
+    workflow.add_edge("market_data_agent", "social_monitor_agent")
+    workflow.add_edge("technical_analyst_agent", "risk_management_agent")
+    workflow.add_edge("sentiment_agent", "risk_management_agent")
+    workflow.add_edge("social_monitor_agent", "risk_management_agent")
+    workflow.add_edge("risk_management_agent", "portfolio_management_agent")
+    workflow.add_edge("portfolio_management_agent", END)
+
+    return workflow.compile()
+
+
+def create_initial_state(
+    crypto: str,
+    start_date: str,
+    end_date: str,
+    portfolio: dict,
+    show_reasoning: bool = False,
+    data: Optional[dict] = None,
+    decision_engine: Optional[str] = None,
+) -> dict:
+    """Build the graph input for one symbol.
+
+    Args:
+        crypto: Symbol of the cryptocurrency to trade
+        start_date: Start date for analysis (YYYY-MM-DD), or None for the default
+        end_date: End date for analysis (YYYY-MM-DD), or None for the default
+        portfolio: Dictionary with cash, leverage and risk
+        show_reasoning: Whether to display agent reasoning
+        data: Prefetched entries to merge into the state's "data"
+            (e.g. the check_data_valid(return_data=True) result)
+        decision_engine: Portfolio decision engine ("llm", "rules" or "rules+explain");
+            None uses PORTFOLIO_DECISION_ENGINE
+
+    Returns:
+        dict: Initial AgentState
+    """
+    return {
+        "messages": [
+            HumanMessage(
+                content="Make a trading decision based on the provided data.",
+            )
+        ],
+        "data": {
+            "crypto": crypto,
+            "portfolio": portfolio,
+            "start_date": start_date,
+            "end_date": end_date,
+            "analyst_signals": {},
+            **(data or {}),
+        },
+        "metadata": {
+            "show_reasoning": show_reasoning,
+            "decision_engine": decision_engine,
+        },
+    }
+
+
+async def arun_batch(
+    app,
+    cryptos: list[str],
+    start_date: str,
+    end_date: str,
+    portfolio: dict,
+    show_reasoning: bool = False,
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    decision_engine: Optional[str] = None,
+):
+    """Analyse many symbols, yielding each result as soon as it is ready.
+
+    Each symbol fetches its price and Copin open interest over the pooled async
+    client inside its concurrency slot, so at most max_concurrency symbols are
+    fetching or running a graph at once and the first result streams out as
+    soon as that symbol is done. The LunarCrush coins list is fetched once for
+    the whole batch (or not at all while the process-wide coins cache is fresh).
+
+    Args:
+        app: Compiled graph from create_workflow()
+        cryptos: Symbols to analyse (duplicates are analysed once)
+        start_date: Start date for analysis (YYYY-MM-DD), or None for the default
+        end_date: End date for analysis (YYYY-MM-DD), or None for the default
+        portfolio: Dictionary with cash, leverage and risk, used for every symbol
+        show_reasoning: Whether to display agent reasoning
+        max_concurrency: Maximum number of symbols fetched or analysed at once
+        decision_engine: Portfolio decision engine (see create_initial_state)
+
+    Yields:
+        dict: {"crypto", "final_state", "error"}, in completion order; final_state
+            is None and error is set when the symbol could not be analysed
+    """
+    cryptos = list(dict.fromkeys(cryptos))
+    # One coins list request shared by every symbol, started right away
+    coins_index = asyncio.ensure_future(aget_coins_index())
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(crypto):
+        async with semaphore:
+            try:
+                data = await acheck_data_valid(crypto, start_date, end_date, return_data=True)
+                if not data:
+                    return {
+                        "crypto": crypto,
+                        "final_state": None,
+                        "error": "Unable to fetch required market data for analysis",
+                    }
+                # shield: one symbol being cancelled must not cancel the shared request
+                data = {**data, "lunarcrush_coins": await asyncio.shield(coins_index)}
+                final_state = await app.ainvoke(
+                    create_initial_state(
+                        crypto,
+                        start_date,
+                        end_date,
+                        portfolio,
+                        show_reasoning,
+                        data,
+                        decision_engine,
+                    )
+                )
+                return {"crypto": crypto, "final_state": final_state, "error": None}
+            except Exception as e:
+                print(f"Analysis error for {crypto}: {str(e)}")
+                return {"crypto": crypto, "final_state": None, "error": str(e)}
+
+    tasks = [asyncio.create_task(run_one(crypto)) for crypto in cryptos]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        # The consumer stopped early (e.g. the client disconnected)
+        for task in tasks:
+            task.cancel()
+        coins_index.cancel()
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from tools import api
+from tools.candle_store import CANDLE_DTYPE, INTERVAL_MS, CandleStore
+
+
+HOUR = INTERVAL_MS["1h"]
+# 2024-01-01 00:00 UTC, far enough in the past for every candle to be closed
+BASE = 1_704_067_200_000
+
+
+def make_candles(first: int, count: int) -> np.ndarray:
+    """Hourly candles opening at first, first + 1h, ... with the open time as every price."""
+    candles = np.zeros(count, dtype=CANDLE_DTYPE)
+    candles["timestamp"] = first + HOUR * np.arange(count)
+    for column in ("open", "close", "high", "low", "volume"):
+        candles[column] = candles["timestamp"]
+    return candles
+
+
+class FakeVenue:
+    """Serves hourly candles from a fixed history and records every page request."""
+
+    def __init__(self, first: int, count: int):
+        self.history = make_candles(first, count)
+        self.requests = []
+
+    def fetch_page(self, pair, start, end, limit):
+        self.requests.append((start, end, limit))
+        timestamps = self.history["timestamp"]
+        window = self.history[(timestamps >= start) & (timestamps <= end)]
+        return window[:limit]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = CandleStore(str(tmp_path))
+    monkeypatch.setattr(api, "candle_store", store)
+    monkeypatch.setitem(api.CANDLE_PAGE_SIZE, "venue", 1000)
+    return store
+
+
+def test_write_merges_adjacent_and_overlapping_coverage(store):
+    store.write("venue", "BTC", "1h", make_candles(BASE, 10), BASE, BASE + 10 * HOUR - 1)
+    store.write(
+        "venue", "BTC", "1h", make_candles(BASE + 10 * HOUR, 10), BASE + 10 * HOUR, BASE + 20 * HOUR - 1
+    )
+    store.write("venue", "BTC", "1h", make_candles(BASE + 5 * HOUR, 10), BASE + 5 * HOUR, BASE + 15 * HOUR - 1)
+
+    assert store.coverage("venue", "BTC", "1h") == [[BASE, BASE + 20 * HOUR - 1]]
+    stored = store.read("venue", "BTC", "1h", BASE, BASE + 20 * HOUR - 1)
+    np.testing.assert_array_equal(stored["timestamp"], BASE + HOUR * np.arange(20))
+
+
+def test_missing_ranges_reports_gaps_between_stored_pages(store):
+    store.write("venue", "BTC", "1h", make_candles(BASE, 10), BASE, BASE + 10 * HOUR - 1)
+    store.write(
+        "venue", "BTC", "1h", make_candles(BASE + 20 * HOUR, 10), BASE + 20 * HOUR, BASE + 30 * HOUR - 1
+    )
+
+    assert store.coverage("venue", "BTC", "1h") == [
+        [BASE, BASE + 10 * HOUR - 1],
+        [BASE + 20 * HOUR, BASE + 30 * HOUR - 1],
+    ]
+    assert store.missing_ranges("venue", "BTC", "1h", BASE, BASE + 40 * HOUR) == [
+        (BASE + 10 * HOUR, BASE + 20 * HOUR - 1),
+        (BASE + 30 * HOUR, BASE + 40 * HOUR),
+    ]
+    assert store.missing_ranges("venue", "BTC", "1h", BASE + HOUR, BASE + 9 * HOUR) == []
+
+
+def test_empty_page_is_not_marked_as_covered(store):
+    store.write("venue", "BTC", "1h", make_candles(BASE, 0), BASE, BASE + 10 * HOUR - 1)
+
+    assert store.coverage("venue", "BTC", "1h") == []
+    assert store.missing_ranges("venue", "BTC", "1h", BASE, BASE + 10 * HOUR - 1) == [
+        (BASE, BASE + 10 * HOUR - 1)
+    ]
+
+
+def test_short_page_only_covers_the_returned_span(store):
+    # The venue's history starts 5 candles into the requested range
+    store.write("venue", "BTC", "1h", make_candles(BASE + 5 * HOUR, 3), BASE, BASE + 10 * HOUR - 1)
+
+    assert store.coverage("venue", "BTC", "1h") == [[BASE + 4 * HOUR + 1, BASE + 8 * HOUR - 1]]
+    assert store.missing_ranges("venue", "BTC", "1h", BASE, BASE + 10 * HOUR - 1) == [
+        (BASE, BASE + 4 * HOUR),
+        (BASE + 8 * HOUR, BASE + 10 * HOUR - 1),
+    ]
+
+
+def test_open_candle_is_not_marked_as_covered(store, monkeypatch):
+    now = BASE + 1_000 * HOUR
+    monkeypatch.setattr("tools.candle_store.time.time", lambda: now / 1000)
+    store.write("venue", "BTC", "1h", make_candles(now - 5 * HOUR, 6), now - 5 * HOUR, now + HOUR - 1)
+
+    # The candle opening at `now` is still forming, so it is requested again
+    assert store.coverage("venue", "BTC", "1h") == [[now - 5 * HOUR, now - HOUR]]
+    assert store.missing_ranges("venue", "BTC", "1h", now - 5 * HOUR, now + HOUR - 1)[0][0] == now - HOUR + 1
+
+
+def test_load_candles_fetches_only_missing_pages(store, monkeypatch):
+    monkeypatch.setitem(api.CANDLE_PAGE_SIZE, "venue", 4)
+    venue = FakeVenue(BASE, 10)
+    end = BASE + 10 * HOUR - 1
+
+    candles = api._load_candles("venue", "BTC", BASE, end, venue.fetch_page)
+    np.testing.assert_array_equal(candles, venue.history)
+    # A full page may have been truncated, so the next one starts after its last candle
+    assert [request[:2] for request in venue.requests] == [
+        (BASE, BASE + 4 * HOUR - 1),
+        (BASE + 3 * HOUR + 1, BASE + 7 * HOUR),
+        (BASE + 7 * HOUR + 1, end),
+    ]
+    assert store.coverage("venue", "BTC", "1h") == [[BASE, end]]
+
+    venue.requests.clear()
+    np.testing.assert_array_equal(
+        api._load_candles("venue", "BTC", BASE, end, venue.fetch_page), venue.history
+    )
+    assert venue.requests == []
+
+
+def test_load_candles_retries_a_window_the_venue_returned_empty(store):
+    empty = FakeVenue(BASE, 0)
+    end = BASE + 10 * HOUR - 1
+
+    assert len(api._load_candles("venue", "BTC", BASE, end, empty.fetch_page)) == 0
+
+    venue = FakeVenue(BASE, 10)
+    candles = api._load_candles("venue", "BTC", BASE, end, venue.fetch_page)
+    assert venue.requests == [(BASE, end, api.CANDLE_PAGE_SIZE["venue"])]
+    np.testing.assert_array_equal(candles, venue.history)
+
+
+def test_load_candles_after_a_short_page_refetches_the_uncovered_head(store):
+    end = BASE + 10 * HOUR - 1
+    late = FakeVenue(BASE + 5 * HOUR, 5)
+    api._load_candles("venue", "BTC", BASE, end, late.fetch_page)
+
+    venue = FakeVenue(BASE, 10)
+    candles = api._load_candles("venue", "BTC", BASE, end, venue.fetch_page)
+    assert venue.requests == [(BASE, BASE + 4 * HOUR, api.CANDLE_PAGE_SIZE["venue"])]
+    np.testing.assert_array_equal(candles, venue.history)
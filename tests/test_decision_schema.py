@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from agents.decision_schema import validate_decision
+
+
+def make_decision(**decision) -> dict:
+    return {
+        "portfolio": {"cash": 1000, "leverage": 5, "risk": 0.02},
+        "decision": {"action": "long", "quantity": 100, **decision},
+        "agent_signals": [{"agent": "Technical Analysis", "signal": "bullish", "confidence": "60%"}],
+        "reasoning": "• ok",
+    }
+
+
+def test_valid_decision_from_json_and_dict():
+    content = make_decision(action=" Long ", confidence="60%")
+
+    from_json = validate_decision(json.dumps(content), max_position_margin=100)
+    from_dict = validate_decision(content, max_position_margin=100)
+
+    assert from_json == from_dict
+    assert from_json.decision.action == "long"
+    assert from_json.decision.quantity == 100
+    assert from_json.portfolio.cash == "1000"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{not json",
+        "",
+        '{"decision": {"action": "long", "quantity": 1}}',
+        "[]",
+    ],
+)
+def test_invalid_json_is_rejected(content):
+    with pytest.raises(ValidationError):
+        validate_decision(content)
+
+
+@pytest.mark.parametrize(
+    "decision",
+    [
+        {"action": "buy"},
+        {"quantity": -1},
+        {"quantity": "a lot"},
+    ],
+)
+def test_out_of_schema_values_are_rejected(decision):
+    with pytest.raises(ValidationError):
+        validate_decision(make_decision(**decision))
+
+
+def test_quantity_above_max_position_margin_is_rejected():
+    with pytest.raises(ValidationError, match="max_position_margin"):
+        validate_decision(make_decision(quantity=250), max_position_margin=200)
+
+    # Rounding the limit to whole cents is tolerated, and no limit means no check
+    assert validate_decision(make_decision(quantity=200.01), max_position_margin=200).decision.quantity == 200.01
+    assert validate_decision(make_decision(quantity=250)).decision.quantity == 250
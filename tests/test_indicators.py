@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.indicators import IndicatorEngine
+from agents.technicals import calculate_hurst_exponent, calculate_obv, calculate_rolling_hurst
+
+
+def make_prices(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_rows)))
+    # Repeat some closes so the unchanged-price branch of OBV is exercised
+    close[::7] = np.roll(close, 1)[::7]
+    return pd.DataFrame(
+        {"close": close, "volume": rng.uniform(100, 10_000, n_rows)},
+        index=pd.date_range("2024-01-01", periods=n_rows, freq="h", tz="UTC"),
+    )
+
+
+def obv_loop(prices_df: pd.DataFrame) -> np.ndarray:
+    """The original row-by-row OBV."""
+    obv = [0]
+    for i in range(1, len(prices_df)):
+        if prices_df["close"].iloc[i] > prices_df["close"].iloc[i - 1]:
+            obv.append(obv[-1] + prices_df["volume"].iloc[i])
+        elif prices_df["close"].iloc[i] < prices_df["close"].iloc[i - 1]:
+            obv.append(obv[-1] - prices_df["volume"].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return np.array(obv, dtype=float)
+
+
+def hurst_loop(prices: np.ndarray, max_lag: int = 20) -> float:
+    """The original per-lag Hurst exponent."""
+    lags = range(2, max_lag)
+    tau = [max(1e-8, np.sqrt(np.std(np.subtract(prices[lag:], prices[:-lag])))) for lag in lags]
+    return np.polyfit(np.log(lags), np.log(tau), 1)[0]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_obv_matches_the_loop_implementation(seed):
+    prices_df = make_prices(500, seed)
+
+    expected = obv_loop(prices_df)
+    np.testing.assert_allclose(IndicatorEngine(prices_df).obv(), expected)
+    np.testing.assert_allclose(calculate_obv(prices_df.copy()).to_numpy(), expected)
+
+
+@pytest.mark.parametrize("max_lag", [5, 20])
+def test_hurst_matches_the_loop_implementation(max_lag):
+    close = make_prices(300)["close"].to_numpy()
+
+    expected = hurst_loop(close, max_lag)
+    assert IndicatorEngine(pd.DataFrame({"close": close})).hurst(max_lag) == pytest.approx(expected)
+    assert calculate_hurst_exponent(close, max_lag) == pytest.approx(expected)
+
+
+def test_hurst_of_a_short_or_flat_series():
+    assert calculate_hurst_exponent(np.arange(10.0), 20) == 0.5
+    # Flat prices hit the epsilon floor at every lag, so the slope is 0
+    assert calculate_hurst_exponent(np.full(100, 5.0)) == pytest.approx(0.0)
+
+
+def test_rolling_hurst_matches_the_loop_over_each_window():
+    close = make_prices(150)["close"]
+    window = 63
+
+    result = calculate_rolling_hurst(close, window).to_numpy()
+    assert np.isnan(result[: window - 1]).all()
+    expected = [
+        hurst_loop(close.to_numpy()[end - window : end]) for end in range(window, len(close) + 1)
+    ]
+    np.testing.assert_allclose(result[window - 1 :], expected, rtol=1e-6)
+
+
+def test_panel_rows_match_single_series():
+    frames = [make_prices(300, seed) for seed in range(3)]
+    panel = IndicatorEngine(
+        {column: np.stack([frame[column].to_numpy() for frame in frames]) for column in ("close", "volume")}
+    )
+
+    for row, frame in enumerate(frames):
+        engine = IndicatorEngine(frame)
+        np.testing.assert_allclose(panel.obv()[row], engine.obv())
+        np.testing.assert_allclose(panel.rolling_hurst()[row], engine.rolling_hurst(), equal_nan=True)
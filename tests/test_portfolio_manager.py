@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from agents.decision_schema import validate_decision
+from agents.portfolio_manager import rule_based_decision
+
+
+def make_state(technical, sentiment, social, max_position_margin=200.0) -> dict:
+    risk = {
+        "max_position_margin": max_position_margin,
+        "risk_metrics": {"volatility": "1%", "stop loss": "2%", "take profit": "3%"},
+    }
+    messages = [HumanMessage(content="Make trading decisions based on the provided data.")]
+    for name, content in [
+        ("technical_analyst_agent", technical),
+        ("sentiment_agent", sentiment),
+        ("social_monitor_agent", social),
+        ("risk_management_agent", risk),
+    ]:
+        messages.append(HumanMessage(content=json.dumps(content), name=name))
+    return {
+        "messages": messages,
+        "data": {"portfolio": {"cash": 1000, "leverage": 5, "risk": 0.02}},
+        "metadata": {"show_reasoning": False, "decision_engine": "rules"},
+    }
+
+
+@pytest.mark.parametrize(
+    "technical, sentiment, social, action, quantity, confidence",
+    [
+        # (0.25 * 0.6 - 0.10 * 0.5) / 0.5 = +0.2
+        (
+            {"signal": "bullish", "confidence": "60%"},
+            {"signal": "bearish", "confidence": 0.5},
+            {"signal": "neutral", "confidence": "50%"},
+            "long",
+            40.0,
+            "20.0%",
+        ),
+        # (-0.25 * 0.8 - 0.15 * 0.5) / 0.5 = -0.55
+        (
+            {"signal": "bearish", "confidence": 80},
+            {"signal": "neutral", "confidence": 0.9},
+            {"signal": "sell", "confidence": "50%"},
+            "short",
+            110.0,
+            "55.0%",
+        ),
+        # 0.25 * 0.1 / 0.5 = +0.05, inside the neutral band
+        (
+            {"signal": "bullish", "confidence": "10%"},
+            {"signal": "neutral", "confidence": 0.5},
+            {"signal": "neutral", "confidence": "50%"},
+            "hold",
+            0.0,
+            "5.0%",
+        ),
+    ],
+)
+def test_rule_based_decision(technical, sentiment, social, action, quantity, confidence):
+    decision = rule_based_decision(make_state(technical, sentiment, social))
+
+    assert decision["decision"]["action"] == action
+    assert decision["decision"]["quantity"] == pytest.approx(quantity)
+    assert decision["decision"]["confidence"] == confidence
+    assert decision["decision"]["stop_loss"] == "2%"
+    assert decision["decision"]["take_profit"] == "3%"
+    assert decision["portfolio"] == {"cash": "1000.00", "leverage": "5.00", "risk": "0.02"}
+    assert [signal["agent"] for signal in decision["agent_signals"]] == [
+        "Technical Analysis",
+        "Sentiment Analysis",
+        "Social Monitoring",
+    ]
+
+
+def test_rule_based_decision_stays_within_the_risk_limit():
+    state = make_state(
+        {"signal": "bullish", "confidence": "100%"},
+        {"signal": "bullish", "confidence": 1.0},
+        {"signal": "bullish", "confidence": "100%"},
+        max_position_margin=123.45,
+    )
+    decision = rule_based_decision(state)
+
+    assert decision["decision"]["quantity"] == 123.45
+    validate_decision(decision, max_position_margin=123.45)
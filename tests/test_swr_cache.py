@@ -0,0 +1,106 @@
+import threading
+import time
+
+from tools.swr_cache import StaleWhileRevalidateCache
+
+
+def test_cold_key_is_fetched_once_for_concurrent_callers():
+    cache = StaleWhileRevalidateCache(None, ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(threading.get_ident())
+        started.set()
+        release.wait(5)
+        return {"price": 1}
+
+    results = [None] * 8
+    threads = [
+        threading.Thread(target=lambda i=i: results.__setitem__(i, cache.get("BTC", fetch)))
+        for i in range(len(results))
+    ]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Give the other callers time to reach the in-flight fetch before it completes
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"price": 1}] * 8
+
+
+def test_concurrent_callers_share_a_failed_fetch():
+    cache = StaleWhileRevalidateCache(None, ttl=60)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def get():
+        try:
+            cache.get("BTC", fetch)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert errors == ["upstream down"] * 4
+
+
+def test_failed_fetch_is_retried_after_retry_interval():
+    cache = StaleWhileRevalidateCache(None, ttl=60, retry_interval=0.2)
+    calls = []
+
+    def failing():
+        calls.append("failing")
+        return None
+
+    def working():
+        calls.append("working")
+        return 42
+
+    assert cache.get("BTC", failing) is None
+    assert cache.get("BTC", working) is None
+    assert calls == ["failing"]
+
+    time.sleep(0.25)
+    assert cache.get("BTC", working) == 42
+    assert cache.get("BTC", failing) == 42
+    assert calls == ["failing", "working"]
+
+
+def test_stale_value_is_served_while_it_is_refreshed(tmp_path):
+    cache = StaleWhileRevalidateCache(str(tmp_path / "cache.json"), ttl=60, stale_ttl=60)
+    assert cache.get("BTC", lambda: 1) == 1
+    cache._entries["BTC"]["fetched_at"] -= 90
+    refreshed = threading.Event()
+
+    def fetch():
+        refreshed.set()
+        return 2
+
+    assert cache.get("BTC", fetch) == 1
+    assert refreshed.wait(5)
+    cache._executor.shutdown(wait=True)
+    assert cache.get("BTC", lambda: 3) == 2
+
+    # Entries are reloaded from disk by a new cache
+    assert StaleWhileRevalidateCache(str(tmp_path / "cache.json"), ttl=60).get("BTC", lambda: 3) == 2
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtester
+from vector_backtester import performance_metrics, simulate
+
+
+def make_prices(n_rows: int, seed: int = 3) -> pd.DataFrame:
+    """Daily OHLCV bars around 1.0, so Backtester's rounding of collateral to 0.01 units is negligible."""
+    rng = np.random.default_rng(seed)
+    close = np.exp(np.cumsum(rng.normal(0, 0.03, n_rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.01, n_rows)) * close
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "close": close,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "volume": rng.uniform(1e6, 1e7, n_rows),
+        },
+        index=pd.date_range("2024-01-01", periods=n_rows, freq="D", tz="UTC"),
+    )
+
+
+@pytest.fixture
+def prices_df():
+    return make_prices(160)
+
+
+def test_simulate_matches_the_event_driven_backtester(prices_df, monkeypatch):
+    start, end = "2024-03-01", prices_df.index[-1].strftime("%Y-%m-%d")
+    results = simulate(prices_df, start, initial_capital=100000)
+    assert results["action"].isin(["long", "short"]).sum() > 10
+
+    # Replay the vectorized decisions through Backtester's order and collateral accounting
+    def agent(crypto, start_date, end_date, portfolio):
+        row = results.loc[end_date:end_date].iloc[0]
+        return json.dumps(
+            {
+                "portfolio": {"cash": portfolio["cash"], "leverage": 1, "risk": 0.01},
+                "decision": {"action": row["action"], "quantity": row["quantity"]},
+            }
+        )
+
+    monkeypatch.setattr(
+        backtester,
+        "get_price_API_HYPERLIQUID",
+        lambda crypto, start_date, end_date: prices_df.loc[:end_date],
+    )
+    event_driven = backtester.Backtester(agent, "BTC", start, end, 100000)
+    event_driven.run_backtest()
+
+    values = pd.DataFrame(event_driven.portfolio_values)["Portfolio Value"].to_numpy()
+    np.testing.assert_allclose(results["portfolio_value"].to_numpy(), values, rtol=1e-6)
+
+
+def test_simulate_holds_daily_positions_between_decisions(prices_df):
+    daily = simulate(prices_df, rebalance_every=24)
+    every_bar = simulate(prices_df)
+
+    assert (daily["action"].iloc[::24] != "").all()
+    assert (daily["action"].drop(daily.index[::24]) == "").all()
+    assert (daily["quantity"].drop(daily.index[::24]) == 0).all()
+    # Both start from the same first decision
+    assert daily["portfolio_value"].iloc[:2].tolist() == every_bar["portfolio_value"].iloc[:2].tolist()
+
+
+def test_fees_only_reduce_the_portfolio_value(prices_df):
+    free = simulate(prices_df, "2024-03-01")
+    charged = simulate(prices_df, "2024-03-01", fee_rate=0.001)
+
+    traded = free["action"].isin(["long", "short"])
+    assert traded.any()
+    assert (charged["portfolio_value"] <= free["portfolio_value"] + 1e-9).all()
+    assert charged["portfolio_value"].iloc[-1] < free["portfolio_value"].iloc[-1]
+    assert performance_metrics(free, 100000)["trades"] == traded.sum()